@@ -909,6 +909,20 @@ class DataVerificationResponse(Model):
     error: str = None
 
 
+class ProtocolAnalysisRequest(Model):
+    """Request model for protocol analysis endpoint"""
+
+    protocolText: str
+
+
+class ProtocolAnalysisResponse(Model):
+    """Response model for protocol analysis endpoint"""
+
+    success: bool
+    analysis: str = None
+    error: str = None
+
+
 class HealthResponse(Model):
     """Response model for health check endpoint"""
 
@@ -1046,6 +1060,31 @@ async def handle_data_verification_rest(
         return DataVerificationResponse(success=False, verified=False, error=str(e))
 
 
+@agent.on_rest_post(
+    "/analyze-protocol", ProtocolAnalysisRequest, ProtocolAnalysisResponse
+)
+async def handle_protocol_analysis_rest(
+    ctx: Context, req: ProtocolAnalysisRequest
+) -> ProtocolAnalysisResponse:
+    """REST endpoint for clinical trial protocol analysis"""
+    try:
+        ctx.logger.info(
+            f"📋 REST: Protocol analysis request ({len(req.protocolText)} chars)"
+        )
+
+        # Use the existing clinical trial analysis handler
+        result = handle_clinical_trial_analysis(req.protocolText)
+
+        if result["success"]:
+            return ProtocolAnalysisResponse(success=True, analysis=result["analysis"])
+        else:
+            return ProtocolAnalysisResponse(success=False, error=result["error"])
+
+    except Exception as e:
+        ctx.logger.error(f"❌ REST: Error in protocol analysis: {e}")
+        return ProtocolAnalysisResponse(success=False, error=str(e))
+
+
 # ============================================================================
 # REQUEST DETECTION AND PARSING
 # ============================================================================
@@ -1677,6 +1716,7 @@ if __name__ == "__main__":
     print("   • GET  /health - Health check and agent status")
     print("   • POST /extract-data - Extract data points from file content")
     print("   • POST /verify-data - Verify CRF data against eSource data")
+    print("   • POST /analyze-protocol - Analyze clinical trial protocol text")
     print(f"   • Base URL: http://localhost:8004")
 
     print("\n💡 Usage Examples:")
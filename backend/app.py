@@ -1,24 +1,46 @@
 import os
+import copy
+import gzip
+import hashlib
 import uuid
-from flask import Flask, request, jsonify, g
+import zlib
+import base64
+import binascii
+import threading
+import time
+from flask import Flask, request, jsonify, g, send_file, stream_with_context
 from werkzeug.utils import secure_filename
 import chromadb
 from chromadb.api import ClientAPI
 from chromadb.api.models.Collection import Collection
+from chromadb.utils import embedding_functions
 import PyPDF2
 import pandas as pd
 from io import BytesIO
 import json
-from config import IS_LOCAL, CHROMA_API_KEY, CHROMA_TENANT, CHROMA_DATABASE
+from config import (
+    IS_LOCAL,
+    CHROMA_API_KEY,
+    CHROMA_TENANT,
+    CHROMA_DATABASE,
+    CHROMA_HOST,
+    CHROMA_PORT,
+)
+from query_cache import QueryEmbeddingCache
+from embedding_cache import EmbeddingCache, CachedEmbeddingFunction
+from keyword_index import KeywordIndex, reciprocal_rank_fusion
+from ingestion import IngestionJob, IngestionJobStore, IngestionQueue
+from protocol_analysis import analyze_protocol_text, get_protocol_hash
+from docx_extractor import extract_text_from_docx
+from crf_catalog import CRFCatalog
+from pdf_text_cache import PDFTextCache, parse_page_ranges
+from models import User, Study, encode_json
 from database_manager import (
-    get_all_users,
     get_users_by_company,
-    get_users_by_role,
     get_study_by_id,
-    get_studies_by_sponsor,
-    get_studies_by_status,
     add_investigator_to_study,
     get_database_statistics,
+    check_database_statistics,
     db_manager,
 )
 
@@ -29,8 +51,15 @@ app = Flask(__name__)
 @app.after_request
 def after_request(response):
     response.headers.add("Access-Control-Allow-Origin", "*")
-    response.headers.add("Access-Control-Allow-Headers", "Content-Type,Authorization")
+    response.headers.add(
+        "Access-Control-Allow-Headers",
+        "Content-Type,Authorization,Range,If-None-Match,If-Modified-Since,If-Range",
+    )
     response.headers.add("Access-Control-Allow-Methods", "GET,PUT,POST,DELETE,OPTIONS")
+    response.headers.add(
+        "Access-Control-Expose-Headers",
+        "ETag,Last-Modified,Accept-Ranges,Content-Range,Content-Length",
+    )
     return response
 
 
@@ -55,24 +84,149 @@ def initialize_database():
 
 # Initialize database when the app starts
 initialize_database()
-ALLOWED_EXTENSIONS = {"pdf", "csv"}
-MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+ALLOWED_EXTENSIONS = {"pdf", "csv", "docx"}
+MAX_CONTENT_LENGTH = 100 * 1024 * 1024  # 100MB max file size
+
+# Ingestion
+INGESTION_WORKERS = 2
+INGESTION_HISTORY = 1000  # finished jobs kept in memory and in the job store
+CHUNK_SIZE = 2000
+CHUNK_OVERLAP = 200
+EMBEDDING_BATCH_SIZE = 32
+
+# Document listing
+DOCUMENT_PAGE_SIZE = 100
+MAX_DOCUMENT_PAGE_SIZE = 1000
+PREVIEW_LENGTH = 200
+DOCUMENT_FILTER_FIELDS = ("file_type", "filename", "study_id", "site_id")
+# Only ask ChromaDB for the document text when the projection needs it
+DOCUMENT_PROJECTIONS = {
+    "metadata": ["metadatas"],
+    "preview": ["metadatas", "documents"],
+    "full": ["metadatas", "documents"],
+}
+
+# User/study listing (no limit returns every matching record)
+MAX_RECORD_PAGE_SIZE = 1000
+
+# NDJSON export/import of users and studies
+EXPORT_CHUNK_SIZE = 64 * 1024  # bytes per streamed response chunk
+IMPORT_BATCH_SIZE = 1000  # records per write (and per progress line)
+IMPORT_MODELS = {"user": User, "study": Study}
+# Expected types of the top-level fields of imported records (None: optional)
+IMPORT_FIELD_TYPES = {
+    "user": {
+        "firstName": str,
+        "lastName": str,
+        "emailAddress": str,
+        "companyAssociation": str,
+        "role": str,
+    },
+    "study": {
+        "id": str,
+        "title": str,
+        "protocol": str,
+        "sponsor": str,
+        "status": str,
+        "createdAt": str,
+        "sites": (list, type(None)),
+        "principalInvestigator": (dict, type(None)),
+        "protocolAnalysis": (dict, type(None)),
+        "eSourceFiles": (list, type(None)),
+        "crfFiles": (list, type(None)),
+    },
+}
+
+# Change feed (long-poll and Server-Sent Events)
+CHANGES_TIMEOUT = 25  # default seconds a long-poll waits for a change
+MAX_CHANGES_TIMEOUT = 60
+CHANGES_HEARTBEAT = 15  # seconds between keep-alive comments on an event stream
+# Seconds before an event stream is closed, handing its server thread back;
+# EventSource reconnects on its own and resumes from Last-Event-ID
+CHANGES_STREAM_LIFETIME = 300
+CHANGES_RECONNECT_DELAY = 1000  # milliseconds EventSource waits to reconnect
 
 app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
 app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 
+# Search
+SEARCH_FILTER_FIELDS = ("file_type", "study_id", "site_id")
+MAX_BATCH_QUERIES = 100
+QUERY_CACHE_SIZE = 2048
+SEARCH_MODES = ("vector", "keyword", "hybrid")
+# Each ranking contributes this many candidates per requested result to fusion
+HYBRID_CANDIDATE_FACTOR = 4
+KEYWORD_INDEX_PATH = "./keyword_index.jsonl"
+EMBEDDING_CACHE_DIR = "./embedding_cache"
+
+# CRF files
+CRF_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sdvsdr", "mocks", "crf"
+)
+
+CRF_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60  # 1 year for hash-versioned URLs
+
 # Create upload directory if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 # Global variable for local/cloud configuration
 islocal = IS_LOCAL
 
+# Shared embedding function so search can embed queries outside ChromaDB.
+# Vectors are cached by content hash so unchanged text is never re-embedded.
+embedding_function = CachedEmbeddingFunction(
+    embedding_functions.DefaultEmbeddingFunction(),
+    EmbeddingCache(EMBEDDING_CACHE_DIR),
+    namespace="all-MiniLM-L6-v2",
+)
+# Queries are kept in memory only; the on-disk cache is for document chunks
+query_embedding_cache = QueryEmbeddingCache(
+    embedding_function.embed_uncached, max_size=QUERY_CACHE_SIZE
+)
+
+# CRF listing, built at startup and rebuilt when the directory changes
+crf_catalog = CRFCatalog(CRF_DIR)
+try:
+    crf_catalog.refresh()
+except FileNotFoundError:
+    print(f"⚠️  CRF directory not found: {CRF_DIR}")
+
+# Per-page CRF text, extracted once per file version
+crf_text_cache = PDFTextCache()
+
+
+def warm_crf_text_cache():
+    """Extract text for every listed CRF so first requests hit the cache."""
+    crf_text_cache.warm(
+        (os.path.join(CRF_DIR, file["name"]), file["contentHash"])
+        for file in crf_catalog.files
+    )
+
+
+threading.Thread(
+    target=warm_crf_text_cache, name="crf-text-warmup", daemon=True
+).start()
+
+# BM25 index over the same documents as the ChromaDB collection
+keyword_index = KeywordIndex(KEYWORD_INDEX_PATH)
+
+
+def json_response(payload, status: int = 200):
+    """Build a JSON response, reusing the cached encoding of models in it."""
+    return app.response_class(
+        encode_json(payload), status=status, mimetype="application/json"
+    )
+
 
 def get_chroma_client() -> ClientAPI:
     """Get ChromaDB client (local or cloud based on islocal flag)."""
     if islocal:
         if "chroma_client" not in g:
-            g.chroma_client = chromadb.PersistentClient(path="./chroma_db")
+            if CHROMA_HOST:
+                # A Chroma server is safe to share between worker processes
+                g.chroma_client = chromadb.HttpClient(host=CHROMA_HOST, port=CHROMA_PORT)
+            else:
+                g.chroma_client = chromadb.PersistentClient(path="./chroma_db")
         return g.chroma_client
     else:
         if "chroma_client" not in g:
@@ -87,16 +241,222 @@ def get_chroma_collection() -> Collection:
     chroma_client = get_chroma_client()
     if "chroma_collection" not in g:
         g.chroma_collection = chroma_client.get_or_create_collection(
-            name="documents", metadata={"hnsw:space": "cosine"}
+            name="documents",
+            metadata={"hnsw:space": "cosine"},
+            embedding_function=embedding_function,
         )
     return g.chroma_collection
 
 
+def ensure_keyword_index(collection: Collection):
+    """Rebuild the keyword index from ChromaDB if it is missing documents."""
+    collection_count = collection.count()
+    if keyword_index.get_document_count() >= collection_count:
+        return
+
+    offset = 0
+    while offset < collection_count:
+        results = collection.get(
+            limit=MAX_DOCUMENT_PAGE_SIZE, offset=offset, include=["documents"]
+        )
+        if not results["ids"]:
+            break
+        for doc_id, doc in zip(results["ids"], results["documents"]):
+            if not keyword_index.has_document(doc_id):
+                keyword_index.add_document(doc_id, doc)
+        offset += len(results["ids"])
+
+
+def chunk_text(text, chunk_size=CHUNK_SIZE, overlap=CHUNK_OVERLAP):
+    """Split text into overlapping chunks for embedding."""
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    step = chunk_size - overlap
+    for start in range(0, len(text), step):
+        chunks.append(text[start : start + chunk_size])
+        if start + chunk_size >= len(text):
+            break
+    return chunks
+
+
+def ingest_upload(job: IngestionJob):
+    """Extract, chunk and embed a spooled upload (runs on the ingestion pool)."""
+    try:
+        job.update(status="extracting")
+        text_content = process_file_path(job.file_path, job.file_type)
+        if not text_content.strip():
+            raise Exception("No text content could be extracted from the file")
+
+        job.update(status="chunking", content_length=len(text_content))
+        chunks = chunk_text(text_content)
+        job.update(status="embedding", total_chunks=len(chunks))
+
+        with app.app_context():
+            collection = get_chroma_collection()
+            for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE):
+                batch = chunks[start : start + EMBEDDING_BATCH_SIZE]
+                ids = [f"{job.document_id}-{start + i}" for i in range(len(batch))]
+                # Upsert so a job resumed after a restart rewrites its chunks
+                collection.upsert(
+                    documents=batch,
+                    metadatas=[
+                        {
+                            **job.metadata,
+                            "document_id": job.document_id,
+                            "chunk_index": start + i,
+                            "total_chunks": len(chunks),
+                        }
+                        for i in range(len(batch))
+                    ],
+                    ids=ids,
+                )
+                for chunk_id, chunk in zip(ids, batch):
+                    keyword_index.add_document(chunk_id, chunk)
+                job.update(processed_chunks=start + len(batch))
+    finally:
+        if os.path.exists(job.file_path):
+            os.remove(job.file_path)
+
+
+# Background workers for /upload
+ingestion_queue = IngestionQueue(
+    ingest_upload,
+    max_workers=INGESTION_WORKERS,
+    max_history=INGESTION_HISTORY,
+    store=IngestionJobStore(
+        os.path.join(UPLOAD_FOLDER, "jobs.sqlite3"), max_history=INGESTION_HISTORY
+    ),
+)
+
+
+def resume_ingestion_jobs():
+    """Requeue uploads a previous server run left unfinished.
+
+    Called by each serving process once it has started (not at import, so a
+    preloading gunicorn master never starts ingestion threads before forking).
+    """
+    resumed = ingestion_queue.resume_unfinished()
+    if resumed:
+        print(f"Resumed {resumed} unfinished ingestion job(s)")
+
+
 def allowed_file(filename):
     """Check if the uploaded file has an allowed extension."""
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def build_where_filter(filters):
+    """Build a ChromaDB metadata filter from a dict of equality conditions."""
+    clauses = [{key: value} for key, value in filters.items()]
+    if not clauses:
+        return None
+    if len(clauses) == 1:
+        return clauses[0]
+    return {"$and": clauses}
+
+
+def build_search_filter(data):
+    """Combine a raw `where` filter with the shorthand metadata filters."""
+    where = build_where_filter(
+        {key: data[key] for key in SEARCH_FILTER_FIELDS if data.get(key)}
+    )
+    if data.get("where"):
+        where = data["where"] if where is None else {"$and": [data["where"], where]}
+    return where
+
+
+def format_query_results(results, index=0):
+    """Format the results of one query from a ChromaDB query response."""
+    formatted_results = []
+    if results["documents"] and results["documents"][index]:
+        for i, doc in enumerate(results["documents"][index]):
+            formatted_results.append(
+                {
+                    "document_id": results["ids"][index][i],
+                    "content": doc,
+                    "metadata": results["metadatas"][index][i],
+                    "distance": (
+                        results["distances"][index][i]
+                        if results["distances"]
+                        else None
+                    ),
+                }
+            )
+    return formatted_results
+
+
+def encode_document_cursor(offset):
+    """Encode a collection offset as an opaque pagination cursor."""
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+
+def decode_document_cursor(cursor):
+    """Decode a pagination cursor back into a collection offset."""
+    if not cursor:
+        return 0
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return offset
+
+
+def encode_record_cursor(token):
+    """Encode a database page token as an opaque pagination cursor."""
+    if token is None:
+        return None
+    return base64.urlsafe_b64encode(token.encode()).decode()
+
+
+def decode_record_cursor(cursor):
+    """Decode a pagination cursor back into a database page token."""
+    if not cursor:
+        return None
+    try:
+        token = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    # Characters outside the alphabet are discarded, so garbage can decode
+    # to nothing, which would silently restart at the first page
+    if not token:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return token
+
+
+def parse_record_page(model_class):
+    """Read limit, after and fields query parameters for a record listing.
+
+    Returns (limit, after, fields); raises ValueError for invalid values.
+    """
+    limit = request.args.get("limit")
+    if limit is not None:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+        limit = min(limit, MAX_RECORD_PAGE_SIZE)
+
+    after = decode_record_cursor(request.args.get("after"))
+
+    fields = request.args.get("fields")
+    if fields:
+        fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [f for f in fields if f not in model_class.SERIALIZED_FIELDS]
+        if unknown:
+            raise ValueError(
+                f'Invalid fields: {", ".join(unknown)}. Allowed values: '
+                f'{", ".join(model_class.SERIALIZED_FIELDS)}'
+            )
+    return limit, after, fields or None
+
+
+def is_flag_set(name):
+    """Check if a boolean query parameter is set."""
+    return request.args.get(name, "").lower() in ("1", "true", "yes")
+
+
 def extract_text_from_pdf(file_content):
     """Extract text content from PDF file."""
     try:
@@ -138,16 +498,30 @@ def extract_text_from_csv(file_content):
 
 def process_file(file_content, filename):
     """Process uploaded file and extract text content."""
-    file_extension = filename.rsplit(".", 1)[1].lower()
+    return extract_file_content(file_content, filename.rsplit(".", 1)[1].lower())
+
 
+def extract_file_content(file_content, file_extension):
+    """Extract text content from file bytes of the given type."""
     if file_extension == "pdf":
         return extract_text_from_pdf(file_content)
     elif file_extension == "csv":
         return extract_text_from_csv(file_content)
+    elif file_extension == "docx":
+        return extract_text_from_docx(BytesIO(file_content))
     else:
         raise Exception(f"Unsupported file type: {file_extension}")
 
 
+def process_file_path(file_path, file_type):
+    """Process a file on disk of the given type, streaming formats that support it."""
+    if file_type == "docx":
+        return extract_text_from_docx(file_path)
+
+    with open(file_path, "rb") as f:
+        return extract_file_content(f.read(), file_type)
+
+
 @app.route("/upload", methods=["POST"])
 def upload_file():
     """Handle file upload and store in ChromaDB."""
@@ -173,52 +547,66 @@ def upload_file():
                 400,
             )
 
-        # Read file content
-        file_content = file.read()
+        filename = secure_filename(file.filename)
+        file_type = file.filename.rsplit(".", 1)[1].lower()
 
-        # Process file and extract text
-        text_content = process_file(file_content, file.filename)
+        # Spool the upload to disk; extraction and embedding happen off-request
+        job_id = str(uuid.uuid4())
+        file_path = os.path.join(UPLOAD_FOLDER, f"{job_id}_{filename}")
+        file.save(file_path)
 
-        if not text_content.strip():
-            return (
-                jsonify({"error": "No text content could be extracted from the file"}),
-                400,
-            )
-
-        # Generate unique ID for the document
-        doc_id = str(uuid.uuid4())
-
-        # Store in ChromaDB
-        collection = get_chroma_collection()
-        collection.add(
-            documents=[text_content],
-            metadatas=[
-                {
-                    "filename": secure_filename(file.filename),
-                    "file_type": file.filename.rsplit(".", 1)[1].lower(),
-                    "file_size": len(file_content),
-                }
-            ],
-            ids=[doc_id],
+        metadata = {
+            "filename": filename,
+            "file_type": file_type,
+            "file_size": os.path.getsize(file_path),
+        }
+        # Optional study/site tags so searches can be scoped
+        for key in ("study_id", "site_id"):
+            if request.form.get(key):
+                metadata[key] = request.form[key]
+
+        job = ingestion_queue.submit(
+            filename=filename,
+            file_path=file_path,
+            file_size=metadata["file_size"],
+            metadata=metadata,
+            job_id=job_id,
+            file_type=file_type,
         )
 
         return (
             jsonify(
                 {
-                    "message": "File uploaded and processed successfully",
-                    "document_id": doc_id,
-                    "filename": secure_filename(file.filename),
-                    "content_length": len(text_content),
-                    "file_type": file.filename.rsplit(".", 1)[1].lower(),
+                    "message": "File accepted for processing",
+                    "job_id": job.id,
+                    "document_id": job.document_id,
+                    "filename": filename,
+                    "file_type": file_type,
+                    "status": job.status,
+                    "status_url": f"/upload/jobs/{job.id}",
                 }
             ),
-            200,
+            202,
         )
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route("/upload/jobs/<job_id>", methods=["GET"])
+def get_upload_job(job_id):
+    """Get the status of an upload ingestion job."""
+    try:
+        job = ingestion_queue.get_job_status(job_id)
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+
+        return jsonify({"job": job}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/search", methods=["POST"])
 def search_documents():
     """Search for documents in ChromaDB."""
@@ -230,30 +618,40 @@ def search_documents():
 
         query = data["query"]
         n_results = data.get("n_results", 5)
+        mode = data.get("mode", "vector")
+        if mode not in SEARCH_MODES:
+            return (
+                jsonify(
+                    {"error": f'Invalid mode. Allowed modes: {", ".join(SEARCH_MODES)}'}
+                ),
+                400,
+            )
 
-        # Search in ChromaDB
         collection = get_chroma_collection()
-        results = collection.query(query_texts=[query], n_results=n_results)
+        where = build_search_filter(data)
+        where_document = data.get("where_document")
+
+        if mode == "vector":
+            # Search in ChromaDB
+            results = collection.query(
+                query_embeddings=query_embedding_cache.embed([query]),
+                n_results=n_results,
+                where=where,
+                where_document=where_document,
+            )
 
-        # Format results
-        formatted_results = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                formatted_results.append(
-                    {
-                        "document_id": results["ids"][0][i],
-                        "content": doc,
-                        "metadata": results["metadatas"][0][i],
-                        "distance": (
-                            results["distances"][0][i] if results["distances"] else None
-                        ),
-                    }
-                )
+            # Format results
+            formatted_results = format_query_results(results)
+        else:
+            formatted_results = search_hybrid(
+                collection, query, n_results, where, where_document, mode
+            )
 
         return (
             jsonify(
                 {
                     "query": query,
+                    "mode": mode,
                     "results": formatted_results,
                     "total_results": len(formatted_results),
                 }
@@ -265,49 +663,115 @@ def search_documents():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/documents", methods=["GET"])
-def list_documents():
-    """List all documents in the collection."""
-    try:
-        # Get all documents from collection
-        collection = get_chroma_collection()
-        results = collection.get()
+def search_hybrid(collection, query, n_results, where, where_document, mode):
+    """Search by keyword, or fuse keyword and vector rankings with RRF."""
+    ensure_keyword_index(collection)
+    candidates = n_results * HYBRID_CANDIDATE_FACTOR
+
+    rankings = [[doc_id for doc_id, _ in keyword_index.search(query, candidates)]]
+    distances = {}
+    if mode == "hybrid":
+        vector_results = collection.query(
+            query_embeddings=query_embedding_cache.embed([query]),
+            n_results=candidates,
+            where=where,
+            where_document=where_document,
+            include=["distances"],
+        )
+        rankings.append(vector_results["ids"][0])
+        if vector_results["distances"]:
+            distances = dict(
+                zip(vector_results["ids"][0], vector_results["distances"][0])
+            )
 
-        documents = []
-        if results["documents"]:
-            for i, doc in enumerate(results["documents"]):
-                documents.append(
-                    {
-                        "document_id": results["ids"][i],
-                        "content_preview": doc[:200] + "..." if len(doc) > 200 else doc,
-                        "metadata": results["metadatas"][i],
-                    }
-                )
+    fused = reciprocal_rank_fusion(rankings)
+    if not fused:
+        return []
+
+    # Fetching the candidates through ChromaDB also applies the filters to
+    # keyword hits, which the keyword index knows nothing about
+    scores = dict(fused[:candidates])
+    documents = collection.get(
+        ids=list(scores),
+        where=where,
+        where_document=where_document,
+        include=["documents", "metadatas"],
+    )
+    found = {
+        doc_id: (doc, metadata)
+        for doc_id, doc, metadata in zip(
+            documents["ids"], documents["documents"], documents["metadatas"]
+        )
+    }
+
+    formatted_results = []
+    for doc_id, score in fused[:candidates]:
+        if doc_id not in found:
+            continue
+        doc, metadata = found[doc_id]
+        formatted_results.append(
+            {
+                "document_id": doc_id,
+                "content": doc,
+                "metadata": metadata,
+                "distance": distances.get(doc_id),
+                "score": score,
+            }
+        )
+        if len(formatted_results) == n_results:
+            break
+    return formatted_results
 
-        return jsonify({"documents": documents, "total_count": len(documents)}), 200
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+@app.route("/search/batch", methods=["POST"])
+def search_documents_batch():
+    """Run many searches against ChromaDB in a single request."""
+    try:
+        data = request.get_json()
 
+        if not data or not data.get("queries"):
+            return jsonify({"error": "Queries parameter is required"}), 400
 
-# User endpoints
-@app.route("/api/users", methods=["GET"])
-def get_users():
-    """Get all users or filter by company/role."""
-    try:
-        company = request.args.get("company")
-        role = request.args.get("role")
+        queries = data["queries"]
+        if not isinstance(queries, list) or not all(
+            isinstance(query, str) for query in queries
+        ):
+            return jsonify({"error": "Queries must be a list of strings"}), 400
+        if len(queries) > MAX_BATCH_QUERIES:
+            return (
+                jsonify({"error": f"At most {MAX_BATCH_QUERIES} queries per batch"}),
+                400,
+            )
 
-        if company:
-            users = get_users_by_company(company)
-        elif role:
-            users = get_users_by_role(role)
-        else:
-            users = get_all_users()
+        n_results = data.get("n_results", 5)
+
+        # Embed every query in one batch and search them in one ChromaDB call
+        collection = get_chroma_collection()
+        results = collection.query(
+            query_embeddings=query_embedding_cache.embed(queries),
+            n_results=n_results,
+            where=build_search_filter(data),
+            where_document=data.get("where_document"),
+        )
+
+        batch_results = []
+        for i, query in enumerate(queries):
+            formatted_results = format_query_results(results, i)
+            batch_results.append(
+                {
+                    "query": query,
+                    "results": formatted_results,
+                    "total_results": len(formatted_results),
+                }
+            )
 
         return (
             jsonify(
-                {"users": [user.to_dict() for user in users], "total_count": len(users)}
+                {
+                    "results": batch_results,
+                    "total_queries": len(queries),
+                    "cache": query_embedding_cache.get_stats(),
+                }
             ),
             200,
         )
@@ -316,46 +780,105 @@ def get_users():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/users/<company>", methods=["GET"])
-def get_users_by_company_endpoint(company):
-    """Get users by specific company."""
+@app.route("/embeddings/cache", methods=["GET"])
+def get_embedding_cache_stats():
+    """Get embedding cache hit rates and storage statistics."""
     try:
-        users = get_users_by_company(company)
         return (
             jsonify(
                 {
-                    "users": [user.to_dict() for user in users],
-                    "company": company,
-                    "total_count": len(users),
+                    "embedding_cache": embedding_function.get_stats(),
+                    "query_cache": query_embedding_cache.get_stats(),
                 }
             ),
             200,
         )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
+@app.route("/embeddings/cache/compact", methods=["POST"])
+def compact_embedding_cache():
+    """Drop stale cached embeddings and reclaim space in the vectors file."""
+    try:
+        data = request.get_json(silent=True) or {}
+        max_age_days = data.get("max_age_days")
+        result = embedding_function.cache.compact(
+            max_age_seconds=max_age_days * 86400 if max_age_days is not None else None
+        )
+        return jsonify({"message": "Embedding cache compacted", **result}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-# Study endpoints
-@app.route("/api/studies", methods=["GET"])
-def get_studies():
-    """Get all studies or filter by sponsor/status."""
+@app.route("/documents", methods=["GET"])
+def list_documents():
+    """List documents in the collection, one page at a time."""
     try:
-        sponsor = request.args.get("sponsor")
-        status = request.args.get("status")
+        try:
+            limit = int(request.args.get("limit", DOCUMENT_PAGE_SIZE))
+            offset = decode_document_cursor(request.args.get("after"))
+        except ValueError:
+            return jsonify({"error": "Invalid limit or cursor"}), 400
+
+        if limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit, MAX_DOCUMENT_PAGE_SIZE)
+
+        fields = request.args.get("fields", "preview")
+        if fields not in DOCUMENT_PROJECTIONS:
+            return (
+                jsonify(
+                    {
+                        "error": f'Invalid fields. Allowed values: {", ".join(DOCUMENT_PROJECTIONS)}'
+                    }
+                ),
+                400,
+            )
 
-        if sponsor:
-            studies = get_studies_by_sponsor(sponsor)
-        elif status:
-            studies = get_studies_by_status(status)
-        else:
-            studies = db_manager.get_all_studies()
+        where = build_where_filter(
+            {
+                key: request.args[key]
+                for key in DOCUMENT_FILTER_FIELDS
+                if request.args.get(key)
+            }
+        )
+
+        # Fetch one extra record to find out whether another page exists
+        collection = get_chroma_collection()
+        results = collection.get(
+            where=where,
+            limit=limit + 1,
+            offset=offset,
+            include=DOCUMENT_PROJECTIONS[fields],
+        )
+
+        ids = results["ids"][:limit]
+        has_more = len(results["ids"]) > limit
+
+        documents = []
+        for i, doc_id in enumerate(ids):
+            document = {
+                "document_id": doc_id,
+                "metadata": results["metadatas"][i],
+            }
+            if fields == "preview":
+                doc = results["documents"][i]
+                document["content_preview"] = (
+                    doc[:PREVIEW_LENGTH] + "..." if len(doc) > PREVIEW_LENGTH else doc
+                )
+            elif fields == "full":
+                document["content"] = results["documents"][i]
+            documents.append(document)
 
         return (
             jsonify(
                 {
-                    "studies": [study.to_dict() for study in studies],
-                    "total_count": len(studies),
+                    "documents": documents,
+                    "total_count": len(documents),
+                    "next_cursor": (
+                        encode_document_cursor(offset + len(ids)) if has_more else None
+                    ),
                 }
             ),
             200,
@@ -365,6 +888,77 @@ def get_studies():
         return jsonify({"error": str(e)}), 500
 
 
+# User endpoints
+@app.route("/api/users", methods=["GET"])
+def get_users():
+    """Get all users or filter by company/role, one page at a time."""
+    try:
+        try:
+            limit, after, fields = parse_record_page(User)
+            users, next_after, total_count = db_manager.list_users(
+                company=request.args.get("company"),
+                role=request.args.get("role"),
+                limit=limit,
+                after=after,
+                fields=fields,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return json_response(
+            {
+                "users": users,
+                "total_count": total_count,
+                "next_cursor": encode_record_cursor(next_after),
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/users/<company>", methods=["GET"])
+def get_users_by_company_endpoint(company):
+    """Get users by specific company."""
+    try:
+        users = get_users_by_company(company)
+        return json_response(
+            {"users": users, "company": company, "total_count": len(users)}
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Study endpoints
+@app.route("/api/studies", methods=["GET"])
+def get_studies():
+    """Get all studies or filter by sponsor/status, one page at a time."""
+    try:
+        try:
+            limit, after, fields = parse_record_page(Study)
+            studies, next_after, total_count = db_manager.list_studies(
+                sponsor=request.args.get("sponsor"),
+                status=request.args.get("status"),
+                limit=limit,
+                after=after,
+                fields=fields,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return json_response(
+            {
+                "studies": studies,
+                "total_count": total_count,
+                "next_cursor": encode_record_cursor(next_after),
+            }
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route("/api/studies/<study_id>", methods=["GET"])
 def get_study(study_id):
     """Get specific study by ID."""
@@ -373,7 +967,7 @@ def get_study(study_id):
         if not study:
             return jsonify({"error": "Study not found"}), 404
 
-        return jsonify({"study": study.to_dict()}), 200
+        return json_response({"study": study})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -401,6 +995,9 @@ def add_investigator_to_study_endpoint(study_id):
         if not success:
             return jsonify({"error": "Failed to add investigator"}), 500
 
+        # Re-read so the response reflects the stored study
+        study = get_study_by_id(study_id)
+
         return (
             jsonify(
                 {
@@ -474,90 +1071,51 @@ def analyze_protocol():
         if file.filename == "":
             return jsonify({"error": "No file selected"}), 400
 
-        # Read file content
-        file_content = file.read()
-
         # Convert to text based on file type
         if file.filename.lower().endswith(".pdf"):
-            import PyPDF2
-
-            pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-            text_content = ""
-            for page in pdf_reader.pages:
-                text_content += page.extract_text() + "\n"
-        elif file.filename.lower().endswith((".doc", ".docx")):
-            # For now, return error for DOC files as we need python-docx
+            text_content = extract_text_from_pdf(file.read())
+        elif file.filename.lower().endswith(".docx"):
+            # Stream document.xml out of the upload without loading a DOM
+            text_content = extract_text_from_docx(file.stream)
+        elif file.filename.lower().endswith(".doc"):
             return (
                 jsonify(
                     {
-                        "error": "DOC/DOCX files not supported yet. Please use PDF or TXT."
+                        "error": "Legacy DOC files not supported. Please use DOCX, PDF or TXT."
                     }
                 ),
                 400,
             )
         else:
             # Assume it's a text file
-            text_content = file_content.decode("utf-8")
-
-        # Call TrialMonitor agent for protocol analysis
-        # This would be a call to the hosted TrialMonitor agent
-        # For now, we'll simulate the response structure
-        analysis_result = {
-            "trial_overview": {
-                "protocol_title": "Extracted from protocol",
-                "protocol_number": "PROT-001",
-                "study_phase": "Phase III",
-                "trial_type": "Interventional",
-                "indication": "Extracted indication",
-            },
-            "primary_objectives": {
-                "primary_objectives": "Extracted objectives",
-                "primary_endpoints": "Extracted endpoints",
-                "secondary_endpoints": "Extracted secondary endpoints",
-            },
-            "trial_design": {
-                "study_design": "Randomized, double-blind, placebo-controlled",
-                "randomization": "Yes",
-                "blinding": "Double-blind",
-                "sample_size": "500 patients",
-                "duration": "24 weeks",
-            },
-            "eligibility_criteria": {
-                "inclusion_criteria": ["Criterion 1", "Criterion 2"],
-                "exclusion_criteria": ["Exclusion 1", "Exclusion 2"],
-            },
-            "monitoring_requirements": {
-                "monitoring_schedule": "Every 4 weeks",
-                "sdv_requirements": "100% for primary endpoints",
-                "source_document_verification": "Required for all AEs",
-            },
-            "key_personnel": {
-                "principal_investigators": "To be assigned",
-                "study_sites": "To be determined",
-                "sponsor": "Current user",
-            },
-            "timeline": {
-                "visit_schedule": "Screening, Baseline, Weeks 4,8,12,16,20,24",
-                "key_milestones": "Enrollment, Data collection, Analysis",
-                "duration_of_participation": "24 weeks",
-            },
-            "safety_monitoring": {
-                "safety_endpoints": "Adverse events, laboratory assessments",
-                "adverse_event_monitoring": "Throughout study",
-                "dsmb_requirements": "Review at 25% and 50% enrollment",
-            },
-            "statistical_analysis": {
-                "statistical_methods": "ANCOVA with baseline adjustment",
-                "primary_analysis": "Change from baseline at Week 24",
-                "sample_size_calculation": "500 patients (90% power, α=0.05)",
-            },
-            "other_details": {
-                "special_procedures": "ECG monitoring, laboratory assessments",
-                "regulatory_information": "Phase III study for regulatory submission",
-            },
-        }
+            text_content = file.read().decode("utf-8")
+
+        if not text_content.strip():
+            return (
+                jsonify({"error": "No text content could be extracted from the file"}),
+                400,
+            )
 
-        return jsonify(analysis_result), 200
+        study_id = request.form.get("study_id")
+        study = None
+        if study_id:
+            study = get_study_by_id(study_id)
+            if not study:
+                return jsonify({"error": "Study not found"}), 404
+
+        # Call TrialMonitor agent for protocol analysis (cached by content hash)
+        analysis_result, cached = analyze_protocol_text(text_content)
+
+        if study:
+            # Update a copy; published studies are shared with readers
+            study = copy.copy(study)
+            study.protocol_analysis = analysis_result
+            db_manager.update_study(study.id, study)
+
+        response = jsonify(analysis_result)
+        response.headers["X-Protocol-Hash"] = get_protocol_hash(text_content)
+        response.headers["X-Cache"] = "HIT" if cached else "MISS"
+        return response, 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -568,74 +1126,292 @@ def get_database_stats():
     """Get database statistics."""
     try:
         stats = get_database_statistics()
-        return jsonify({"statistics": stats}), 200
+        result = {"statistics": stats}
+        # Self-check mode: compare the maintained counters with a full scan
+        if is_flag_set("verify"):
+            result["consistency"] = check_database_statistics()
+        return jsonify(result), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/files/crf", methods=["GET"])
-def get_crf_files():
-    """Get list of CRF files from mocks/crf directory."""
+def join_chunks(chunks, size=EXPORT_CHUNK_SIZE):
+    """Join small byte strings into chunks of about `size` bytes."""
+    buffer = []
+    buffered = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered += len(chunk)
+        if buffered >= size:
+            yield b"".join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b"".join(buffer)
+
+
+def gzip_chunks(chunks):
+    """Compress a stream of byte strings into a gzip stream."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def read_lines(stream, size=EXPORT_CHUNK_SIZE):
+    """Yield the lines of a binary stream, reading it in chunks of `size`."""
+    pending = b""
+    while True:
+        chunk = stream.read(size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def export_lines():
+    """Yield one NDJSON line per user and study in the database."""
+    for record_type, record in db_manager.export_records():
+        yield b'{"type":"' + record_type.encode() + b'","record":' + record + b"}\n"
+
+
+def parse_import_entry(entry):
+    """Build the model for one NDJSON import entry, checking its field types."""
+    record_type = entry["type"]
+    record = entry["record"]
+    if not isinstance(record, dict):
+        raise TypeError("record must be an object")
+    for field, field_type in IMPORT_FIELD_TYPES[record_type].items():
+        if field in record and not isinstance(record[field], field_type):
+            raise TypeError(f"{field} has the wrong type")
+    return IMPORT_MODELS[record_type].from_dict(record)
+
+
+def import_records(lines):
+    """Upsert NDJSON records in batches, yielding a progress line per batch.
+
+    Batches written before an invalid line are kept; the invalid line, or
+    any error while storing a batch, ends the import with a failed line.
+    """
+    counts = {"user": 0, "study": 0}
+    batches = {"user": [], "study": []}
+
+    def progress(**fields):
+        return (
+            json.dumps(
+                {
+                    "processed": counts["user"] + counts["study"],
+                    "users": counts["user"],
+                    "studies": counts["study"],
+                    **fields,
+                }
+            ).encode()
+            + b"\n"
+        )
+
+    def flush():
+        try:
+            db_manager.upsert_users(batches["user"])
+            counts["user"] += len(batches["user"])
+            db_manager.upsert_studies(batches["study"])
+            counts["study"] += len(batches["study"])
+        finally:
+            for batch in batches.values():
+                batch.clear()
+
+    error = None
     try:
-        # Path to the CRF files directory
-        crf_dir = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), "sdvsdr", "mocks", "crf"
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                batches[entry["type"]].append(parse_import_entry(entry))
+            except Exception as e:
+                # Whatever a malformed record raises, report it with its line
+                error = f"Invalid record on line {line_number}: {e!r}"
+                break
+
+            if len(batches["user"]) + len(batches["study"]) >= IMPORT_BATCH_SIZE:
+                flush()
+                yield progress(status="importing")
+    except (OSError, EOFError) as e:
+        # Corrupt or truncated gzip body
+        error = f"Could not read the request body: {e}"
+    except Exception as e:
+        error = f"Could not store records: {e!r}"
+
+    try:
+        flush()
+    except Exception as e:
+        error = error or f"Could not store records: {e!r}"
+
+    if error:
+        yield progress(status="failed", error=error)
+    else:
+        yield progress(status="completed")
+
+
+# Bulk export/import endpoints
+@app.route("/api/export", methods=["GET"])
+def export_database():
+    """Stream every user and study as NDJSON, optionally gzip-compressed."""
+    try:
+        body = join_chunks(export_lines())
+        filename = "sdv_platform_export.ndjson"
+        mimetype = "application/x-ndjson"
+        if is_flag_set("gzip"):
+            body = gzip_chunks(body)
+            filename += ".gz"
+            mimetype = "application/gzip"
+
+        response = app.response_class(body, mimetype=mimetype)
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/import", methods=["POST"])
+def import_database():
+    """Upsert users and studies from an NDJSON body, streaming progress."""
+    try:
+        stream = request.stream
+        # Accept gzip either as the body's encoding or as an export file
+        if request.content_encoding == "gzip" or is_flag_set("gzip"):
+            stream = gzip.GzipFile(fileobj=stream, mode="rb")
+
+        return app.response_class(
+            stream_with_context(import_records(read_lines(stream))),
+            mimetype="application/x-ndjson",
         )
 
-        if not os.path.exists(crf_dir):
-            return jsonify({"error": "CRF directory not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def parse_change_version(value):
+    """Parse a change feed version; None if not given."""
+    if value is None or value == "":
+        return None
+    if not value.isdigit():
+        raise ValueError(f"Invalid version: {value}")
+    return int(value)
+
+
+def sse_event(event, payload, event_id=None):
+    """Encode one Server-Sent Event with a JSON payload."""
+    lines = [f"id: {event_id}".encode()] if event_id is not None else []
+    lines.append(f"event: {event}".encode())
+    lines.append(b"data: " + encode_json(payload))
+    return b"\n".join(lines) + b"\n\n"
+
+
+def stream_changes(since, lifetime=CHANGES_STREAM_LIFETIME):
+    """Yield change events after `since` for up to `lifetime` seconds."""
+    deadline = time.monotonic() + lifetime
+    # Sends the response headers right away, so the client sees it is open
+    yield f"retry: {CHANGES_RECONNECT_DELAY}\n: connected\n\n".encode()
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # An ID-only message updates the client's Last-Event-ID without
+            # firing an event, so the reconnect resumes from here
+            yield f"id: {since}\n\n".encode()
+            return
+        wait = min(CHANGES_HEARTBEAT, remaining)
+        if not db_manager.wait_for_changes(since, wait):
+            yield b": keep-alive\n\n"
+            continue
+
+        result = db_manager.get_changes(since)
+        if result is None:
+            yield sse_event("reset", {"version": db_manager.get_version()})
+            return
+        since, changes = result
+        if changes:
+            yield sse_event(
+                "changes", {"version": since, "changes": changes}, event_id=since
+            )
+
 
-        files = []
-        for filename in os.listdir(crf_dir):
-            # Only show PDF files
-            if filename.endswith(".pdf"):
-                file_path = os.path.join(crf_dir, filename)
-                file_stat = os.stat(file_path)
-
-                # Determine file type and description based on filename
-                file_type = "Unknown"
-                description = "Clinical trial data file"
-
-                if "adverseeffect" in filename.lower():
-                    file_type = "Adverse Effect"
-                    description = "Adverse event reporting form"
-                elif "demographics" in filename.lower():
-                    file_type = "Demographics"
-                    description = "Patient demographic information"
-                elif "diseaseactivity" in filename.lower():
-                    file_type = "Disease Activity"
-                    description = "Disease activity assessment scores"
-                elif "medicalhistory" in filename.lower():
-                    file_type = "Medical History"
-                    description = "Patient medical history and comorbidities"
-                elif "medications" in filename.lower():
-                    file_type = "Medications"
-                    description = "Current and prior medications"
-                elif "week0-10" in filename.lower():
-                    file_type = "Visit Data (Week 0-10)"
-                    description = "Longitudinal visit data across weeks 0-10"
-                elif "week0" in filename.lower() and "week0-10" not in filename.lower():
-                    file_type = "Baseline Visit"
-                    description = "Baseline visit assessments and measurements"
-
-                files.append(
+# Change feed endpoint
+@app.route("/api/changes", methods=["GET"])
+def get_changes():
+    """Get user and study changes after a version, by long-poll or SSE."""
+    try:
+        try:
+            # A reconnecting EventSource sends the last event ID it received,
+            # which is newer than the `since` in its URL
+            since = parse_change_version(
+                request.headers.get("Last-Event-ID") or request.args.get("since")
+            )
+            timeout = min(
+                float(request.args.get("timeout", CHANGES_TIMEOUT)),
+                MAX_CHANGES_TIMEOUT,
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if "text/event-stream" in request.headers.get("Accept", ""):
+            if since is None:
+                since = db_manager.get_version()
+            response = app.response_class(
+                stream_changes(since), mimetype="text/event-stream"
+            )
+            response.headers["Cache-Control"] = "no-cache"
+            response.headers["X-Accel-Buffering"] = "no"
+            return response
+
+        # Without a version, report the current one to start from
+        if since is None:
+            return jsonify({"version": db_manager.get_version(), "changes": []}), 200
+
+        if timeout > 0:
+            db_manager.wait_for_changes(since, timeout)
+        result = db_manager.get_changes(since)
+        if result is None:
+            return (
+                jsonify(
                     {
-                        "id": f"FILE-{len(files) + 1:03d}",
-                        "name": filename,
-                        "type": file_type,
-                        "status": "completed",
-                        "uploadedBy": "Dr. Sarah Johnson",
-                        "uploadedAt": "2024-01-15",
-                        "description": description,
-                        "size": file_stat.st_size,
-                        "modified": file_stat.st_mtime,
+                        "error": "Changes since this version are no longer "
+                        "available; refetch users and studies",
+                        "version": db_manager.get_version(),
                     }
-                )
+                ),
+                410,
+            )
+
+        version, changes = result
+        return json_response({"version": version, "changes": changes})
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 
-        # Sort files by name
-        files.sort(key=lambda x: x["name"])
+@app.route("/api/files/crf", methods=["GET"])
+def get_crf_files():
+    """Get list of CRF files from mocks/crf directory."""
+    try:
+        try:
+            body, etag = crf_catalog.get_listing()
+        except FileNotFoundError:
+            return jsonify({"error": "CRF directory not found"}), 404
 
-        return jsonify({"files": files})
+        # Unchanged listings are answered without re-sending the body
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -645,34 +1421,101 @@ def get_crf_files():
 def get_crf_file(filename):
     """Serve CRF files for preview."""
     try:
-        # Path to the CRF files directory
-        crf_dir = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), "sdvsdr", "mocks", "crf"
-        )
-
         # Security check - ensure filename doesn't contain path traversal
         if ".." in filename or "/" in filename or "\\" in filename:
             return jsonify({"error": "Invalid filename"}), 400
 
         # If requesting a DOCX file, serve the PDF version instead
         if filename.endswith(".docx"):
-            pdf_filename = filename.replace(".docx", ".pdf")
-            file_path = os.path.join(crf_dir, pdf_filename)
-        else:
-            file_path = os.path.join(crf_dir, filename)
+            filename = filename.replace(".docx", ".pdf")
+        file_path = os.path.join(CRF_DIR, filename)
 
-        if not os.path.exists(file_path):
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
             return jsonify({"error": "File not found"}), 404
 
-        # Serve the file with appropriate headers
-        from flask import send_file
+        # URLs carrying the current content hash (?v=) never change, so they
+        # can be cached for good; plain URLs revalidate against the ETag
+        content_hash = crf_catalog.get_content_hash(filename, file_stat)
+        versioned = request.args.get("v") == content_hash
 
-        return send_file(
+        # send_file answers If-None-Match/If-Modified-Since with 304 and
+        # Range requests with 206 partial content
+        response = send_file(
             file_path,
             as_attachment=False,
             mimetype="application/pdf",
-            download_name=os.path.basename(file_path),
+            download_name=filename,
+            conditional=True,
+            etag=content_hash,
+            last_modified=file_stat.st_mtime,
+            max_age=CRF_IMMUTABLE_MAX_AGE if versioned else 0,
+        )
+        # Advertise range support so PDF viewers can render progressively
+        response.accept_ranges = "bytes"
+        if versioned:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+        else:
+            response.cache_control.no_cache = True
+        return response
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/api/files/crf/<filename>/text", methods=["GET"])
+def get_crf_file_text(filename):
+    """Get the extracted text of a CRF file, optionally for a page range."""
+    try:
+        # Security check - ensure filename doesn't contain path traversal
+        if ".." in filename or "/" in filename or "\\" in filename:
+            return jsonify({"error": "Invalid filename"}), 400
+
+        if filename.endswith(".docx"):
+            filename = filename.replace(".docx", ".pdf")
+        file_path = os.path.join(CRF_DIR, filename)
+
+        try:
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            return jsonify({"error": "File not found"}), 404
+
+        content_hash = crf_catalog.get_content_hash(filename, file_stat)
+        page_spec = request.args.get("pages")
+        # The spec is hashed, since raw query text may not be valid in an ETag
+        etag = (
+            f"{content_hash}-{hashlib.sha256(page_spec.encode()).hexdigest()[:16]}"
+            if page_spec
+            else content_hash
+        )
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        pages = crf_text_cache.get_pages(file_path, content_hash)
+        try:
+            page_numbers = parse_page_ranges(page_spec, len(pages))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        selected = [
+            {"page": number, "text": pages[number - 1]} for number in page_numbers
+        ]
+        response = jsonify(
+            {
+                "filename": filename,
+                "contentHash": content_hash,
+                "pageCount": len(pages),
+                "pages": selected,
+                "text": "\n".join(page["text"] for page in selected),
+            }
         )
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -685,4 +1528,5 @@ def health_check():
 
 
 if __name__ == "__main__":
+    resume_ingestion_jobs()
     app.run(debug=True, host="0.0.0.0", port=5001)
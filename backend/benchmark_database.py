@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the SDV Platform database managers.
+Fills a database with generated users and studies, then times batched
+writes, indexed lookups and statistics.
+
+    python benchmark_database.py --users 200000 --studies 50000
+    python benchmark_database.py --backend memory --users 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+from models import User, Study
+
+COMPANIES = ["Google", "Medidata", "Veera Vault", "Pfizer", "Novartis"]
+ROLES = ["Sponsor", "CRO", "Site"]
+STATUSES = ["draft", "active", "completed", "on-hold"]
+
+
+def generate_users(count: int):
+    """Generate users spread over COMPANIES and ROLES."""
+    for i in range(count):
+        yield User(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email_address=f"user{i}@example.com",
+            company_association=COMPANIES[i % len(COMPANIES)],
+            role=ROLES[i % len(ROLES)],
+        )
+
+
+def generate_studies(count: int):
+    """Generate studies spread over COMPANIES and STATUSES."""
+    for i in range(count):
+        yield Study(
+            study_id=f"BENCH-{i:07d}",
+            title=f"Benchmark Study {i}",
+            protocol=f"BM-{i:07d}",
+            sponsor=COMPANIES[i % len(COMPANIES)],
+            status=STATUSES[i % len(STATUSES)],
+            created_at=datetime(2024, 1, 1),
+        )
+
+
+def timed(label: str, func, repeat: int = 1):
+    """Run func `repeat` times and print the mean time per run."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - start) / repeat
+    size = len(result) if hasattr(result, "__len__") else result
+    print(f"  {label:<40} {elapsed * 1000:10.2f} ms  ({size})")
+    return result
+
+
+def create_manager(backend: str, path: str):
+    """Create an empty database manager for the backend."""
+    if backend == "memory":
+        from database_manager import DatabaseManager
+
+        manager = DatabaseManager()
+    else:
+        from sqlite_database_manager import SQLiteDatabaseManager
+
+        manager = SQLiteDatabaseManager(path)
+    manager.clear_all_data()
+    return manager
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the database managers")
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--studies", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = create_manager(
+            args.backend, os.path.join(directory, "benchmark.db")
+        )
+        print(
+            f"Backend: {args.backend}, {args.users} users, {args.studies} studies"
+        )
+
+        timed("add_users (batched)", lambda: manager.add_users(generate_users(args.users)))
+        timed(
+            "add_studies (batched)",
+            lambda: manager.add_studies(generate_studies(args.studies)),
+        )
+
+        timed(
+            "get_users_by_company",
+            lambda: manager.get_users_by_company("medidata"),
+            args.repeat,
+        )
+        timed("get_users_by_role", lambda: manager.get_users_by_role("CRO"), args.repeat)
+        timed(
+            "get_user_by_email",
+            lambda: [manager.get_user_by_email("user42@example.com")],
+            args.repeat,
+        )
+        timed(
+            "get_studies_by_sponsor",
+            lambda: manager.get_studies_by_sponsor("pfizer"),
+            args.repeat,
+        )
+        timed(
+            "get_studies_by_status",
+            lambda: manager.get_studies_by_status("active"),
+            args.repeat,
+        )
+        timed(
+            "get_users_by_company_count",
+            manager.get_users_by_company_count,
+            args.repeat,
+        )
+        timed(
+            "get_studies_by_status_count",
+            manager.get_studies_by_status_count,
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
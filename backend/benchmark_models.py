@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for the SDV Platform backend models.
+Builds N instances of each model and reports the memory they take, in bytes
+per object: the total allocated (tracemalloc, including field values) and
+the shallow size of the instance itself (plus its __dict__, if any).
+
+    python benchmark_models.py                 # 100k and 1M records
+    python benchmark_models.py --counts 250000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from datetime import datetime
+from models import User, Study, Site, StudyFile
+
+CREATED_AT = datetime(2024, 1, 15)
+
+
+def build_users(count: int):
+    """Build users with distinct field values."""
+    return [
+        User(
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            email_address=f"user{i}@example.com",
+            company_association="Medidata",
+            role="CRO",
+        )
+        for i in range(count)
+    ]
+
+
+def build_files(count: int):
+    """Build study files with distinct field values."""
+    return [
+        StudyFile(
+            file_id=f"FILE-{i}",
+            name=f"file_{i}.pdf",
+            file_type="esource",
+            uploaded_by="Dr. Sarah Johnson",
+            uploaded_at=CREATED_AT,
+            size=i,
+        )
+        for i in range(count)
+    ]
+
+
+def build_sites(count: int):
+    """Build sites without files."""
+    return [
+        Site(
+            site_id=f"SITE-{i}",
+            name=f"Site {i}",
+            investigator="Dr. Sarah Johnson",
+            location="Baltimore, MD",
+        )
+        for i in range(count)
+    ]
+
+
+def build_studies(count: int):
+    """Build studies without sites or files."""
+    return [
+        Study(
+            study_id=f"STD-{i}",
+            title=f"Study {i}",
+            protocol=f"PROT-{i}",
+            sponsor="Regeneron Pharmaceuticals",
+            status="active",
+            created_at=CREATED_AT,
+        )
+        for i in range(count)
+    ]
+
+
+def shallow_size(obj) -> int:
+    """Get the size of an instance and its attribute storage."""
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def measure(build, count: int):
+    """Get (allocated, shallow) bytes per object built by `build`."""
+    gc.collect()
+    tracemalloc.start()
+    objects = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    shallow = shallow_size(objects[0])
+    del objects
+    return current / count, shallow
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Measure model memory use")
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[100000, 1000000]
+    )
+    args = parser.parse_args()
+
+    for count in args.counts:
+        print(f"{count} records (bytes per object)")
+        print(f"  {'model':<10} {'allocated':>10} {'instance':>10}")
+        for name, build in [
+            ("User", build_users),
+            ("StudyFile", build_files),
+            ("Site", build_sites),
+            ("Study", build_studies),
+        ]:
+            allocated, shallow = measure(build, count)
+            print(f"  {name:<10} {allocated:10.1f} {shallow:10d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,3 +13,18 @@ CHROMA_DATABASE = os.getenv("CHROMA_DATABASE")
 
 # Application Configuration
 IS_LOCAL = os.getenv("IS_LOCAL", "true").lower() == "true"
+
+# Database Configuration
+# "sqlite" persists data and shares it between worker processes;
+# "memory" keeps it in the process and reseeds mock data at every start
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "sqlite").lower()
+DATABASE_PATH = os.getenv("DATABASE_PATH", "sdv_platform.db")
+# Number of recent user/study changes kept for GET /api/changes
+CHANGE_LOG_SIZE = int(os.getenv("CHANGE_LOG_SIZE", "10000"))
+
+# ChromaDB server for multi-worker deployments (local mode only)
+CHROMA_HOST = os.getenv("CHROMA_HOST")
+CHROMA_PORT = int(os.getenv("CHROMA_PORT", "8000"))
+
+TRIAL_MONITOR_URL = os.getenv("TRIAL_MONITOR_URL", "http://localhost:8004")
+TRIAL_MONITOR_TIMEOUT = int(os.getenv("TRIAL_MONITOR_TIMEOUT", "600"))
@@ -0,0 +1,135 @@
+"""
+Shared pytest setup for the backend tests.
+Runs every test from a scratch directory, so the SQLite database, uploads,
+caches and ChromaDB files the app creates never land in the source tree,
+and serves the app on port 5001 for the live-server scripts
+(test_endpoints.py) when nothing is listening there yet.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+WORK_DIR = tempfile.mkdtemp(prefix="sdv-backend-tests-")
+LIVE_SERVER_PORT = 5001
+EMBEDDING_DIMENSION = 384  # all-MiniLM-L6-v2
+
+# Before any backend module reads its configuration
+os.environ.setdefault("DATABASE_PATH", os.path.join(WORK_DIR, "sdv_platform.db"))
+os.chdir(WORK_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    """A SQLite database manager on a fresh database seeded with mock data."""
+    from sqlite_database_manager import SQLiteDatabaseManager
+
+    return SQLiteDatabaseManager(str(tmp_path / "sdv_platform.db"))
+
+
+@pytest.fixture
+def memory_manager():
+    """An in-memory database manager seeded with mock data."""
+    from database_manager import DatabaseManager
+
+    return DatabaseManager()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def manager(request):
+    """Each database manager backend in turn."""
+    return request.getfixturevalue(f"{request.param}_manager")
+
+
+@pytest.fixture(scope="session")
+def flask_app():
+    """The backend Flask app, imported once per test session."""
+    import app as backend_app
+
+    backend_app.app.config["TESTING"] = True
+    return backend_app
+
+
+@pytest.fixture
+def client(flask_app):
+    """A test client on the app's database, reset to mock data for each test."""
+    flask_app.db_manager.reset_to_mock_data()
+    return flask_app.app.test_client()
+
+
+def hashed_embeddings(texts):
+    """Embed texts as normalized bags of hashed words, without a model."""
+    vectors = []
+    for text in texts:
+        vector = np.zeros(EMBEDDING_DIMENSION, dtype=np.float32)
+        for word in text.lower().split():
+            vector[zlib.crc32(word.encode()) % EMBEDDING_DIMENSION] += 1.0
+        norm = np.linalg.norm(vector)
+        vectors.append((vector / norm if norm else vector).tolist())
+    return vectors
+
+
+@pytest.fixture
+def add_documents(flask_app, monkeypatch):
+    """Add chunks to the app's ChromaDB collection and keyword index.
+
+    The embedding model is replaced by hashed_embeddings. Chunks are tagged
+    with `study_id`, so tests filtering on their own study only see theirs.
+    """
+    monkeypatch.setattr(
+        flask_app.embedding_function, "embedding_function", hashed_embeddings
+    )
+
+    def add(study_id, texts, **metadata):
+        ids = [f"{study_id}-{i}" for i in range(len(texts))]
+        with flask_app.app.app_context():
+            flask_app.get_chroma_collection().upsert(
+                documents=texts,
+                metadatas=[
+                    {"study_id": study_id, "chunk_index": i, **metadata}
+                    for i in range(len(texts))
+                ],
+                ids=ids,
+            )
+        for doc_id, text in zip(ids, texts):
+            flask_app.keyword_index.add_document(doc_id, text)
+        return ids
+
+    return add
+
+
+def _port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        return sock.connect_ex(("localhost", port)) == 0
+
+
+@pytest.fixture(scope="session")
+def live_server(flask_app):
+    """Serve the app on port 5001 unless a server is already running there."""
+    if _port_in_use(LIVE_SERVER_PORT):
+        yield f"http://localhost:{LIVE_SERVER_PORT}"
+        return
+
+    from werkzeug.serving import make_server
+
+    server = make_server("localhost", LIVE_SERVER_PORT, flask_app.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://localhost:{LIVE_SERVER_PORT}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def _serve_live_scripts(request):
+    """Start the live server for modules that talk to a running backend."""
+    if getattr(request.module, "BASE_URL", None):
+        request.getfixturevalue("live_server")
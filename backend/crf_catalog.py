@@ -0,0 +1,144 @@
+"""
+CRF file catalog for the SDV Platform backend.
+Keeps the CRF listing in memory, rebuilding it only when a CRF file is
+added, removed or rewritten, and serves it with a strong ETag.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+# (filename keyword, file type, description), checked in order
+CRF_FILE_TYPES = [
+    ("adverseeffect", "Adverse Effect", "Adverse event reporting form"),
+    ("demographics", "Demographics", "Patient demographic information"),
+    ("diseaseactivity", "Disease Activity", "Disease activity assessment scores"),
+    (
+        "medicalhistory",
+        "Medical History",
+        "Patient medical history and comorbidities",
+    ),
+    ("medications", "Medications", "Current and prior medications"),
+    (
+        "week0-10",
+        "Visit Data (Week 0-10)",
+        "Longitudinal visit data across weeks 0-10",
+    ),
+    ("week0", "Baseline Visit", "Baseline visit assessments and measurements"),
+]
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Get the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def classify_crf_file(filename: str):
+    """Get (file type, description) for a CRF filename."""
+    lowered = filename.lower()
+    for keyword, file_type, description in CRF_FILE_TYPES:
+        if keyword in lowered:
+            return file_type, description
+    return "Unknown", "Clinical trial data file"
+
+
+class CRFCatalog:
+    """In-memory CRF listing invalidated by each file's mtime and size."""
+
+    def __init__(self, directory: str, refresh_interval: float = 2.0):
+        """Initialize the catalog; the directory is checked at most once per interval."""
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+        self.files = []
+        self.etag = None
+        self.body = None
+        self._signature = None  # ((filename, mtime_ns, size), ...) of the listing
+        self._checked_at = 0.0
+        self._hashes = {}  # filename -> (mtime_ns, size, content hash)
+        self._lock = threading.RLock()
+
+    def _scan(self) -> List[Tuple[str, os.stat_result]]:
+        """Get (filename, stat) for every PDF in the directory, sorted by name."""
+        pdfs = []
+        for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+            # Only show PDF files
+            if not entry.is_file() or not entry.name.endswith(".pdf"):
+                continue
+            pdfs.append((entry.name, entry.stat()))
+        return pdfs
+
+    def _build(self, pdfs: List[Tuple[str, os.stat_result]]) -> List[Dict[str, Any]]:
+        """Describe every scanned PDF."""
+        files = []
+        for name, file_stat in pdfs:
+            file_type, description = classify_crf_file(name)
+            content_hash = self.get_content_hash(name, file_stat)
+            files.append(
+                {
+                    "id": f"FILE-{len(files) + 1:03d}",
+                    "name": name,
+                    "type": file_type,
+                    "status": "completed",
+                    "uploadedBy": "Dr. Sarah Johnson",
+                    "uploadedAt": "2024-01-15",
+                    "description": description,
+                    "size": file_stat.st_size,
+                    "modified": file_stat.st_mtime,
+                    "contentHash": content_hash,
+                }
+            )
+        return files
+
+    def get_content_hash(self, filename: str, file_stat=None) -> str:
+        """Get a file's content hash, re-hashing only when its stat changes."""
+        if file_stat is None:
+            file_stat = os.stat(os.path.join(self.directory, filename))
+        key = (file_stat.st_mtime_ns, file_stat.st_size)
+        with self._lock:
+            cached = self._hashes.get(filename)
+            if cached and cached[:2] == key:
+                return cached[2]
+        content_hash = hash_file(os.path.join(self.directory, filename))
+        with self._lock:
+            self._hashes[filename] = (*key, content_hash)
+        return content_hash
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the listing if any file changed; returns True on rebuild.
+
+        Files overwritten in place leave the directory mtime alone, so every
+        file's mtime and size is compared; only changed files are re-hashed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self.body is not None:
+                if now - self._checked_at < self.refresh_interval:
+                    return False
+            self._checked_at = now
+
+            pdfs = self._scan()
+            signature = tuple(
+                (name, file_stat.st_mtime_ns, file_stat.st_size)
+                for name, file_stat in pdfs
+            )
+            if not force and signature == self._signature:
+                return False
+
+            self.files = self._build(pdfs)
+            self.body = json.dumps({"files": self.files}).encode("utf-8")
+            self.etag = hashlib.sha256(self.body).hexdigest()
+            self._signature = signature
+            return True
+
+    def get_listing(self):
+        """Get (JSON body, ETag) for the current listing."""
+        self.refresh()
+        with self._lock:
+            return self.body, self.etag
@@ -1,183 +1,673 @@
 """
 Database manager for the SDV Platform backend.
 This module handles database operations for users and studies.
-Currently uses in-memory storage, but can be extended to use a real database.
+Uses persistent SQLite storage by default (see sqlite_database_manager.py);
+set DATABASE_BACKEND=memory for the in-memory DatabaseManager below.
 """
 
-from typing import List, Optional, Dict, Any
+import copy
+import threading
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 from models import User, Study, Site, StudyFile
 from mock_data import MOCK_USERS, MOCK_STUDIES
+from config import DATABASE_BACKEND, DATABASE_PATH, CHANGE_LOG_SIZE
+
+
+class DatabaseSnapshot:
+    """Immutable view of users, studies, indexes and counters at one version.
+
+    Snapshots are never modified after they are published, so readers can
+    use one without locking while writers build the next version.
+    """
+
+    __slots__ = (
+        "version",
+        "users",
+        "studies",
+        "users_by_company",
+        "users_by_role",
+        "studies_by_sponsor",
+        "studies_by_status",
+        "company_counts",
+        "studies_without_investigator",
+        "user_keys",
+        "study_keys",
+        "sorted_keys",
+    )
+
+    # Structures copied on first write within a transaction
+    TABLES = (
+        "users",
+        "studies",
+        "users_by_company",
+        "users_by_role",
+        "studies_by_sponsor",
+        "studies_by_status",
+        "company_counts",
+        "user_keys",
+        "study_keys",
+    )
+
+    def __init__(self):
+        self.version = 0
+        self.users = {}
+        self.studies = {}
+        # Secondary hash indexes: key -> ordered set (dict) of record IDs
+        self.users_by_company = {}  # lowercased company
+        self.users_by_role = {}
+        self.studies_by_sponsor = {}  # lowercased sponsor
+        self.studies_by_status = {}
+        # Statistics counters, maintained alongside the indexes
+        self.company_counts = {}  # company as stored -> users
+        self.studies_without_investigator = 0
+        # Keys each record is indexed under, so updates unindex the old keys
+        # even if the stored object was modified in place
+        self.user_keys = {}
+        self.study_keys = {}
+        # Sorted record IDs per table or index bucket, built on first paged
+        # read; never copied to the next snapshot
+        self.sorted_keys = {}
+
+    def get_sorted_keys(self, name: Tuple[str, ...], keys: Iterable[str]) -> List[str]:
+        """Get `keys` sorted, cached under `name` for this snapshot's lifetime."""
+        sorted_keys = self.sorted_keys.get(name)
+        if sorted_keys is None:
+            # Readers racing here build the same list; either one may be kept
+            sorted_keys = self.sorted_keys[name] = sorted(keys)
+        return sorted_keys
+
+
+class SnapshotWriter:
+    """Builds the next snapshot from a base one, copying only what changes.
+
+    Top-level tables are copied on their first write and index buckets on
+    theirs, so the published base snapshot is left untouched.
+    """
+
+    def __init__(self, base: DatabaseSnapshot):
+        self.snapshot = DatabaseSnapshot()
+        for name in DatabaseSnapshot.TABLES:
+            setattr(self.snapshot, name, getattr(base, name))
+        self.snapshot.studies_without_investigator = base.studies_without_investigator
+        self.snapshot.version = base.version + 1
+        self.changes = []  # (record type, record ID, "upsert" | "delete")
+        self._copied = set()
+
+    @property
+    def changed(self) -> bool:
+        """Whether anything was written to the new snapshot."""
+        return bool(self._copied)
+
+    def table(self, name: str) -> Dict[str, Any]:
+        """Get a table of the new snapshot that is safe to modify."""
+        if name not in self._copied:
+            setattr(self.snapshot, name, dict(getattr(self.snapshot, name)))
+            self._copied.add(name)
+        return getattr(self.snapshot, name)
+
+    def _bucket(self, index_name: str, key: str) -> Dict[str, None]:
+        """Get an index bucket of the new snapshot that is safe to modify."""
+        index = self.table(index_name)
+        marker = (index_name, key)
+        if marker not in self._copied:
+            index[key] = dict(index.get(key, {}))
+            self._copied.add(marker)
+        return index[key]
+
+    def _add_to_index(self, index_name: str, key: str, record_id: str):
+        """Add a record ID under a key of a hash index."""
+        self._bucket(index_name, key)[record_id] = None
+
+    def _remove_from_index(self, index_name: str, key: str, record_id: str):
+        """Remove a record ID from a key of a hash index."""
+        if key not in getattr(self.snapshot, index_name):
+            return
+        ids = self._bucket(index_name, key)
+        ids.pop(record_id, None)
+        if not ids:
+            del self.table(index_name)[key]
+            self._copied.discard((index_name, key))
+
+    def _add_to_count(self, key: str, delta: int):
+        """Adjust a per-company counter, dropping keys that reach zero."""
+        counts = self.table("company_counts")
+        count = counts.get(key, 0) + delta
+        if count:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+
+    def put_user(self, email: str, user: User):
+        """Store a user under an email, replacing any existing one."""
+        self.unindex_user(email)
+        self.table("users")[email] = user
+        self.index_user(email, user)
+        self.changes.append(("user", email, "upsert"))
+
+    def remove_user(self, email: str):
+        """Remove the user stored under an email."""
+        self.unindex_user(email)
+        del self.table("users")[email]
+        self.changes.append(("user", email, "delete"))
+
+    def put_study(self, study_id: str, study: Study):
+        """Store a study under an ID, replacing any existing one."""
+        self.unindex_study(study_id)
+        self.table("studies")[study_id] = study
+        self.index_study(study_id, study)
+        self.changes.append(("study", study_id, "upsert"))
+
+    def remove_study(self, study_id: str):
+        """Remove the study stored under an ID."""
+        self.unindex_study(study_id)
+        del self.table("studies")[study_id]
+        self.changes.append(("study", study_id, "delete"))
+
+    def index_user(self, email: str, user: User):
+        """Add a user to the secondary indexes."""
+        keys = (user.company_association.lower(), user.role, user.company_association)
+        self._add_to_index("users_by_company", keys[0], email)
+        self._add_to_index("users_by_role", keys[1], email)
+        self._add_to_count(keys[2], 1)
+        self.table("user_keys")[email] = keys
+
+    def unindex_user(self, email: str):
+        """Remove a user from the secondary indexes."""
+        keys = self.snapshot.user_keys.get(email)
+        if keys:
+            self._remove_from_index("users_by_company", keys[0], email)
+            self._remove_from_index("users_by_role", keys[1], email)
+            self._add_to_count(keys[2], -1)
+            del self.table("user_keys")[email]
+
+    def index_study(self, study_id: str, study: Study):
+        """Add a study to the secondary indexes."""
+        keys = (study.sponsor.lower(), study.status, study.has_principal_investigator())
+        self._add_to_index("studies_by_sponsor", keys[0], study_id)
+        self._add_to_index("studies_by_status", keys[1], study_id)
+        if not keys[2]:
+            self.snapshot.studies_without_investigator += 1
+        self.table("study_keys")[study_id] = keys
+
+    def unindex_study(self, study_id: str):
+        """Remove a study from the secondary indexes."""
+        keys = self.snapshot.study_keys.get(study_id)
+        if keys:
+            self._remove_from_index("studies_by_sponsor", keys[0], study_id)
+            self._remove_from_index("studies_by_status", keys[1], study_id)
+            if not keys[2]:
+                self.snapshot.studies_without_investigator -= 1
+            del self.table("study_keys")[study_id]
+
+
+def _collect_changes(
+    entries: Iterable[Tuple[int, str, str, str]], snapshot: DatabaseSnapshot
+) -> List[Dict[str, Any]]:
+    """Reduce change log entries to the latest change of each record."""
+    latest = {}
+    for version, record_type, record_id, op in entries:
+        latest.pop((record_type, record_id), None)
+        latest[(record_type, record_id)] = (version, op)
+    records = {"user": snapshot.users, "study": snapshot.studies}
+    return [
+        {
+            "version": version,
+            "type": record_type,
+            "id": record_id,
+            "op": op,
+            "record": records[record_type].get(record_id) if op == "upsert" else None,
+        }
+        for (record_type, record_id), (version, op) in latest.items()
+    ]
 
 
 class DatabaseManager:
-    """Database manager for handling users and studies data."""
+    """Database manager for handling users and studies data.
+
+    Reads use the current immutable snapshot without locking. Writes are
+    serialized by one lock, build a new snapshot copy-on-write and publish
+    it in a single reference assignment, so readers never see a partial
+    update. Use add_users/add_studies for bulk loads: each write call
+    copies the tables it changes once.
+
+    Every published version appends its changed record IDs to a bounded
+    change log, so clients can fetch what changed since a version.
+    """
 
     def __init__(self):
         """Initialize the database manager."""
-        self.users = {}
-        self.studies = {}
+        self._snapshot = DatabaseSnapshot()
+        self._lock = threading.Lock()
+        # (version, record type, record ID, "upsert" | "delete"), oldest first
+        self._changes = deque()
+        # Oldest version the change log can answer `since` for
+        self._changes_floor = 0
+        # Guards the change log and wakes waiters when a version is published
+        self._changed = threading.Condition()
         self._initialize_data()
 
-    def _initialize_data(self):
+    def _initialize_data(self, empty: bool = False):
         """Initialize the database with mock data."""
-        # Load users (only if not already loaded)
-        for company, users in MOCK_USERS.items():
-            for user in users:
-                if user.email_address not in self.users:
-                    self.users[user.email_address] = user
-
-        # Load studies (only if not already loaded)
-        for study in MOCK_STUDIES:
-            if study.id not in self.studies:
-                self.studies[study.id] = study
+        # Load users and studies (only if not already loaded)
+        with self._write(empty) as writer:
+            self._insert_users(
+                writer, (user for users in MOCK_USERS.values() for user in users)
+            )
+            self._insert_studies(writer, MOCK_STUDIES)
+
+    @contextmanager
+    def _write(self, empty: bool = False):
+        """Run a write against a new snapshot, publishing it on success.
+
+        With `empty`, the write starts from no data instead of the current
+        snapshot, so a reset is published as a single version.
+        """
+        with self._lock:
+            base = self._snapshot
+            if empty:
+                base = DatabaseSnapshot()
+                base.version = self._snapshot.version
+            writer = SnapshotWriter(base)
+            yield writer
+            if empty or writer.changed:
+                self._publish(writer, empty)
+
+    def _publish(self, writer: SnapshotWriter, reset: bool):
+        """Publish a written snapshot and log its changes."""
+        version = writer.snapshot.version
+        with self._changed:
+            self._snapshot = writer.snapshot
+            if reset:
+                # Changes across a reset are not logged; clients refetch
+                self._changes.clear()
+                self._changes_floor = version
+            else:
+                self._changes.extend(
+                    (version, record_type, record_id, op)
+                    for record_type, record_id, op in writer.changes
+                )
+                while len(self._changes) > CHANGE_LOG_SIZE:
+                    self._changes_floor = self._changes.popleft()[0]
+            self._changed.notify_all()
+
+    def get_snapshot(self) -> DatabaseSnapshot:
+        """Get the current snapshot; it never changes once returned."""
+        return self._snapshot
+
+    def get_version(self) -> int:
+        """Get the version of the current snapshot."""
+        return self._snapshot.version
+
+    # Change feed
+    def get_changes(self, since: int) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Get the users and studies changed after version `since`.
+
+        Returns (current version, changes) with one change per record, in
+        version order; upserts carry the current record. Returns None if the
+        change log no longer covers `since`, and the client should refetch.
+        """
+        with self._changed:
+            snapshot = self._snapshot
+            if since < self._changes_floor or since > snapshot.version:
+                return None
+            entries = []
+            for entry in reversed(self._changes):
+                if entry[0] <= since:
+                    break
+                entries.append(entry)
+        return snapshot.version, _collect_changes(reversed(entries), snapshot)
+
+    def wait_for_changes(self, since: int, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a version other than `since`."""
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: self._snapshot.version != since, timeout
+            )
+
+    def _paginate(
+        self,
+        snapshot: DatabaseSnapshot,
+        name: Tuple[str, ...],
+        keys: Iterable[str],
+        records: Dict[str, Any],
+        limit: Optional[int],
+        after: Optional[str],
+        fields: Optional[List[str]],
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Get one page of records ordered by key (email or study ID).
+
+        `after` is the last key of the previous page (a keyset cursor), so a
+        page costs O(log n + limit) and records written between requests do
+        not shift later pages. Without `limit` or `after` every record is
+        returned in insertion order. Records are models, or dicts of just
+        `fields` when a projection is requested.
+        """
+        if limit is None and not after:
+            page_keys = list(keys)
+            next_after = None
+        else:
+            sorted_keys = snapshot.get_sorted_keys(name, keys)
+            start = bisect_right(sorted_keys, after) if after else 0
+            stop = len(sorted_keys) if limit is None else start + limit
+            page_keys = sorted_keys[start:stop]
+            next_after = None
+            if page_keys and stop < len(sorted_keys):
+                next_after = page_keys[-1]
+        page = [records[key] for key in page_keys]
+        if fields:
+            page = [record.project(fields) for record in page]
+        return page, next_after
 
     # User operations
+    def list_users(
+        self,
+        company: Optional[str] = None,
+        role: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Any], Optional[str], int]:
+        """Get a page of users ordered by email, filtered by company or role.
+
+        Returns (records, cursor for the next page or None, total matching).
+        """
+        snapshot = self._snapshot
+        if company:
+            name = ("users_by_company", company.lower())
+            emails = snapshot.users_by_company.get(company.lower(), {})
+        elif role:
+            name = ("users_by_role", role)
+            emails = snapshot.users_by_role.get(role, {})
+        else:
+            name = ("users",)
+            emails = snapshot.users
+        page, next_after = self._paginate(
+            snapshot, name, emails, snapshot.users, limit, after, fields
+        )
+        return page, next_after, len(emails)
+
     def get_all_users(self) -> List[User]:
         """Get all users."""
-        return list(self.users.values())
+        return list(self._snapshot.users.values())
 
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email address."""
-        return self.users.get(email)
+        return self._snapshot.users.get(email)
 
     def get_users_by_company(self, company: str) -> List[User]:
         """Get users by company."""
-        return [
-            user
-            for user in self.users.values()
-            if user.company_association.lower() == company.lower()
-        ]
+        snapshot = self._snapshot
+        emails = snapshot.users_by_company.get(company.lower(), {})
+        return [snapshot.users[email] for email in emails]
 
     def get_users_by_role(self, role: str) -> List[User]:
         """Get users by role."""
-        return [user for user in self.users.values() if user.role == role]
+        snapshot = self._snapshot
+        return [snapshot.users[email] for email in snapshot.users_by_role.get(role, {})]
 
     def add_user(self, user: User) -> bool:
         """Add a new user."""
-        if user.email_address in self.users:
-            return False  # User already exists
-
-        self.users[user.email_address] = user
-        return True
+        return self.add_users([user]) == 1
+
+    def add_users(self, users: Iterable[User]) -> int:
+        """Add users in one write, skipping existing emails; returns number added."""
+        with self._write() as writer:
+            return self._insert_users(writer, users)
+
+    def _insert_users(self, writer: SnapshotWriter, users: Iterable[User]) -> int:
+        """Add users to the snapshot being written."""
+        added = 0
+        for user in users:
+            if user.email_address in writer.snapshot.users:
+                continue  # User already exists
+
+            writer.put_user(user.email_address, user)
+            added += 1
+        return added
+
+    def upsert_users(self, users: Iterable[User]) -> int:
+        """Add users in one write, replacing existing emails; returns number written."""
+        written = 0
+        with self._write() as writer:
+            for user in users:
+                writer.put_user(user.email_address, user)
+                written += 1
+        return written
 
     def update_user(self, email: str, updated_user: User) -> bool:
         """Update an existing user."""
-        if email not in self.users:
-            return False
+        with self._write() as writer:
+            if email not in writer.snapshot.users:
+                return False
 
-        self.users[email] = updated_user
-        return True
+            writer.put_user(email, updated_user)
+            return True
 
     def delete_user(self, email: str) -> bool:
         """Delete a user."""
-        if email not in self.users:
-            return False
+        with self._write() as writer:
+            if email not in writer.snapshot.users:
+                return False
 
-        del self.users[email]
-        return True
+            writer.remove_user(email)
+            return True
 
     # Study operations
+    def list_studies(
+        self,
+        sponsor: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Any], Optional[str], int]:
+        """Get a page of studies ordered by ID, filtered by sponsor or status.
+
+        Returns (records, cursor for the next page or None, total matching).
+        """
+        snapshot = self._snapshot
+        if sponsor:
+            name = ("studies_by_sponsor", sponsor.lower())
+            study_ids = snapshot.studies_by_sponsor.get(sponsor.lower(), {})
+        elif status:
+            name = ("studies_by_status", status)
+            study_ids = snapshot.studies_by_status.get(status, {})
+        else:
+            name = ("studies",)
+            study_ids = snapshot.studies
+        page, next_after = self._paginate(
+            snapshot, name, study_ids, snapshot.studies, limit, after, fields
+        )
+        return page, next_after, len(study_ids)
+
     def get_all_studies(self) -> List[Study]:
         """Get all studies."""
-        return list(self.studies.values())
+        return list(self._snapshot.studies.values())
 
     def get_study_by_id(self, study_id: str) -> Optional[Study]:
         """Get study by ID."""
-        return self.studies.get(study_id)
+        return self._snapshot.studies.get(study_id)
 
     def get_studies_by_sponsor(self, sponsor: str) -> List[Study]:
         """Get studies by sponsor."""
-        return [
-            study
-            for study in self.studies.values()
-            if study.sponsor.lower() == sponsor.lower()
-        ]
+        snapshot = self._snapshot
+        study_ids = snapshot.studies_by_sponsor.get(sponsor.lower(), {})
+        return [snapshot.studies[study_id] for study_id in study_ids]
 
     def get_studies_by_status(self, status: str) -> List[Study]:
         """Get studies by status."""
-        return [study for study in self.studies.values() if study.status == status]
+        snapshot = self._snapshot
+        study_ids = snapshot.studies_by_status.get(status, {})
+        return [snapshot.studies[study_id] for study_id in study_ids]
 
     def add_study(self, study: Study) -> bool:
         """Add a new study."""
-        if study.id in self.studies:
-            return False  # Study already exists
-
-        self.studies[study.id] = study
-        return True
+        return self.add_studies([study]) == 1
+
+    def add_studies(self, studies: Iterable[Study]) -> int:
+        """Add studies in one write, skipping existing IDs; returns number added."""
+        with self._write() as writer:
+            return self._insert_studies(writer, studies)
+
+    def _insert_studies(self, writer: SnapshotWriter, studies: Iterable[Study]) -> int:
+        """Add studies to the snapshot being written."""
+        added = 0
+        for study in studies:
+            if study.id in writer.snapshot.studies:
+                continue  # Study already exists
+
+            writer.put_study(study.id, study)
+            added += 1
+        return added
+
+    def upsert_studies(self, studies: Iterable[Study]) -> int:
+        """Add studies in one write, replacing existing IDs; returns number written."""
+        written = 0
+        with self._write() as writer:
+            for study in studies:
+                writer.put_study(study.id, study)
+                written += 1
+        return written
 
     def update_study(self, study_id: str, updated_study: Study) -> bool:
         """Update an existing study."""
-        if study_id not in self.studies:
-            return False
+        with self._write() as writer:
+            if study_id not in writer.snapshot.studies:
+                return False
 
-        self.studies[study_id] = updated_study
-        return True
+            writer.put_study(study_id, updated_study)
+            return True
 
     def delete_study(self, study_id: str) -> bool:
         """Delete a study."""
-        if study_id not in self.studies:
-            return False
+        with self._write() as writer:
+            if study_id not in writer.snapshot.studies:
+                return False
 
-        del self.studies[study_id]
-        return True
+            writer.remove_study(study_id)
+            return True
 
     def add_investigator_to_study(
         self, study_id: str, investigator: Dict[str, str]
     ) -> bool:
         """Add principal investigator to a study."""
-        study = self.get_study_by_id(study_id)
-        if not study:
-            return False
+        with self._write() as writer:
+            study = writer.snapshot.studies.get(study_id)
+            if not study:
+                return False
 
-        study.set_principal_investigator(investigator)
-        return True
+            # Change a copy; readers of older snapshots keep the original
+            study = copy.copy(study)
+            study.set_principal_investigator(investigator)
+            writer.put_study(study_id, study)
+            return True
 
     # Statistics
     def get_user_count(self) -> int:
         """Get total number of users."""
-        return len(self.users)
+        return len(self._snapshot.users)
 
     def get_study_count(self) -> int:
         """Get total number of studies."""
-        return len(self.studies)
+        return len(self._snapshot.studies)
 
     def get_users_by_company_count(self) -> Dict[str, int]:
         """Get user count by company."""
-        counts = {}
-        for user in self.users.values():
-            company = user.company_association
-            counts[company] = counts.get(company, 0) + 1
-        return counts
+        return dict(self._snapshot.company_counts)
 
     def get_studies_by_status_count(self) -> Dict[str, int]:
         """Get study count by status."""
-        counts = {}
-        for study in self.studies.values():
-            status = study.status
-            counts[status] = counts.get(status, 0) + 1
-        return counts
+        return {
+            status: len(study_ids)
+            for status, study_ids in self._snapshot.studies_by_status.items()
+        }
 
     def get_studies_without_investigator_count(self) -> int:
         """Get count of studies without principal investigator."""
-        return len(
-            [
-                study
-                for study in self.studies.values()
-                if not study.has_principal_investigator()
-            ]
-        )
+        return self._snapshot.studies_without_investigator
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get all statistics counters from the current snapshot."""
+        return self.get_statistics_of(self._snapshot)
+
+    def get_statistics_of(self, snapshot: DatabaseSnapshot) -> Dict[str, Any]:
+        """Get all statistics counters of a snapshot."""
+        return {
+            "total_users": len(snapshot.users),
+            "total_studies": len(snapshot.studies),
+            "users_by_company": dict(snapshot.company_counts),
+            "studies_by_status": {
+                status: len(study_ids)
+                for status, study_ids in snapshot.studies_by_status.items()
+            },
+            "studies_without_investigator": snapshot.studies_without_investigator,
+        }
+
+    def _scan_statistics(self, snapshot: DatabaseSnapshot) -> Dict[str, Any]:
+        """Recompute the statistics by scanning every record of a snapshot."""
+        users_by_company = {}
+        for user in snapshot.users.values():
+            company = user.company_association
+            users_by_company[company] = users_by_company.get(company, 0) + 1
+        studies_by_status = {}
+        for study in snapshot.studies.values():
+            studies_by_status[study.status] = studies_by_status.get(study.status, 0) + 1
+        return {
+            "total_users": len(snapshot.users),
+            "total_studies": len(snapshot.studies),
+            "users_by_company": users_by_company,
+            "studies_by_status": studies_by_status,
+            "studies_without_investigator": len(
+                [
+                    study
+                    for study in snapshot.studies.values()
+                    if not study.has_principal_investigator()
+                ]
+            ),
+        }
+
+    def check_statistics(self) -> Dict[str, Any]:
+        """Compare the maintained counters against a full scan."""
+        snapshot = self._snapshot
+        maintained = self.get_statistics_of(snapshot)
+        actual = self._scan_statistics(snapshot)
+        mismatches = []
+        for name, value in actual.items():
+            if isinstance(value, dict):
+                for key in sorted(set(value) | set(maintained[name])):
+                    if value.get(key, 0) != maintained[name].get(key, 0):
+                        mismatches.append(
+                            {
+                                "counter": name,
+                                "key": key,
+                                "maintained": maintained[name].get(key, 0),
+                                "actual": value.get(key, 0),
+                            }
+                        )
+            elif value != maintained[name]:
+                mismatches.append(
+                    {
+                        "counter": name,
+                        "key": None,
+                        "maintained": maintained[name],
+                        "actual": value,
+                    }
+                )
+        return {"consistent": not mismatches, "mismatches": mismatches}
 
     # Database management
     def clear_all_data(self):
         """Clear all data from the database."""
-        self.users.clear()
-        self.studies.clear()
+        with self._write(empty=True):
+            pass
 
     def reset_to_mock_data(self):
         """Reset database to initial mock data."""
-        self.clear_all_data()
-        self._initialize_data()
+        self._initialize_data(empty=True)
 
     def ensure_data_loaded(self):
         """Ensure all mock data is loaded (safe to call multiple times)."""
@@ -185,21 +675,37 @@ class DatabaseManager:
 
     def export_data(self) -> Dict[str, Any]:
         """Export all data as dictionaries."""
+        snapshot = self._snapshot
         return {
-            "users": [user.to_dict() for user in self.users.values()],
-            "studies": [study.to_dict() for study in self.studies.values()],
-            "statistics": {
-                "total_users": self.get_user_count(),
-                "total_studies": self.get_study_count(),
-                "users_by_company": self.get_users_by_company_count(),
-                "studies_by_status": self.get_studies_by_status_count(),
-                "studies_without_investigator": self.get_studies_without_investigator_count(),
-            },
+            "users": [user.to_dict() for user in snapshot.users.values()],
+            "studies": [study.to_dict() for study in snapshot.studies.values()],
+            "statistics": self.get_statistics_of(snapshot),
         }
 
+    def export_records(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield ("user" | "study", encoded JSON) for every record.
+
+        Records come from the current snapshot, so the export is consistent
+        while writes continue.
+        """
+        snapshot = self._snapshot
+        for user in snapshot.users.values():
+            yield "user", user.to_json()
+        for study in snapshot.studies.values():
+            yield "study", study.to_json()
+
+
+def create_database_manager():
+    """Create the database manager selected by DATABASE_BACKEND."""
+    if DATABASE_BACKEND == "memory":
+        return DatabaseManager()
+    from sqlite_database_manager import SQLiteDatabaseManager
+
+    return SQLiteDatabaseManager(DATABASE_PATH)
+
 
 # Global database manager instance
-db_manager = DatabaseManager()
+db_manager = create_database_manager()
 
 
 # Convenience functions that use the global database manager
@@ -240,10 +746,9 @@ def add_investigator_to_study(study_id: str, investigator: Dict[str, str]) -> bo
 
 def get_database_statistics() -> Dict[str, Any]:
     """Get database statistics."""
-    return {
-        "total_users": db_manager.get_user_count(),
-        "total_studies": db_manager.get_study_count(),
-        "users_by_company": db_manager.get_users_by_company_count(),
-        "studies_by_status": db_manager.get_studies_by_status_count(),
-        "studies_without_investigator": db_manager.get_studies_without_investigator_count(),
-    }
+    return db_manager.get_statistics()
+
+
+def check_database_statistics() -> Dict[str, Any]:
+    """Check the maintained statistics against a full scan."""
+    return db_manager.check_statistics()
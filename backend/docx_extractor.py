@@ -0,0 +1,126 @@
+"""
+Streaming DOCX text extraction for the SDV Platform backend.
+Reads `word/document.xml` straight out of the zip archive with an
+incremental XML parser, so memory stays bounded by the largest paragraph or
+table row rather than the size of the document. The parser only uses the
+standard library; the Mock Trial Site backend keeps a copy in
+`docx_parser.py`.
+"""
+
+import zipfile
+from typing import IO, Iterator, List, Optional, Tuple, Union
+from xml.etree.ElementTree import iterparse
+
+W_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCUMENT_PART = "word/document.xml"
+CELL_SEPARATOR = " | "
+
+# Tag names with the WordprocessingML namespace
+W_BODY = f"{W_NAMESPACE}body"
+W_P = f"{W_NAMESPACE}p"
+W_T = f"{W_NAMESPACE}t"
+W_TAB = f"{W_NAMESPACE}tab"
+W_BR = f"{W_NAMESPACE}br"
+W_CR = f"{W_NAMESPACE}cr"
+W_TBL = f"{W_NAMESPACE}tbl"
+W_TR = f"{W_NAMESPACE}tr"
+W_TC = f"{W_NAMESPACE}tc"
+
+
+def iter_docx_blocks(source: Union[str, IO[bytes]]) -> Iterator[str]:
+    """Yield paragraphs and table rows (cells joined by ' | ') in document order.
+
+    `source` is a file path or a binary file object of a .docx file.
+    """
+    try:
+        with zipfile.ZipFile(source) as archive:
+            with archive.open(DOCUMENT_PART) as document:
+                for kind, value in iter_document_parts(document):
+                    if kind == "paragraph":
+                        yield value
+                    elif kind == "row":
+                        yield CELL_SEPARATOR.join(value)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise Exception(f"Invalid DOCX file: {str(e)}")
+
+
+def iter_document_parts(
+    stream: IO[bytes],
+) -> Iterator[Tuple[str, Optional[Union[str, List[str]]]]]:
+    """Walk document.xml events, emitting parts of the body as they complete.
+
+    Yields ("paragraph", text) for non-empty paragraphs, ("row", cells) for
+    non-empty rows of top-level tables and ("table", None) when a top-level
+    table ends, all in document order. A table nested in a cell becomes part
+    of that cell's text. Raises xml.etree.ElementTree.ParseError on bad XML.
+    """
+    body = None
+    depth = 0
+    body_depth = None
+    runs = []  # text of the paragraph being read
+    tables = []  # one {"row": [...], "cell": [...]} per open (nested) table
+
+    for event, elem in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            tag = elem.tag
+            if tag == W_BODY:
+                body = elem
+                body_depth = depth
+            elif tag == W_TBL:
+                tables.append({"row": None, "cell": None})
+            elif tag == W_TR and tables:
+                tables[-1]["row"] = []
+            elif tag == W_TC and tables:
+                tables[-1]["cell"] = []
+            continue
+
+        tag = elem.tag
+        if tag == W_T:
+            runs.append(elem.text or "")
+        elif tag == W_TAB:
+            runs.append("\t")
+        elif tag in (W_BR, W_CR):
+            runs.append("\n")
+        elif tag == W_P:
+            text = "".join(runs).strip()
+            runs = []
+            if tables and tables[-1]["cell"] is not None:
+                tables[-1]["cell"].append(text)
+            elif text:
+                yield "paragraph", text
+        elif tag == W_TC and tables:
+            cell = tables[-1]["cell"] or []
+            if tables[-1]["row"] is not None:
+                tables[-1]["row"].append(" ".join(p for p in cell if p))
+            tables[-1]["cell"] = None
+        elif tag == W_TR and tables:
+            row = tables[-1]["row"] or []
+            tables[-1]["row"] = None
+            if any(row):
+                row_text = CELL_SEPARATOR.join(row)
+                # Rows of a nested table become text of the enclosing cell
+                if len(tables) > 1 and tables[-2]["cell"] is not None:
+                    tables[-2]["cell"].append(row_text)
+                else:
+                    yield "row", row
+        elif tag == W_TBL and tables:
+            tables.pop()
+            if not tables:
+                yield "table", None
+
+        # Drop finished paragraphs, rows and top-level blocks so the parsed
+        # tree never grows with the document
+        if tag in (W_P, W_TR):
+            elem.clear()
+        if body is not None and depth == body_depth + 1:
+            body.clear()
+        depth -= 1
+
+
+def extract_text_from_docx(source: Union[str, IO[bytes]]) -> str:
+    """Extract text content from a DOCX file path or binary file object."""
+    try:
+        return "\n".join(iter_docx_blocks(source)).strip()
+    except Exception as e:
+        raise Exception(f"Error extracting text from DOCX: {str(e)}")
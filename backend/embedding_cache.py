@@ -0,0 +1,345 @@
+"""
+Persistent embedding cache for the SDV Platform backend.
+Vectors are stored by content hash in a memory-mapped NumPy file with a
+SQLite index, so re-uploads, re-indexing and collection rebuilds reuse
+embeddings for text that has not changed. Several server worker processes
+can share one cache directory: writes take a SQLite write lock and every
+process re-maps the vectors file when another one grows or compacts it.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# SQLite limits the number of bound parameters per statement
+SQL_BATCH_SIZE = 500
+MIN_CAPACITY = 1024
+
+
+class EmbeddingCache:
+    """Content-hash keyed vector store backed by a memmap and SQLite."""
+
+    def __init__(self, directory: str):
+        """Open (or create) the cache in `directory`."""
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._connection()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "content_hash TEXT PRIMARY KEY, row INTEGER NOT NULL, "
+            "last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+        settings = dict(self._conn.execute("SELECT key, value FROM settings"))
+        self.dimension = int(settings["dimension"]) if "dimension" in settings else None
+        # Compaction writes a new vectors file per generation so the index
+        # and the file it points at are always switched together
+        self.generation = int(settings.get("generation", 0))
+        self._vectors = None
+        self._capacity = 0
+        self._open_vectors()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the index connection, reopening it after a fork."""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(
+                os.path.join(self.directory, "index.sqlite3"),
+                check_same_thread=False,
+                timeout=30,
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def _sync_settings(self):
+        """Pick up a dimension or generation written by another process."""
+        settings = dict(self._connection().execute("SELECT key, value FROM settings"))
+        if self.dimension is None and "dimension" in settings:
+            self.dimension = int(settings["dimension"])
+        generation = int(settings.get("generation", 0))
+        if generation != self.generation or self._vectors is None:
+            self.generation = generation
+            self._open_vectors()
+
+    def _vectors_path(self, generation: Optional[int] = None) -> str:
+        """Get the vectors file path for a generation."""
+        if generation is None:
+            generation = self.generation
+        return os.path.join(self.directory, f"vectors-{generation}.f32")
+
+    def _open_vectors(self):
+        """Map the current vectors file into memory."""
+        self._vectors = None
+        self._capacity = 0
+        path = self._vectors_path()
+        if self.dimension is None or not os.path.exists(path):
+            return
+        capacity = os.path.getsize(path) // (self.dimension * 4)
+        if capacity:
+            self._vectors = np.memmap(
+                path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension)
+            )
+            self._capacity = capacity
+
+    def _ensure_capacity(self, rows: int):
+        """Grow the vectors file so it can hold `rows` rows.
+
+        Called with the write lock held. Another process may have grown the
+        file since it was mapped here, so the mapping is refreshed from the
+        file's current size first and the file is never truncated below it.
+        """
+        path = self._vectors_path()
+        if os.path.exists(path):
+            if os.path.getsize(path) // (self.dimension * 4) > self._capacity:
+                self._open_vectors()
+        if rows <= self._capacity:
+            return
+        new_capacity = max(rows, self._capacity * 2, MIN_CAPACITY)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path(), "ab") as f:
+            f.truncate(new_capacity * self.dimension * 4)
+        self._open_vectors()
+
+    def _next_row(self) -> int:
+        """Get the first row after every referenced row."""
+        (max_row,) = (
+            self._connection().execute("SELECT MAX(row) FROM embeddings").fetchone()
+        )
+        return 0 if max_row is None else max_row + 1
+
+    def get_many(self, content_hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Look up vectors for hashes, returning only the ones present."""
+        found = {}
+        with self._lock:
+            conn = self._connection()
+            self._sync_settings()
+            if self._vectors is None:
+                return found
+            unique_hashes = list(dict.fromkeys(content_hashes))
+            for start in range(0, len(unique_hashes), SQL_BATCH_SIZE):
+                batch = unique_hashes[start : start + SQL_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                for content_hash, row in conn.execute(
+                    f"SELECT content_hash, row FROM embeddings "
+                    f"WHERE content_hash IN ({placeholders})",
+                    batch,
+                ):
+                    if row >= self._capacity:
+                        # Another process grew the vectors file
+                        self._open_vectors()
+                    found[content_hash] = np.array(self._vectors[row])
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE content_hash = ?",
+                    [(now, content_hash) for content_hash in found],
+                )
+                conn.commit()
+        return found
+
+    def put_many(self, content_hashes: Sequence[str], vectors: Sequence[Any]):
+        """Store vectors for hashes in one batch."""
+        if not content_hashes:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            conn = self._connection()
+            # Hold the write lock while allocating rows so concurrent
+            # processes never write the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync_settings()
+                if self.dimension is None:
+                    self.dimension = matrix.shape[1]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                        ("dimension", str(self.dimension)),
+                    )
+                elif matrix.shape[1] != self.dimension:
+                    raise ValueError(
+                        f"Embedding dimension {matrix.shape[1]} does not match "
+                        f"cache dimension {self.dimension}"
+                    )
+
+                first_row = self._next_row()
+                self._ensure_capacity(first_row + len(content_hashes))
+                self._vectors[first_row : first_row + len(content_hashes)] = matrix
+                self._vectors.flush()
+
+                now = time.time()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (content_hash, row, last_used) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (content_hash, first_row + i, now)
+                        for i, content_hash in enumerate(content_hashes)
+                    ],
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def compact(self, max_age_seconds: Optional[float] = None) -> Dict[str, int]:
+        """Drop stale entries and rewrite the vectors file without gaps.
+
+        On failure the index transaction is rolled back and the partly
+        written vectors file is removed, so the cache is left as it was.
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            new_path = None
+            try:
+                self._sync_settings()
+                bytes_before = self.get_file_size()
+                removed = 0
+                if max_age_seconds is not None:
+                    removed = conn.execute(
+                        "DELETE FROM embeddings WHERE last_used < ?",
+                        (time.time() - max_age_seconds,),
+                    ).rowcount
+
+                rows = conn.execute(
+                    "SELECT content_hash, row FROM embeddings ORDER BY row"
+                ).fetchall()
+                old_path = self._vectors_path()
+                new_generation = self.generation + 1
+
+                if rows and self._vectors is not None:
+                    new_path = self._vectors_path(new_generation)
+                    new_vectors = np.memmap(
+                        new_path,
+                        dtype=np.float32,
+                        mode="w+",
+                        shape=(len(rows), self.dimension),
+                    )
+                    for new_row, (_, old_row) in enumerate(rows):
+                        new_vectors[new_row] = self._vectors[old_row]
+                    new_vectors.flush()
+                    del new_vectors
+
+                conn.executemany(
+                    "UPDATE embeddings SET row = ? WHERE content_hash = ?",
+                    [
+                        (new_row, content_hash)
+                        for new_row, (content_hash, _) in enumerate(rows)
+                    ],
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                    ("generation", str(new_generation)),
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                if new_path is not None and os.path.exists(new_path):
+                    os.remove(new_path)
+                raise
+
+            self._vectors = None
+            self.generation = new_generation
+            if os.path.exists(old_path):
+                os.remove(old_path)
+            self._open_vectors()
+
+            return {
+                "removed": removed,
+                "entries": len(rows),
+                "bytes_before": bytes_before,
+                "bytes_after": self.get_file_size(),
+            }
+
+    def get_entry_count(self) -> int:
+        """Get number of cached vectors."""
+        with self._lock:
+            (count,) = (
+                self._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()
+            )
+        return count
+
+    def get_file_size(self) -> int:
+        """Get size of the vectors file in bytes."""
+        path = self._vectors_path()
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+class CachedEmbeddingFunction:
+    """ChromaDB embedding function that consults an EmbeddingCache first."""
+
+    def __init__(
+        self,
+        embedding_function: Callable,
+        cache: EmbeddingCache,
+        namespace: Optional[str] = None,
+    ):
+        """Wrap `embedding_function`; `namespace` separates different models."""
+        self.embedding_function = embedding_function
+        self.cache = cache
+        self.namespace = namespace or type(embedding_function).__name__
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def content_hash(self, text: str) -> str:
+        """Hash text together with the model namespace."""
+        return hashlib.sha256(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def __call__(self, input: Sequence[str]) -> List[List[float]]:
+        """Embed texts, computing only the ones missing from the cache."""
+        hashes = [self.content_hash(text) for text in input]
+        vectors = self.cache.get_many(hashes)
+
+        missing = {}
+        for content_hash, text in zip(hashes, input):
+            if content_hash not in vectors:
+                missing.setdefault(content_hash, text)
+        if missing:
+            computed = self.embedding_function(list(missing.values()))
+            self.cache.put_many(list(missing), computed)
+            for content_hash, vector in zip(missing, computed):
+                vectors[content_hash] = np.asarray(vector, dtype=np.float32)
+
+        with self._stats_lock:
+            self.misses += len(missing)
+            self.hits += len(hashes) - len(missing)
+        return [vectors[content_hash].tolist() for content_hash in hashes]
+
+    def embed_uncached(self, input: Sequence[str]) -> List[List[float]]:
+        """Embed texts with the wrapped model, bypassing the cache.
+
+        For one-off text such as search queries, which would only fill the
+        cache and add an index write to every lookup.
+        """
+        return [
+            np.asarray(vector, dtype=np.float32).tolist()
+            for vector in self.embedding_function(list(input))
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit rate and storage statistics."""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            hits, misses = self.hits, self.misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": self.cache.get_entry_count(),
+            "dimension": self.cache.dimension,
+            "file_bytes": self.cache.get_file_size(),
+        }
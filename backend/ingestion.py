@@ -0,0 +1,366 @@
+"""
+Ingestion queue for the SDV Platform backend.
+Uploads are spooled to disk by the request handler and processed
+(extraction, chunking, embedding) by a background worker pool, while
+clients poll the job status. Job status can be mirrored to a SQLite job
+store so any server worker process can answer a status poll, and jobs
+left unfinished by a stopped server are picked up again when it restarts.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class IngestionJob:
+    """Status of one spooled upload."""
+
+    def __init__(
+        self,
+        job_id: str,
+        document_id: str,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        metadata: Dict[str, Any],
+        file_type: Optional[str] = None,
+    ):
+        self.id = job_id
+        self.document_id = document_id
+        self.filename = filename
+        self.file_path = file_path
+        self.file_size = file_size
+        self.metadata = metadata
+        # Taken from the original upload name, which the spooled name may have lost
+        self.file_type = file_type or metadata.get("file_type")
+        self.status = "queued"  # 'queued', 'extracting', 'chunking', 'embedding', 'completed', 'failed'
+        self.total_chunks = 0
+        self.processed_chunks = 0
+        self.content_length = 0
+        self.error = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.on_update = None  # called with the job after every update
+        self._lock = threading.Lock()
+
+    def update(self, **fields):
+        """Update job fields and bump the modification time."""
+        with self._lock:
+            for key, value in fields.items():
+                setattr(self, key, value)
+            self.updated_at = datetime.now()
+        if self.on_update:
+            self.on_update(self)
+
+    def is_finished(self) -> bool:
+        """Check if the job has completed or failed."""
+        return self.status in ("completed", "failed")
+
+    def get_progress(self) -> float:
+        """Get embedding progress as a fraction between 0 and 1."""
+        if self.status == "completed":
+            return 1.0
+        if not self.total_chunks:
+            return 0.0
+        return self.processed_chunks / self.total_chunks
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert job to dictionary."""
+        with self._lock:
+            return {
+                "job_id": self.id,
+                "document_id": self.document_id,
+                "filename": self.filename,
+                "file_size": self.file_size,
+                "file_type": self.file_type,
+                "status": self.status,
+                "progress": self.get_progress(),
+                "total_chunks": self.total_chunks,
+                "processed_chunks": self.processed_chunks,
+                "content_length": self.content_length,
+                "error": self.error,
+                "createdAt": self.created_at.isoformat(),
+                "updatedAt": self.updated_at.isoformat(),
+            }
+
+
+class IngestionJobStore:
+    """SQLite table of job status dictionaries shared between processes.
+
+    Each row also keeps what is needed to run the job again (`spec`) and the
+    ID of the process running it (`owner`), so unfinished jobs can be resumed.
+    Like the queue's in-memory history, only the most recent `max_history`
+    jobs are kept; the oldest finished ones are deleted first.
+    """
+
+    def __init__(self, path: str, max_history: int = 1000):
+        """Open (or create) the job store at `path`."""
+        self.path = path
+        self.max_history = max_history
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+            columns = {
+                row[1] for row in connection.execute("PRAGMA table_info(jobs)")
+            }
+            if "spec" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN spec TEXT")
+            if "owner" not in columns:
+                connection.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+            if "finished" not in columns:
+                connection.execute(
+                    "ALTER TABLE jobs ADD COLUMN finished INTEGER NOT NULL DEFAULT 0"
+                )
+                connection.executemany(
+                    "UPDATE jobs SET finished = 1 WHERE id = ?",
+                    [
+                        (job_id,)
+                        for job_id, data in connection.execute(
+                            "SELECT id, data FROM jobs"
+                        )
+                        if json.loads(data)["status"] in ("completed", "failed")
+                    ],
+                )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, reopening it after a fork."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def save(self, job: IngestionJob):
+        """Store the current status of a job, owned by this process."""
+        spec = {
+            "document_id": job.document_id,
+            "filename": job.filename,
+            "file_path": job.file_path,
+            "file_size": job.file_size,
+            "file_type": job.file_type,
+            "metadata": job.metadata,
+            "created_at": job.created_at.isoformat(),
+        }
+        finished = job.is_finished()
+        with self._connection() as connection:
+            # Replacing the row gives it a new rowid, so rowid order is save order
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs (id, data, spec, owner, finished) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    job.id,
+                    json.dumps(job.to_dict()),
+                    json.dumps(spec),
+                    os.getpid(),
+                    int(finished),
+                ),
+            )
+            if finished:
+                self._prune(connection)
+
+    def _prune(self, connection: sqlite3.Connection):
+        """Delete the oldest finished jobs beyond the history limit."""
+        (count,) = connection.execute("SELECT COUNT(*) FROM jobs").fetchone()
+        excess = count - self.max_history
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM jobs WHERE rowid IN (SELECT rowid FROM jobs "
+                "WHERE finished = 1 ORDER BY rowid LIMIT ?)",
+                (excess,),
+            )
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a stored job status by ID."""
+        row = (
+            self._connection()
+            .execute("SELECT data FROM jobs WHERE id = ?", (job_id,))
+            .fetchone()
+        )
+        return json.loads(row[0]) if row else None
+
+    def claim_unfinished(
+        self, is_abandoned: Callable[[str, Optional[int]], bool]
+    ) -> List[IngestionJob]:
+        """Take over unfinished jobs whose owner `is_abandoned(job_id, owner)`.
+
+        A job is claimed by switching its owner to this process only if the
+        owner is still the one that was checked, so when several processes
+        resume at once each job is claimed by exactly one of them.
+        """
+        connection = self._connection()
+        rows = connection.execute(
+            "SELECT id, data, spec, owner FROM jobs WHERE spec IS NOT NULL"
+        ).fetchall()
+        claimed = []
+        for job_id, data, spec, owner in rows:
+            status = json.loads(data)
+            if status["status"] in ("completed", "failed"):
+                continue
+            if not is_abandoned(job_id, owner):
+                continue
+            with connection:
+                taken = connection.execute(
+                    "UPDATE jobs SET owner = ? WHERE id = ? AND owner IS ?",
+                    (os.getpid(), job_id, owner),
+                ).rowcount
+            if not taken:
+                continue
+            spec = json.loads(spec)
+            job = IngestionJob(
+                job_id=job_id,
+                document_id=spec["document_id"],
+                filename=spec["filename"],
+                file_path=spec["file_path"],
+                file_size=spec["file_size"],
+                metadata=spec["metadata"],
+                file_type=spec["file_type"],
+            )
+            job.created_at = datetime.fromisoformat(spec["created_at"])
+            claimed.append(job)
+        return claimed
+
+
+def _process_exists(pid: int) -> bool:
+    """Check if a process with this ID is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class IngestionQueue:
+    """Runs ingestion jobs on a thread pool and keeps their status."""
+
+    def __init__(
+        self,
+        process_job: Callable[[IngestionJob], None],
+        max_workers: int = 2,
+        max_history: int = 1000,
+        store: Optional[IngestionJobStore] = None,
+    ):
+        """Initialize the queue with the function that processes one job."""
+        self.process_job = process_job
+        self.max_history = max_history
+        self.store = store
+        self.jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ingestion"
+        )
+
+    def submit(
+        self,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        metadata: Dict[str, Any],
+        job_id: Optional[str] = None,
+        file_type: Optional[str] = None,
+    ) -> IngestionJob:
+        """Queue a spooled file for ingestion.
+
+        `file_type` selects the extractor; it defaults to metadata["file_type"].
+        """
+        job = IngestionJob(
+            job_id=job_id or str(uuid.uuid4()),
+            document_id=str(uuid.uuid4()),
+            filename=filename,
+            file_path=file_path,
+            file_size=file_size,
+            metadata=metadata,
+            file_type=file_type,
+        )
+        if self.store:
+            self.store.save(job)
+        self._enqueue(job)
+        return job
+
+    def _enqueue(self, job: IngestionJob):
+        """Track a job and hand it to the worker pool."""
+        if self.store:
+            job.on_update = self.store.save
+        with self._lock:
+            self.jobs[job.id] = job
+            self._evict_finished_jobs()
+        self._executor.submit(self._run, job)
+
+    def resume_unfinished(self) -> int:
+        """Requeue stored jobs that a stopped process left queued or running.
+
+        Jobs owned by another running process are left to it. Jobs whose
+        spooled file is gone are marked failed. Returns the number requeued.
+        """
+        if not self.store:
+            return 0
+
+        def is_abandoned(job_id: str, owner: Optional[int]) -> bool:
+            if owner is None:
+                return True
+            if owner == os.getpid():
+                # A restarted server can get its old process ID back
+                return self.get_job(job_id) is None
+            return not _process_exists(owner)
+
+        resumed = 0
+        for job in self.store.claim_unfinished(is_abandoned):
+            if not os.path.exists(job.file_path):
+                job.update(
+                    status="failed", error="Uploaded file is no longer available"
+                )
+                self.store.save(job)
+                continue
+            self.store.save(job)
+            self._enqueue(job)
+            resumed += 1
+        return resumed
+
+    def _run(self, job: IngestionJob):
+        """Process a job, recording any failure on the job itself."""
+        try:
+            self.process_job(job)
+            job.update(status="completed")
+        except Exception as e:
+            job.update(status="failed", error=str(e))
+
+    def _evict_finished_jobs(self):
+        """Drop the oldest finished jobs beyond the history limit."""
+        excess = len(self.jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in [
+            job_id for job_id, job in self.jobs.items() if job.is_finished()
+        ][:excess]:
+            del self.jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """Get job by ID."""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def get_job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status, including jobs run by other worker processes."""
+        job = self.get_job(job_id)
+        if job:
+            return job.to_dict()
+        return self.store.load(job_id) if self.store else None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get job count by status."""
+        counts = {}
+        with self._lock:
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
@@ -0,0 +1,266 @@
+"""
+Keyword index for the SDV Platform backend.
+A local BM25 inverted index kept alongside the ChromaDB `documents`
+collection so exact identifiers (subject IDs, protocol numbers, lab codes,
+drug names) can be matched without going through the embedding model.
+Every change goes through the log, and each process replays entries appended
+by other server worker processes before reading or writing. Once the log
+holds several entries per indexed document it is rewritten with one entry
+each, and other processes rebuild from the new file when they notice it.
+"""
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single development process
+    fcntl = None
+
+# Identifiers such as PROT-001, SUB_1 or 5.2mg stay together as one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+TOKEN_SPLIT_PATTERN = re.compile(r"[-_./]")
+
+# The log is compacted once it has this many entries and more than
+# COMPACT_RATIO entries per indexed document
+COMPACT_MIN_ENTRIES = 1000
+COMPACT_RATIO = 2
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, keeping compound identifiers whole."""
+    terms = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        terms.append(token)
+        parts = TOKEN_SPLIT_PATTERN.split(token)
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part)
+    return terms
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]], k: int = 60
+) -> List[Tuple[str, float]]:
+    """Fuse several ranked id lists into one list of (id, score)."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class KeywordIndex:
+    """BM25 inverted index persisted as an append-only JSON lines log."""
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        """Initialize the index, replaying the log at `path` if it exists."""
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.postings = {}  # term -> {doc_id: term frequency}
+        self.doc_lengths = {}  # doc_id -> number of terms
+        self.doc_terms = {}  # doc_id -> distinct terms, for removal
+        self.total_length = 0
+        self._offset = 0  # bytes of the log already replayed
+        self._log_entries = 0  # entries in the log, live or superseded
+        # The log stays open so its inode cannot be reused while it is read;
+        # a different inode at `path` means another process compacted it
+        self._file = None
+        self._pid = None
+        self._lock = threading.Lock()
+        with self._lock:
+            self._load()
+
+    def _reset(self):
+        """Empty the in-memory index (caller holds the lock)."""
+        self.postings = {}
+        self.doc_lengths = {}
+        self.doc_terms = {}
+        self.total_length = 0
+        self._offset = 0
+        self._log_entries = 0
+
+    def _load(self):
+        """Replay log entries appended since the last replay (caller holds the lock)."""
+        if not self.path:
+            return
+        try:
+            log_stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if self._file is not None and self._pid != os.getpid():
+            # Forked: reading through the parent's handle would share its position
+            self._file = open(self.path, "rb")
+            self._pid = os.getpid()
+        replaced = (
+            self._file is not None
+            and os.fstat(self._file.fileno()).st_ino != log_stat.st_ino
+        )
+        if self._file is None or replaced:
+            if replaced:
+                self._file.close()
+                self._reset()
+            self._file = open(self.path, "rb")
+            self._pid = os.getpid()
+        if log_stat.st_size <= self._offset:
+            return
+        self._file.seek(self._offset)
+        for line in self._file:
+            # Stop at a line another process is still writing
+            if not line.endswith(b"\n"):
+                break
+            self._offset += len(line)
+            if not line.strip():
+                continue
+            self._log_entries += 1
+            self._apply(json.loads(line))
+
+    @contextmanager
+    def _log_lock(self):
+        """Hold the lock processes take to write the log (caller holds the lock)."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _apply(self, entry: Dict):
+        """Apply one log entry to the in-memory index (caller holds the lock)."""
+        if entry["op"] == "add":
+            self._add(entry["id"], entry["terms"])
+        elif entry["op"] == "remove":
+            self._remove(entry["id"])
+
+    def _append_log(self, entry: Dict):
+        """Append one operation to the log and apply it (caller holds the lock)."""
+        if not self.path:
+            self._apply(entry)
+            return
+        with self._log_lock():
+            with open(self.path, "ab") as f:
+                f.write((json.dumps(entry) + "\n").encode("utf-8"))
+            self._load()
+            if self._log_entries >= COMPACT_MIN_ENTRIES and (
+                self._log_entries > COMPACT_RATIO * len(self.doc_lengths)
+            ):
+                self._compact()
+
+    def _compact(self):
+        """Rewrite the log with one entry per indexed document.
+
+        The caller holds both locks. The new log replaces the old one in a
+        single rename, so readers see either of them whole.
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            for doc_id, terms in self.doc_terms.items():
+                term_counts = {term: self.postings[term][doc_id] for term in terms}
+                entry = {"op": "add", "id": doc_id, "terms": term_counts}
+                f.write((json.dumps(entry) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+        self._file.close()
+        self._file = open(self.path, "rb")
+        self._pid = os.getpid()
+        self._offset = os.fstat(self._file.fileno()).st_size
+        self._log_entries = len(self.doc_terms)
+
+    def compact(self) -> Dict[str, int]:
+        """Compact the log now; returns entry counts before and after."""
+        with self._lock:
+            if not self.path:
+                return {"entries_before": 0, "entries_after": 0}
+            with self._log_lock():
+                self._load()
+                before = self._log_entries
+                if self._file is not None:
+                    self._compact()
+                return {"entries_before": before, "entries_after": self._log_entries}
+
+    def _add(self, doc_id: str, term_counts: Dict[str, int]):
+        """Add term counts for a document (caller holds the lock)."""
+        if doc_id in self.doc_lengths:
+            self._remove(doc_id)
+        for term, count in term_counts.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+        length = sum(term_counts.values())
+        self.doc_lengths[doc_id] = length
+        self.doc_terms[doc_id] = list(term_counts)
+        self.total_length += length
+
+    def _remove(self, doc_id: str):
+        """Remove a document from the postings (caller holds the lock)."""
+        for term in self.doc_terms.pop(doc_id, []):
+            postings = self.postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(doc_id, None)
+            if not postings:
+                del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+
+    def add_document(self, doc_id: str, text: str):
+        """Index a document's text, replacing any previous version."""
+        term_counts = dict(Counter(tokenize(text)))
+        with self._lock:
+            self._load()
+            self._append_log({"op": "add", "id": doc_id, "terms": term_counts})
+
+    def remove_document(self, doc_id: str) -> bool:
+        """Remove a document from the index."""
+        with self._lock:
+            self._load()
+            if doc_id not in self.doc_lengths:
+                return False
+            self._append_log({"op": "remove", "id": doc_id})
+            return True
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """Return up to `limit` (doc_id, BM25 score) pairs, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            self._load()
+            doc_count = len(self.doc_lengths)
+            if not doc_count or not terms:
+                return []
+            avg_length = self.total_length / doc_count
+            scores = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (
+                        1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length
+                    )
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                        tf * (self.k1 + 1) / (tf + norm)
+                    )
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+    def has_document(self, doc_id: str) -> bool:
+        """Check if a document is indexed."""
+        with self._lock:
+            self._load()
+            return doc_id in self.doc_lengths
+
+    def get_document_count(self) -> int:
+        """Get number of indexed documents."""
+        with self._lock:
+            self._load()
+            return len(self.doc_lengths)
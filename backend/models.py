@@ -1,11 +1,135 @@
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Callable
+import json
 import uuid
 
 
-class User:
+class SerializedModel:
+    """Base for models that memoize their dictionary and JSON forms.
+
+    Assigning a public attribute or calling a mutating method bumps the
+    model's version; the cached forms are reused while the version of the
+    model and of every nested model is unchanged. Dictionaries returned by
+    `to_dict` are shared between calls and must not be modified.
+
+    Models use __slots__ instead of a per-instance __dict__ to keep large
+    numbers of users and studies compact in memory.
+    """
+
+    __slots__ = ("_version", "_serialized")
+
+    # Serialized field name -> function computing it from the model
+    SERIALIZED_FIELDS: Dict[str, Callable[[Any], Any]] = {}
+
+    def __init__(self):
+        object.__setattr__(self, "_version", 0)
+        # (version, dict, encoded JSON or None)
+        object.__setattr__(self, "_serialized", None)
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            self._touch()
+
+    def __copy__(self):
+        """Copy the model's attributes, sharing nested values and the cache."""
+        clone = object.__new__(type(self))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(self, name):
+                    object.__setattr__(clone, name, getattr(self, name))
+        return clone
+
+    def _touch(self):
+        """Mark the model as changed."""
+        object.__setattr__(self, "_version", self._version + 1)
+
+    def _children(self) -> Iterable["SerializedModel"]:
+        """Get nested models included in the serialized form."""
+        return ()
+
+    def get_version(self):
+        """Get a version that changes whenever this model or a nested one does."""
+        children = tuple(child.get_version() for child in self._children())
+        return (self._version, children) if children else self._version
+
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the dictionary form."""
+        return {name: build(self) for name, build in self.SERIALIZED_FIELDS.items()}
+
+    def _cache(self):
+        """Get the serialized cache entry for the current version."""
+        version = self.get_version()
+        cached = self._serialized
+        if cached is None or cached[0] != version:
+            cached = (version, self._build_dict(), None)
+            object.__setattr__(self, "_serialized", cached)
+        return cached
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert model to dictionary."""
+        return self._cache()[1]
+
+    def to_json(self) -> bytes:
+        """Get the model encoded as UTF-8 JSON."""
+        version, data, encoded = self._cache()
+        if encoded is None:
+            encoded = json.dumps(data).encode("utf-8")
+            object.__setattr__(self, "_serialized", (version, data, encoded))
+        return encoded
+
+    def project(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """Get only the requested fields, building just those when not cached."""
+        cached = self._serialized
+        if cached is not None and cached[0] == self.get_version():
+            return {name: cached[1][name] for name in fields}
+        return {name: self.SERIALIZED_FIELDS[name](self) for name in fields}
+
+    def prime_serialization(self, data: Dict[str, Any], encoded: Optional[bytes] = None):
+        """Seed the cache with a known serialized form of the current version."""
+        object.__setattr__(self, "_serialized", (self.get_version(), data, encoded))
+
+
+def encode_json(value: Any) -> bytes:
+    """Encode a value as JSON, reusing the cached encoding of models in it."""
+    if isinstance(value, SerializedModel):
+        return value.to_json()
+    if isinstance(value, (list, tuple)):
+        return b"[" + b",".join(encode_json(item) for item in value) + b"]"
+    if isinstance(value, dict):
+        return (
+            b"{"
+            + b",".join(
+                json.dumps(str(key)).encode("utf-8") + b":" + encode_json(item)
+                for key, item in value.items()
+            )
+            + b"}"
+        )
+    return json.dumps(value).encode("utf-8")
+
+
+class User(SerializedModel):
     """User model matching frontend structure."""
 
+    __slots__ = (
+        "first_name",
+        "last_name",
+        "email_address",
+        "company_association",
+        "role",
+    )
+
+    SERIALIZED_FIELDS = {
+        "firstName": lambda user: user.first_name,
+        "lastName": lambda user: user.last_name,
+        "emailAddress": lambda user: user.email_address,
+        "companyAssociation": lambda user: user.company_association,
+        "role": lambda user: user.role,
+        "fullName": lambda user: user.get_full_name(),
+        "displayName": lambda user: user.get_display_name(),
+        "initials": lambda user: user.get_initials(),
+    }
+
     def __init__(
         self,
         first_name: str,
@@ -14,6 +138,7 @@ class User:
         company_association: str,
         role: str,
     ):
+        super().__init__()
         self.first_name = first_name
         self.last_name = last_name
         self.email_address = email_address
@@ -32,23 +157,41 @@ class User:
         """Get user initials."""
         return f"{self.first_name[0]}{self.last_name[0]}".upper()
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert user to dictionary."""
-        return {
-            "firstName": self.first_name,
-            "lastName": self.last_name,
-            "emailAddress": self.email_address,
-            "companyAssociation": self.company_association,
-            "role": self.role,
-            "fullName": self.get_full_name(),
-            "displayName": self.get_display_name(),
-            "initials": self.get_initials(),
-        }
-
-
-class StudyFile:
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "User":
+        """Create user from dictionary produced by to_dict."""
+        return cls(
+            first_name=data["firstName"],
+            last_name=data["lastName"],
+            email_address=data["emailAddress"],
+            company_association=data["companyAssociation"],
+            role=data["role"],
+        )
+
+
+class StudyFile(SerializedModel):
     """Study file model matching frontend structure."""
 
+    __slots__ = (
+        "id",
+        "name",
+        "type",
+        "uploaded_by",
+        "uploaded_at",
+        "status",
+        "size",
+    )
+
+    SERIALIZED_FIELDS = {
+        "id": lambda file: file.id,
+        "name": lambda file: file.name,
+        "type": lambda file: file.type,
+        "uploadedBy": lambda file: file.uploaded_by,
+        "uploadedAt": lambda file: file.uploaded_at.isoformat(),
+        "status": lambda file: file.status,
+        "size": lambda file: file.size,
+    }
+
     def __init__(
         self,
         file_id: str,
@@ -59,6 +202,7 @@ class StudyFile:
         status: str = "pending",
         size: int = 0,
     ):
+        super().__init__()
         self.id = file_id
         self.name = name
         self.type = file_type  # 'protocol', 'esource', 'crf'
@@ -67,22 +211,43 @@ class StudyFile:
         self.status = status  # 'pending', 'approved', 'rejected', 'under-review'
         self.size = size
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert study file to dictionary."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "type": self.type,
-            "uploadedBy": self.uploaded_by,
-            "uploadedAt": self.uploaded_at.isoformat(),
-            "status": self.status,
-            "size": self.size,
-        }
-
-
-class Site:
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StudyFile":
+        """Create study file from dictionary produced by to_dict."""
+        return cls(
+            file_id=data["id"],
+            name=data["name"],
+            file_type=data["type"],
+            uploaded_by=data["uploadedBy"],
+            uploaded_at=datetime.fromisoformat(data["uploadedAt"]),
+            status=data.get("status", "pending"),
+            size=data.get("size", 0),
+        )
+
+
+class Site(SerializedModel):
     """Site model matching frontend structure."""
 
+    __slots__ = (
+        "id",
+        "name",
+        "investigator",
+        "location",
+        "status",
+        "e_source_files",
+        "crf_files",
+    )
+
+    SERIALIZED_FIELDS = {
+        "id": lambda site: site.id,
+        "name": lambda site: site.name,
+        "investigator": lambda site: site.investigator,
+        "location": lambda site: site.location,
+        "status": lambda site: site.status,
+        "eSourceFiles": lambda site: [f.to_dict() for f in site.e_source_files],
+        "crfFiles": lambda site: [f.to_dict() for f in site.crf_files],
+    }
+
     def __init__(
         self,
         site_id: str,
@@ -91,6 +256,7 @@ class Site:
         location: str,
         status: str = "pending",
     ):
+        super().__init__()
         self.id = site_id
         self.name = name
         self.investigator = investigator
@@ -102,27 +268,68 @@ class Site:
     def add_e_source_file(self, file: StudyFile):
         """Add eSource file to site."""
         self.e_source_files.append(file)
+        self._touch()
 
     def add_crf_file(self, file: StudyFile):
         """Add CRF file to site."""
         self.crf_files.append(file)
+        self._touch()
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert site to dictionary."""
-        return {
-            "id": self.id,
-            "name": self.name,
-            "investigator": self.investigator,
-            "location": self.location,
-            "status": self.status,
-            "eSourceFiles": [f.to_dict() for f in self.e_source_files],
-            "crfFiles": [f.to_dict() for f in self.crf_files],
-        }
-
-
-class Study:
+    def _children(self) -> Iterable[SerializedModel]:
+        """Get the site's files."""
+        return self.e_source_files + self.crf_files
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Site":
+        """Create site from dictionary produced by to_dict."""
+        site = cls(
+            site_id=data["id"],
+            name=data["name"],
+            investigator=data["investigator"],
+            location=data["location"],
+            status=data.get("status", "pending"),
+        )
+        for f in data.get("eSourceFiles") or []:
+            site.add_e_source_file(StudyFile.from_dict(f))
+        for f in data.get("crfFiles") or []:
+            site.add_crf_file(StudyFile.from_dict(f))
+        return site
+
+
+class Study(SerializedModel):
     """Study model matching frontend structure."""
 
+    __slots__ = (
+        "id",
+        "title",
+        "protocol",
+        "sponsor",
+        "status",
+        "created_at",
+        "sites",
+        "principal_investigator",
+        "protocol_analysis",
+        "e_source_files",
+        "crf_files",
+    )
+
+    SERIALIZED_FIELDS = {
+        "id": lambda study: study.id,
+        "title": lambda study: study.title,
+        "protocol": lambda study: study.protocol,
+        "sponsor": lambda study: study.sponsor,
+        "status": lambda study: study.status,
+        "createdAt": lambda study: study.created_at.isoformat(),
+        "sites": lambda study: [site.to_dict() for site in study.sites],
+        "principalInvestigator": lambda study: study.principal_investigator,
+        "protocolAnalysis": lambda study: study.protocol_analysis,
+        "eSourceFiles": lambda study: [f.to_dict() for f in study.e_source_files],
+        "crfFiles": lambda study: [f.to_dict() for f in study.crf_files],
+        "totalSites": lambda study: study.get_total_sites(),
+        "activeSites": lambda study: study.get_active_sites(),
+        "hasPrincipalInvestigator": lambda study: study.has_principal_investigator(),
+    }
+
     def __init__(
         self,
         study_id: str,
@@ -135,6 +342,7 @@ class Study:
         principal_investigator: Optional[Dict[str, str]] = None,
         protocol_analysis: Optional[Dict] = None,
     ):
+        super().__init__()
         self.id = study_id
         self.title = title
         self.protocol = protocol
@@ -150,14 +358,21 @@ class Study:
     def add_site(self, site: Site):
         """Add site to study."""
         self.sites.append(site)
+        self._touch()
 
     def add_e_source_file(self, file: StudyFile):
         """Add eSource file to study."""
         self.e_source_files.append(file)
+        self._touch()
 
     def add_crf_file(self, file: StudyFile):
         """Add CRF file to study."""
         self.crf_files.append(file)
+        self._touch()
+
+    def _children(self) -> Iterable[SerializedModel]:
+        """Get the study's sites and files."""
+        return self.sites + self.e_source_files + self.crf_files
 
     def get_total_sites(self) -> int:
         """Get total number of sites."""
@@ -175,21 +390,25 @@ class Study:
         """Set principal investigator for study."""
         self.principal_investigator = investigator
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert study to dictionary."""
-        return {
-            "id": self.id,
-            "title": self.title,
-            "protocol": self.protocol,
-            "sponsor": self.sponsor,
-            "status": self.status,
-            "createdAt": self.created_at.isoformat(),
-            "sites": [site.to_dict() for site in self.sites],
-            "principalInvestigator": self.principal_investigator,
-            "protocolAnalysis": self.protocol_analysis,
-            "eSourceFiles": [f.to_dict() for f in self.e_source_files],
-            "crfFiles": [f.to_dict() for f in self.crf_files],
-            "totalSites": self.get_total_sites(),
-            "activeSites": self.get_active_sites(),
-            "hasPrincipalInvestigator": self.has_principal_investigator(),
-        }
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Study":
+        """Create study from dictionary produced by to_dict.
+
+        Null lists (as imports may send) are read as empty.
+        """
+        study = cls(
+            study_id=data["id"],
+            title=data["title"],
+            protocol=data["protocol"],
+            sponsor=data["sponsor"],
+            status=data["status"],
+            created_at=datetime.fromisoformat(data["createdAt"]),
+            sites=[Site.from_dict(site) for site in data.get("sites") or []],
+            principal_investigator=data.get("principalInvestigator"),
+            protocol_analysis=data.get("protocolAnalysis"),
+        )
+        for f in data.get("eSourceFiles") or []:
+            study.add_e_source_file(StudyFile.from_dict(f))
+        for f in data.get("crfFiles") or []:
+            study.add_crf_file(StudyFile.from_dict(f))
+        return study
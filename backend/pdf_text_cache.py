@@ -0,0 +1,95 @@
+"""
+PDF text cache for the SDV Platform backend.
+Extracts per-page text from a PDF once per file version (content hash) and
+serves later requests from memory.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+import PyPDF2
+
+
+def extract_pdf_pages(file_path: str) -> List[str]:
+    """Extract the text of every page of a PDF."""
+    try:
+        with open(file_path, "rb") as f:
+            pdf_reader = PyPDF2.PdfReader(f)
+            return [(page.extract_text() or "").strip() for page in pdf_reader.pages]
+    except Exception as e:
+        raise Exception(f"Error extracting text from PDF: {str(e)}")
+
+
+def parse_page_ranges(spec: Optional[str], page_count: int) -> List[int]:
+    """Parse a 1-based page spec such as '2', '1-3' or '1,4-5' into page numbers."""
+    if not spec:
+        return list(range(1, page_count + 1))
+
+    pages = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if "-" in part:
+            start, end = part.split("-", 1)
+            start = int(start) if start else 1
+            end = int(end) if end else page_count
+        else:
+            start = end = int(part)
+        if start < 1 or end < start:
+            raise ValueError(f"Invalid page range: {part}")
+        pages.update(range(start, min(end, page_count) + 1))
+    return sorted(pages)
+
+
+class PDFTextCache:
+    """LRU cache of content hash -> per-page text."""
+
+    def __init__(self, max_entries: int = 256):
+        """Initialize an empty cache holding at most `max_entries` files."""
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_pages(self, file_path: str, content_hash: str) -> List[str]:
+        """Get per-page text for a file version, extracting it on first use."""
+        with self._lock:
+            pages = self._entries.get(content_hash)
+            if pages is not None:
+                self._entries.move_to_end(content_hash)
+                self.hits += 1
+                return pages
+
+        pages = extract_pdf_pages(file_path)
+        with self._lock:
+            self.misses += 1
+            self._entries[content_hash] = pages
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pages
+
+    def contains(self, content_hash: str) -> bool:
+        """Check if a file version is cached."""
+        with self._lock:
+            return content_hash in self._entries
+
+    def warm(self, files: Iterable[tuple], on_error: Optional[Callable] = None):
+        """Extract text for (file_path, content_hash) pairs not yet cached."""
+        for file_path, content_hash in files:
+            if self.contains(content_hash):
+                continue
+            try:
+                self.get_pages(file_path, content_hash)
+            except Exception as e:
+                if on_error:
+                    on_error(file_path, e)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache size and hit counts."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
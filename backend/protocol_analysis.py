@@ -0,0 +1,315 @@
+"""
+Protocol analysis for the SDV Platform backend.
+Sends protocol text to the TrialMonitor agent, parses its markdown analysis
+into the structured JSON the frontend expects, and caches results by
+protocol content hash.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import urllib.error
+import urllib.request
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import TRIAL_MONITOR_URL, TRIAL_MONITOR_TIMEOUT
+
+NOT_SPECIFIED = "Not specified"
+
+# Section key -> (heading keywords, {field: label keywords})
+# Fields are matched against bullet labels in the order listed, so more
+# specific labels come first.
+ANALYSIS_SECTIONS = {
+    "trial_overview": (
+        ("trial overview", "overview"),
+        {
+            "protocol_title": ("title", "name"),
+            "protocol_number": ("protocol number", "number"),
+            "study_phase": ("phase",),
+            "trial_type": ("trial type", "type"),
+            "indication": ("indication", "disease", "condition"),
+        },
+    ),
+    "primary_objectives": (
+        ("objective", "endpoint"),
+        {
+            "secondary_endpoints": ("secondary",),
+            "primary_endpoints": ("primary endpoint", "endpoint"),
+            "primary_objectives": ("objective",),
+        },
+    ),
+    "trial_design": (
+        ("trial design", "study design", "design"),
+        {
+            "study_design": ("design", "description"),
+            "randomization": ("randomi",),
+            "blinding": ("blind", "mask"),
+            "sample_size": ("sample size", "enrollment", "participants"),
+            "duration": ("duration",),
+        },
+    ),
+    "eligibility_criteria": (
+        ("eligibility", "criteria"),
+        {
+            "inclusion_criteria": ("inclusion",),
+            "exclusion_criteria": ("exclusion",),
+        },
+    ),
+    "monitoring_requirements": (
+        ("monitoring and sdv", "sdv", "monitoring requirement"),
+        {
+            "sdv_requirements": ("sdv", "verification requirement"),
+            "source_document_verification": (
+                "data points",
+                "source",
+                "verification",
+            ),
+            "monitoring_schedule": ("schedule", "frequency", "visit"),
+        },
+    ),
+    "key_personnel": (
+        ("personnel", "sites"),
+        {
+            "principal_investigators": ("investigator",),
+            "study_sites": ("site",),
+            "sponsor": ("sponsor",),
+        },
+    ),
+    "timeline": (
+        ("timeline", "visit schedule"),
+        {
+            "visit_schedule": ("visit", "schedule"),
+            "key_milestones": ("milestone",),
+            "duration_of_participation": ("duration", "participation"),
+        },
+    ),
+    "safety_monitoring": (
+        ("safety",),
+        {
+            "safety_endpoints": ("endpoint",),
+            "adverse_event_monitoring": ("adverse", "ae monitoring", "aes"),
+            "dsmb_requirements": ("dsmb", "data safety monitoring board", "board"),
+        },
+    ),
+    "statistical_analysis": (
+        ("statistic",),
+        {
+            "sample_size_calculation": ("sample size", "power"),
+            "primary_analysis": ("primary analysis", "approach"),
+            "statistical_methods": ("method",),
+        },
+    ),
+    "other_details": (
+        ("other", "additional"),
+        {
+            "special_procedures": ("procedure", "consideration"),
+            "regulatory_information": ("regulatory",),
+        },
+    ),
+}
+
+# Field order as returned to the frontend
+RESPONSE_FIELDS = {
+    "trial_overview": [
+        "protocol_title",
+        "protocol_number",
+        "study_phase",
+        "trial_type",
+        "indication",
+    ],
+    "primary_objectives": [
+        "primary_objectives",
+        "primary_endpoints",
+        "secondary_endpoints",
+    ],
+    "trial_design": [
+        "study_design",
+        "randomization",
+        "blinding",
+        "sample_size",
+        "duration",
+    ],
+    "eligibility_criteria": ["inclusion_criteria", "exclusion_criteria"],
+    "monitoring_requirements": [
+        "monitoring_schedule",
+        "sdv_requirements",
+        "source_document_verification",
+    ],
+    "key_personnel": ["principal_investigators", "study_sites", "sponsor"],
+    "timeline": ["visit_schedule", "key_milestones", "duration_of_participation"],
+    "safety_monitoring": [
+        "safety_endpoints",
+        "adverse_event_monitoring",
+        "dsmb_requirements",
+    ],
+    "statistical_analysis": [
+        "statistical_methods",
+        "primary_analysis",
+        "sample_size_calculation",
+    ],
+    "other_details": ["special_procedures", "regulatory_information"],
+}
+
+LIST_FIELDS = {"inclusion_criteria", "exclusion_criteria"}
+
+HEADING_PATTERN = re.compile(r"^\s*(#{1,6})\s*(?:\d+[.)]\s*)?(.+?)\s*#*\s*$")
+ITEM_PATTERN = re.compile(r"^(\s*)(?:[-*+•]|\d+[.)])\s+(.*)$")
+LABEL_PATTERN = re.compile(r"^\**\s*([^:*]{1,80}?)\s*\**\s*:\s*\**\s*(.*)$")
+
+
+def get_protocol_hash(protocol_text: str) -> str:
+    """Hash protocol text, ignoring whitespace-only differences."""
+    normalized = " ".join(protocol_text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _match_section(heading: str) -> Optional[str]:
+    """Map a markdown heading onto an analysis section key."""
+    heading = heading.lower().strip("* ")
+    for section, (keywords, _) in ANALYSIS_SECTIONS.items():
+        if any(keyword in heading for keyword in keywords):
+            return section
+    return None
+
+
+def _match_field(section: str, label: str) -> Optional[str]:
+    """Map a bullet label onto a field of a section."""
+    label = label.lower()
+    for field, keywords in ANALYSIS_SECTIONS[section][1].items():
+        if any(re.search(rf"\b{re.escape(keyword)}", label) for keyword in keywords):
+            return field
+    return None
+
+
+def _clean(text: str) -> str:
+    """Strip markdown emphasis from a value."""
+    return text.replace("**", "").replace("__", "").strip(" *_")
+
+
+def parse_protocol_analysis(markdown: str) -> Dict[str, Dict[str, Any]]:
+    """Parse the TrialMonitor markdown analysis into structured JSON."""
+    values = {section: {} for section in ANALYSIS_SECTIONS}
+    section = None
+    field = None
+    field_indent = 0
+
+    for line in markdown.splitlines():
+        if not line.strip():
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            level, title = len(heading.group(1)), heading.group(2)
+            # Sub-headings (### Inclusion Criteria) introduce a field
+            matched = _match_field(section, title) if section and level > 2 else None
+            if matched:
+                field = matched
+                field_indent = -1
+            else:
+                section = _match_section(title)
+                field = None
+            continue
+        if section is None:
+            continue
+
+        item = ITEM_PATTERN.match(line)
+        indent = len(item.group(1)) if item else len(line) - len(line.lstrip())
+        text = item.group(2) if item else line.strip()
+
+        label = LABEL_PATTERN.match(text)
+        # A nested item under a labelled bullet belongs to that field
+        nested = field is not None and (indent > field_indent or not label)
+        if label and not nested:
+            field = _match_field(section, label.group(1))
+            field_indent = indent
+            value = _clean(label.group(2))
+            if field and value:
+                values[section].setdefault(field, []).append(value)
+            continue
+        if field is not None and text:
+            values[section].setdefault(field, []).append(_clean(text))
+
+    analysis = {}
+    for section, fields in RESPONSE_FIELDS.items():
+        analysis[section] = {}
+        for field in fields:
+            items = [item for item in values[section].get(field, []) if item]
+            if field in LIST_FIELDS:
+                analysis[section][field] = items
+            else:
+                analysis[section][field] = "; ".join(items) or NOT_SPECIFIED
+    return analysis
+
+
+def request_protocol_analysis(protocol_text: str) -> str:
+    """Run protocol analysis on the TrialMonitor agent and return its markdown."""
+    request = urllib.request.Request(
+        f"{TRIAL_MONITOR_URL}/analyze-protocol",
+        data=json.dumps({"protocolText": protocol_text}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=TRIAL_MONITOR_TIMEOUT) as response:
+            result = json.loads(response.read().decode("utf-8"))
+    except urllib.error.URLError as e:
+        raise Exception(f"TrialMonitor agent unavailable: {e}")
+
+    if not result.get("success") or not result.get("analysis"):
+        raise Exception(
+            f"TrialMonitor analysis failed: {result.get('error') or 'empty response'}"
+        )
+    return result["analysis"]
+
+
+class ProtocolAnalysisCache:
+    """Protocol hash -> parsed analysis, computing each protocol only once."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self.results = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get(self, protocol_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a cached analysis by protocol hash."""
+        with self._lock:
+            return self.results.get(protocol_hash)
+
+    def get_or_compute(
+        self, protocol_text: str, compute: Callable[[str], Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Return (analysis, cached), running `compute` once per protocol."""
+        protocol_hash = get_protocol_hash(protocol_text)
+        while True:
+            with self._lock:
+                if protocol_hash in self.results:
+                    return self.results[protocol_hash], True
+                event = self._in_flight.get(protocol_hash)
+                if event is None:
+                    event = self._in_flight[protocol_hash] = threading.Event()
+                    break
+            # Another request is already analyzing this protocol
+            event.wait()
+
+        try:
+            analysis = compute(protocol_text)
+            with self._lock:
+                self.results[protocol_hash] = analysis
+            return analysis, False
+        finally:
+            with self._lock:
+                del self._in_flight[protocol_hash]
+            event.set()
+
+
+protocol_analysis_cache = ProtocolAnalysisCache()
+
+
+def analyze_protocol_text(protocol_text: str) -> Tuple[Dict[str, Any], bool]:
+    """Analyze a protocol, returning (analysis, cached)."""
+    return protocol_analysis_cache.get_or_compute(
+        protocol_text,
+        lambda text: parse_protocol_analysis(request_protocol_analysis(text)),
+    )
@@ -0,0 +1,67 @@
+"""
+Query embedding cache for the SDV Platform backend.
+Keeps the most recently used query embeddings in memory so repeated
+search lookups skip the embedding model.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Sequence
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query text -> embedding vector."""
+
+    def __init__(self, embedding_function: Callable, max_size: int = 1024):
+        """Initialize the cache around a ChromaDB embedding function."""
+        self.embedding_function = embedding_function
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, queries: Sequence[str]) -> List[Any]:
+        """Return embeddings for queries, embedding all cache misses in one batch."""
+        embeddings = {}
+        with self._lock:
+            for query in queries:
+                if query in embeddings:
+                    continue
+                if query in self._entries:
+                    self._entries.move_to_end(query)
+                    embeddings[query] = self._entries[query]
+                    self.hits += 1
+
+        missing = [query for query in dict.fromkeys(queries) if query not in embeddings]
+        if missing:
+            computed = self.embedding_function(missing)
+            with self._lock:
+                for query, embedding in zip(missing, computed):
+                    embeddings[query] = embedding
+                    self._entries[query] = embedding
+                    self._entries.move_to_end(query)
+                    self.misses += 1
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        return [embeddings[query] for query in queries]
+
+    def clear(self):
+        """Drop all cached embeddings and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -110,7 +110,7 @@ def reset_database():
 
         db_manager.clear_all_data()
         print("✅ Database reset completed")
-        print("All data has been cleared from memory")
+        print("All users and studies have been removed")
     except Exception as e:
         print(f"❌ Error resetting database: {e}")
         sys.exit(1)
@@ -156,6 +156,29 @@ def show_database_status():
         print("=" * 60)
 
 
+def check_database():
+    """Check the maintained statistics counters against the stored data."""
+    print("Checking database statistics...")
+
+    try:
+        from database_manager import check_database_statistics
+
+        result = check_database_statistics()
+        if result["consistent"]:
+            print("✅ Statistics counters match the stored data")
+            return
+        for mismatch in result["mismatches"]:
+            key = f" [{mismatch['key']}]" if mismatch["key"] else ""
+            print(
+                f"❌ {mismatch['counter']}{key}: maintained {mismatch['maintained']}, "
+                f"actual {mismatch['actual']}"
+            )
+        sys.exit(1)
+    except Exception as e:
+        print(f"❌ Error checking database: {e}")
+        sys.exit(1)
+
+
 def main():
     """Main function to handle command line arguments."""
     if len(sys.argv) > 1:
@@ -167,6 +190,8 @@ def main():
             reset_database()
         elif command == "status":
             show_database_status()
+        elif command == "check":
+            check_database()
         elif command == "help":
             print("Usage: python setup_database.py [command]")
             print()
@@ -174,6 +199,7 @@ def main():
             print("  setup   - Initialize database with users and studies")
             print("  reset   - Reset database (clear all data)")
             print("  status  - Show current database status")
+            print("  check   - Verify statistics counters against the data")
             print("  help    - Show this help message")
             print()
             print("If no command is provided, 'setup' will be run by default.")
@@ -0,0 +1,795 @@
+"""
+SQLite database manager for the SDV Platform backend.
+Stores users and studies in a SQLite database in WAL mode, so data survives
+restarts and several server worker processes share one consistent copy.
+Columns used for lookups (company, role, sponsor, status) are stored
+separately and indexed; nested study data (sites, files, analysis) is
+kept as JSON. Statistics are counters in a `statistics` table kept current
+by triggers, so reading them does not scan users or studies. Triggers also
+append every user/study write to a bounded `changes` log, whose row IDs
+are the database version served by the change feed.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple
+from models import User, Study
+from mock_data import MOCK_USERS, MOCK_STUDIES
+from config import CHANGE_LOG_SIZE
+
+SCHEMA_VERSION = 3
+
+# Statements are module constants so each connection's statement cache
+# reuses the compiled (prepared) form
+USER_COLUMNS = "first_name, last_name, email_address, company_association, role"
+SELECT_USERS = f"SELECT {USER_COLUMNS} FROM users"
+INSERT_USER = (
+    f"INSERT OR IGNORE INTO users ({USER_COLUMNS}, company_key) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+UPDATE_USER = (
+    "UPDATE users SET first_name = ?, last_name = ?, email_address = ?, "
+    "company_association = ?, role = ?, company_key = ? WHERE email_address = ?"
+)
+UPSERT_USER = (
+    f"INSERT INTO users ({USER_COLUMNS}, company_key) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (email_address) DO UPDATE SET first_name = excluded.first_name, "
+    "last_name = excluded.last_name, "
+    "company_association = excluded.company_association, "
+    "role = excluded.role, company_key = excluded.company_key"
+)
+SELECT_STUDIES = "SELECT data FROM studies"
+INSERT_STUDY = (
+    "INSERT OR IGNORE INTO studies "
+    "(id, sponsor, sponsor_key, status, has_principal_investigator, data) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+UPSERT_STUDY = (
+    "INSERT INTO studies "
+    "(id, sponsor, sponsor_key, status, has_principal_investigator, data) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET sponsor = excluded.sponsor, "
+    "sponsor_key = excluded.sponsor_key, status = excluded.status, "
+    "has_principal_investigator = excluded.has_principal_investigator, "
+    "data = excluded.data"
+)
+UPDATE_STUDY = (
+    "UPDATE studies SET id = ?, sponsor = ?, sponsor_key = ?, status = ?, "
+    "has_principal_investigator = ?, data = ? WHERE id = ?"
+)
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS users ("
+    "email_address TEXT PRIMARY KEY, first_name TEXT NOT NULL, "
+    "last_name TEXT NOT NULL, company_association TEXT NOT NULL, "
+    "company_key TEXT NOT NULL, role TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS users_company_key ON users (company_key)",
+    "CREATE INDEX IF NOT EXISTS users_role ON users (role)",
+    "CREATE TABLE IF NOT EXISTS studies ("
+    "id TEXT PRIMARY KEY, sponsor TEXT NOT NULL, sponsor_key TEXT NOT NULL, "
+    "status TEXT NOT NULL, has_principal_investigator INTEGER NOT NULL, "
+    "data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS studies_sponsor_key ON studies (sponsor_key)",
+    "CREATE INDEX IF NOT EXISTS studies_status ON studies (status)",
+    # name -> count, or (name, key) -> count for per-company/status counters
+    "CREATE TABLE IF NOT EXISTS statistics ("
+    "name TEXT NOT NULL, key TEXT NOT NULL DEFAULT '', count INTEGER NOT NULL, "
+    "PRIMARY KEY (name, key))",
+    """CREATE TRIGGER IF NOT EXISTS users_insert_statistics AFTER INSERT ON users
+    BEGIN
+        INSERT INTO statistics VALUES ('total_users', '', 1)
+            ON CONFLICT (name, key) DO UPDATE SET count = count + 1;
+        INSERT INTO statistics VALUES ('users_by_company', NEW.company_association, 1)
+            ON CONFLICT (name, key) DO UPDATE SET count = count + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_delete_statistics AFTER DELETE ON users
+    BEGIN
+        UPDATE statistics SET count = count - 1
+            WHERE (name = 'total_users' AND key = '')
+            OR (name = 'users_by_company' AND key = OLD.company_association);
+        DELETE FROM statistics WHERE name = 'users_by_company' AND count = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_update_statistics
+    AFTER UPDATE OF company_association ON users
+    WHEN OLD.company_association IS NOT NEW.company_association
+    BEGIN
+        UPDATE statistics SET count = count - 1
+            WHERE name = 'users_by_company' AND key = OLD.company_association;
+        INSERT INTO statistics VALUES ('users_by_company', NEW.company_association, 1)
+            ON CONFLICT (name, key) DO UPDATE SET count = count + 1;
+        DELETE FROM statistics WHERE name = 'users_by_company' AND count = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS studies_insert_statistics AFTER INSERT ON studies
+    BEGIN
+        INSERT INTO statistics VALUES ('total_studies', '', 1)
+            ON CONFLICT (name, key) DO UPDATE SET count = count + 1;
+        INSERT INTO statistics VALUES ('studies_by_status', NEW.status, 1)
+            ON CONFLICT (name, key) DO UPDATE SET count = count + 1;
+        INSERT INTO statistics VALUES (
+            'studies_without_investigator', '', 1 - NEW.has_principal_investigator)
+            ON CONFLICT (name, key) DO UPDATE
+            SET count = count + 1 - NEW.has_principal_investigator;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS studies_delete_statistics AFTER DELETE ON studies
+    BEGIN
+        UPDATE statistics SET count = count - 1
+            WHERE (name = 'total_studies' AND key = '')
+            OR (name = 'studies_by_status' AND key = OLD.status);
+        UPDATE statistics SET count = count - 1 + OLD.has_principal_investigator
+            WHERE name = 'studies_without_investigator' AND key = '';
+        DELETE FROM statistics WHERE name = 'studies_by_status' AND count = 0;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS studies_update_statistics
+    AFTER UPDATE OF status, has_principal_investigator ON studies
+    BEGIN
+        UPDATE statistics SET count = count - 1
+            WHERE name = 'studies_by_status' AND key = OLD.status;
+        INSERT INTO statistics VALUES ('studies_by_status', NEW.status, 1)
+            ON CONFLICT (name, key) DO UPDATE SET count = count + 1;
+        DELETE FROM statistics WHERE name = 'studies_by_status' AND count = 0;
+        UPDATE statistics
+            SET count = count + OLD.has_principal_investigator
+                - NEW.has_principal_investigator
+            WHERE name = 'studies_without_investigator' AND key = '';
+    END""",
+]
+
+# Change log: one row per written record; version is the database version
+SCHEMA += [
+    "CREATE TABLE IF NOT EXISTS changes ("
+    "version INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, "
+    "record_id TEXT NOT NULL, op TEXT NOT NULL)",
+    # Recreated at every start so it follows CHANGE_LOG_SIZE
+    "DROP TRIGGER IF EXISTS changes_trim",
+    f"""CREATE TRIGGER changes_trim AFTER INSERT ON changes
+    BEGIN
+        DELETE FROM changes WHERE version <= NEW.version - {CHANGE_LOG_SIZE};
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_insert_changes AFTER INSERT ON users
+    BEGIN
+        INSERT INTO changes (kind, record_id, op)
+            VALUES ('user', NEW.email_address, 'upsert');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_update_changes AFTER UPDATE ON users
+    BEGIN
+        INSERT INTO changes (kind, record_id, op)
+            SELECT 'user', OLD.email_address, 'delete'
+            WHERE OLD.email_address IS NOT NEW.email_address;
+        INSERT INTO changes (kind, record_id, op)
+            VALUES ('user', NEW.email_address, 'upsert');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS users_delete_changes AFTER DELETE ON users
+    BEGIN
+        INSERT INTO changes (kind, record_id, op)
+            VALUES ('user', OLD.email_address, 'delete');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS studies_insert_changes AFTER INSERT ON studies
+    BEGIN
+        INSERT INTO changes (kind, record_id, op) VALUES ('study', NEW.id, 'upsert');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS studies_update_changes AFTER UPDATE ON studies
+    BEGIN
+        INSERT INTO changes (kind, record_id, op)
+            SELECT 'study', OLD.id, 'delete' WHERE OLD.id IS NOT NEW.id;
+        INSERT INTO changes (kind, record_id, op) VALUES ('study', NEW.id, 'upsert');
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS studies_delete_changes AFTER DELETE ON studies
+    BEGIN
+        INSERT INTO changes (kind, record_id, op) VALUES ('study', OLD.id, 'delete');
+    END""",
+]
+
+# Latest change of each record after a version, in version order
+SELECT_CHANGES = (
+    "SELECT kind, record_id, op, MAX(version) AS version FROM changes "
+    "WHERE version > ? GROUP BY kind, record_id ORDER BY version"
+)
+SELECT_CHANGE_VERSION = "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+
+# Seconds between checks for new changes; other processes may write them
+CHANGE_POLL_INTERVAL = 0.25
+
+# Counters recomputed from the tables, for rebuilds and consistency checks
+STATISTICS_SCAN = """
+    SELECT 'total_users', '', COUNT(*) FROM users
+    UNION ALL SELECT 'users_by_company', company_association, COUNT(*)
+        FROM users GROUP BY company_association
+    UNION ALL SELECT 'total_studies', '', COUNT(*) FROM studies
+    UNION ALL SELECT 'studies_by_status', status, COUNT(*)
+        FROM studies GROUP BY status
+    UNION ALL SELECT 'studies_without_investigator', '', COUNT(*)
+        FROM studies WHERE has_principal_investigator = 0
+"""
+
+# Rows per executemany call for batched writes
+WRITE_BATCH_SIZE = 1000
+
+
+def _user_row(user: User) -> tuple:
+    """Get INSERT_USER parameters for a user."""
+    return (
+        user.first_name,
+        user.last_name,
+        user.email_address,
+        user.company_association,
+        user.role,
+        user.company_association.lower(),
+    )
+
+
+def _study_row(study: Study) -> tuple:
+    """Get INSERT_STUDY parameters for a study."""
+    return (
+        study.id,
+        study.sponsor,
+        study.sponsor.lower(),
+        study.status,
+        int(study.has_principal_investigator()),
+        json.dumps(study.to_dict()),
+    )
+
+
+def _batches(rows: Iterable[tuple], size: int = WRITE_BATCH_SIZE):
+    """Group rows into lists of at most `size`."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SQLiteDatabaseManager:
+    """Database manager with the DatabaseManager interface, backed by SQLite."""
+
+    def __init__(self, path: str):
+        """Open (or create) the database, seeding mock data into an empty one."""
+        self.path = path
+        self._local = threading.local()
+        self._create_schema()
+        self.ensure_data_loaded()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, reopening it after a fork."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, cached_statements=256)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _create_schema(self):
+        """Create tables and indexes, migrating older databases."""
+        with self._connection() as connection:
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+            legacy = []
+            if version < 1:
+                legacy = self._read_legacy_tables(connection)
+            for statement in SCHEMA:
+                connection.execute(statement)
+            if version < 2:
+                self._rebuild_statistics(connection)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if legacy:
+            users, studies = legacy
+            self.add_users(users)
+            self.add_studies(studies)
+
+    def _read_legacy_tables(self, connection: sqlite3.Connection):
+        """Read and drop the JSON-only tables written before schema version 1."""
+        columns = [row[1] for row in connection.execute("PRAGMA table_info(users)")]
+        if columns != ["email_address", "data"]:
+            return []
+        users = [
+            User.from_dict(json.loads(data))
+            for (data,) in connection.execute("SELECT data FROM users")
+        ]
+        studies = [
+            Study.from_dict(json.loads(data))
+            for (data,) in connection.execute("SELECT data FROM studies")
+        ]
+        connection.execute("DROP TABLE users")
+        connection.execute("DROP TABLE studies")
+        return users, studies
+
+    def _rebuild_statistics(self, connection: sqlite3.Connection):
+        """Recompute the statistics counters from the tables."""
+        connection.execute("DELETE FROM statistics")
+        connection.execute(f"INSERT INTO statistics (name, key, count) {STATISTICS_SCAN}")
+
+    def _initialize_data(self):
+        """Initialize the database with mock data."""
+        self.add_users(user for users in MOCK_USERS.values() for user in users)
+        self.add_studies(MOCK_STUDIES)
+
+    def _query_users(self, where: str = "", params: tuple = ()) -> List[User]:
+        """Load users matching a WHERE clause."""
+        rows = self._connection().execute(f"{SELECT_USERS} {where}", params)
+        return [
+            User(
+                first_name=first_name,
+                last_name=last_name,
+                email_address=email_address,
+                company_association=company_association,
+                role=role,
+            )
+            for first_name, last_name, email_address, company_association, role in rows
+        ]
+
+    def _query_studies(self, where: str = "", params: tuple = ()) -> List[Study]:
+        """Load studies matching a WHERE clause."""
+        rows = self._connection().execute(f"{SELECT_STUDIES} {where}", params)
+        studies = []
+        for (text,) in rows:
+            data = json.loads(text)
+            study = Study.from_dict(data)
+            # The stored JSON is the study's to_dict output; reuse it
+            study.prime_serialization(data, text.encode("utf-8"))
+            studies.append(study)
+        return studies
+
+    def _write_many(self, statement: str, rows: Iterable[tuple]) -> int:
+        """Run a write statement over rows in batches; returns rows changed.
+
+        Counts the statement's own rows (cursor.rowcount), not the statistics
+        and change-log rows its triggers write.
+        """
+        connection = self._connection()
+        changed = 0
+        for batch in _batches(rows):
+            with connection:
+                changed += connection.executemany(statement, batch).rowcount
+        return changed
+
+    def _page_where(
+        self,
+        filters: List[Tuple[str, Any]],
+        key_column: str,
+        after: Optional[str],
+    ) -> Tuple[str, tuple]:
+        """Build the WHERE clause for a page of filtered rows after a key."""
+        clauses = [f"{column} = ?" for column, _ in filters]
+        params = [value for _, value in filters]
+        if after:
+            clauses.append(f"{key_column} > ?")
+            params.append(after)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, tuple(params)
+
+    def _count(self, table: str, filters: List[Tuple[str, Any]]) -> int:
+        """Count rows matching equality filters with an index lookup."""
+        where, params = self._page_where(filters, "", None)
+        return (
+            self._connection()
+            .execute(f"SELECT COUNT(*) FROM {table} {where}", params)
+            .fetchone()[0]
+        )
+
+    def _count_users(self, company: Optional[str], role: Optional[str]) -> int:
+        """Count users matching a listing filter, from the counters where kept."""
+        if company:
+            # Counters are kept per company as stored; the filter ignores case
+            return sum(
+                count
+                for key, count in self.get_users_by_company_count().items()
+                if key.lower() == company.lower()
+            )
+        if role:
+            return self._count("users", [("role", role)])
+        return self.get_user_count()
+
+    def _count_studies(self, sponsor: Optional[str], status: Optional[str]) -> int:
+        """Count studies matching a listing filter, from the counters where kept."""
+        if sponsor:
+            return self._count("studies", [("sponsor_key", sponsor.lower())])
+        if status:
+            return self.get_studies_by_status_count().get(status, 0)
+        return self.get_study_count()
+
+    # User operations
+    def list_users(
+        self,
+        company: Optional[str] = None,
+        role: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Any], Optional[str], int]:
+        """Get a page of users ordered by email, filtered by company or role.
+
+        Returns (records, cursor for the next page or None, total matching).
+        Records are models, or dicts of just `fields` when a projection is
+        requested.
+        """
+        if company:
+            filters = [("company_key", company.lower())]
+        elif role:
+            filters = [("role", role)]
+        else:
+            filters = []
+        where, params = self._page_where(filters, "email_address", after)
+        if limit is not None or after:
+            where += " ORDER BY email_address"
+        if limit is not None:
+            where += " LIMIT ?"
+            params += (limit + 1,)
+        users = self._query_users(where, params)
+
+        next_after = None
+        if limit is not None and len(users) > limit:
+            users = users[:limit]
+            next_after = users[-1].email_address
+        if fields:
+            users = [user.project(fields) for user in users]
+        return users, next_after, self._count_users(company, role)
+
+    def get_all_users(self) -> List[User]:
+        """Get all users."""
+        return self._query_users()
+
+    def get_user_by_email(self, email: str) -> Optional[User]:
+        """Get user by email address."""
+        users = self._query_users("WHERE email_address = ?", (email,))
+        return users[0] if users else None
+
+    def get_users_by_company(self, company: str) -> List[User]:
+        """Get users by company."""
+        return self._query_users("WHERE company_key = ?", (company.lower(),))
+
+    def get_users_by_role(self, role: str) -> List[User]:
+        """Get users by role."""
+        return self._query_users("WHERE role = ?", (role,))
+
+    def add_user(self, user: User) -> bool:
+        """Add a new user."""
+        return self.add_users([user]) == 1
+
+    def add_users(self, users: Iterable[User]) -> int:
+        """Add users in batches, skipping existing emails; returns number added."""
+        return self._write_many(INSERT_USER, (_user_row(user) for user in users))
+
+    def upsert_users(self, users: Iterable[User]) -> int:
+        """Add users in batches, replacing existing emails; returns number written."""
+        return self._write_many(UPSERT_USER, (_user_row(user) for user in users))
+
+    def update_user(self, email: str, updated_user: User) -> bool:
+        """Update an existing user."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                UPDATE_USER, _user_row(updated_user) + (email,)
+            )
+        return cursor.rowcount == 1
+
+    def delete_user(self, email: str) -> bool:
+        """Delete a user."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "DELETE FROM users WHERE email_address = ?", (email,)
+            )
+        return cursor.rowcount == 1
+
+    # Study operations
+    def list_studies(
+        self,
+        sponsor: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[List[Any], Optional[str], int]:
+        """Get a page of studies ordered by ID, filtered by sponsor or status.
+
+        Returns (records, cursor for the next page or None, total matching).
+        With `fields`, only those keys are read out of the stored JSON, so
+        unrequested sites and files are never loaded.
+        """
+        if sponsor:
+            filters = [("sponsor_key", sponsor.lower())]
+        elif status:
+            filters = [("status", status)]
+        else:
+            filters = []
+        where, params = self._page_where(filters, "id", after)
+        if limit is not None or after:
+            where += " ORDER BY id"
+        if limit is not None:
+            where += " LIMIT ?"
+            params += (limit + 1,)
+
+        if fields:
+            # `->` keeps each value's JSON type (booleans included) and json()
+            # makes json_object embed it as JSON rather than as a string
+            arguments = ", ".join("?, json(data -> ?)" for _ in fields)
+            field_params = tuple(
+                value for name in fields for value in (name, f"$.{name}")
+            )
+            rows = self._connection().execute(
+                f"SELECT id, json_object({arguments}) FROM studies {where}",
+                field_params + params,
+            )
+            studies = [(study_id, json.loads(data)) for study_id, data in rows]
+        else:
+            studies = [(study.id, study) for study in self._query_studies(where, params)]
+
+        next_after = None
+        if limit is not None and len(studies) > limit:
+            studies = studies[:limit]
+            next_after = studies[-1][0]
+        total = self._count_studies(sponsor, status)
+        return [study for _, study in studies], next_after, total
+
+    def get_all_studies(self) -> List[Study]:
+        """Get all studies."""
+        return self._query_studies()
+
+    def get_study_by_id(self, study_id: str) -> Optional[Study]:
+        """Get study by ID."""
+        studies = self._query_studies("WHERE id = ?", (study_id,))
+        return studies[0] if studies else None
+
+    def get_studies_by_sponsor(self, sponsor: str) -> List[Study]:
+        """Get studies by sponsor."""
+        return self._query_studies("WHERE sponsor_key = ?", (sponsor.lower(),))
+
+    def get_studies_by_status(self, status: str) -> List[Study]:
+        """Get studies by status."""
+        return self._query_studies("WHERE status = ?", (status,))
+
+    def add_study(self, study: Study) -> bool:
+        """Add a new study."""
+        return self.add_studies([study]) == 1
+
+    def add_studies(self, studies: Iterable[Study]) -> int:
+        """Add studies in batches, skipping existing IDs; returns number added."""
+        return self._write_many(INSERT_STUDY, (_study_row(study) for study in studies))
+
+    def upsert_studies(self, studies: Iterable[Study]) -> int:
+        """Add studies in batches, replacing existing IDs; returns number written."""
+        return self._write_many(UPSERT_STUDY, (_study_row(study) for study in studies))
+
+    def update_study(self, study_id: str, updated_study: Study) -> bool:
+        """Update an existing study."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                UPDATE_STUDY, _study_row(updated_study) + (study_id,)
+            )
+        return cursor.rowcount == 1
+
+    def delete_study(self, study_id: str) -> bool:
+        """Delete a study."""
+        with self._connection() as connection:
+            cursor = connection.execute("DELETE FROM studies WHERE id = ?", (study_id,))
+        return cursor.rowcount == 1
+
+    def add_investigator_to_study(
+        self, study_id: str, investigator: Dict[str, str]
+    ) -> bool:
+        """Add principal investigator to a study."""
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE studies SET has_principal_investigator = 1, "
+                "data = json_set(data, '$.principalInvestigator', json(?), "
+                "'$.hasPrincipalInvestigator', json('true')) WHERE id = ?",
+                (json.dumps(investigator), study_id),
+            )
+        return cursor.rowcount == 1
+
+    # Statistics
+    def _get_counter(self, name: str) -> int:
+        """Get a single statistics counter."""
+        row = (
+            self._connection()
+            .execute("SELECT count FROM statistics WHERE name = ? AND key = ''", (name,))
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def _get_counters(self, name: str) -> Dict[str, int]:
+        """Get a keyed statistics counter."""
+        return dict(
+            self._connection().execute(
+                "SELECT key, count FROM statistics WHERE name = ?", (name,)
+            )
+        )
+
+    def get_user_count(self) -> int:
+        """Get total number of users."""
+        return self._get_counter("total_users")
+
+    def get_study_count(self) -> int:
+        """Get total number of studies."""
+        return self._get_counter("total_studies")
+
+    def get_users_by_company_count(self) -> Dict[str, int]:
+        """Get user count by company."""
+        return self._get_counters("users_by_company")
+
+    def get_studies_by_status_count(self) -> Dict[str, int]:
+        """Get study count by status."""
+        return self._get_counters("studies_by_status")
+
+    def get_studies_without_investigator_count(self) -> int:
+        """Get count of studies without principal investigator."""
+        return self._get_counter("studies_without_investigator")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get all statistics counters in one read."""
+        statistics = {
+            "total_users": 0,
+            "total_studies": 0,
+            "users_by_company": {},
+            "studies_by_status": {},
+            "studies_without_investigator": 0,
+        }
+        for name, key, count in self._connection().execute(
+            "SELECT name, key, count FROM statistics"
+        ):
+            if isinstance(statistics.get(name), dict):
+                statistics[name][key] = count
+            elif name in statistics:
+                statistics[name] = count
+        return statistics
+
+    def check_statistics(self) -> Dict[str, Any]:
+        """Compare the counters against a full scan of the tables."""
+        connection = self._connection()
+        # One read transaction so counters and scan see the same snapshot
+        with connection:
+            connection.execute("BEGIN")
+            counters = {
+                (name, key): count
+                for name, key, count in connection.execute(
+                    "SELECT name, key, count FROM statistics"
+                )
+            }
+            actual = {
+                (name, key): count
+                for name, key, count in connection.execute(STATISTICS_SCAN)
+            }
+        mismatches = [
+            {
+                "counter": name,
+                "key": key or None,
+                "maintained": counters.get((name, key), 0),
+                "actual": actual.get((name, key), 0),
+            }
+            for name, key in sorted(set(counters) | set(actual))
+            if counters.get((name, key), 0) != actual.get((name, key), 0)
+        ]
+        return {"consistent": not mismatches, "mismatches": mismatches}
+
+    # Change feed
+    def _get_change_version(self, connection: sqlite3.Connection) -> int:
+        """Get the version of the latest logged change."""
+        row = connection.execute(SELECT_CHANGE_VERSION).fetchone()
+        return row[0] if row else 0
+
+    def get_version(self) -> int:
+        """Get the current database version."""
+        return self._get_change_version(self._connection())
+
+    def get_changes(self, since: int) -> Optional[Tuple[int, List[Dict[str, Any]]]]:
+        """Get the users and studies changed after version `since`.
+
+        Returns (current version, changes) with one change per record, in
+        version order; upserts carry the current record. Returns None if the
+        change log no longer covers `since`, and the client should refetch.
+        """
+        connection = self._connection()
+        # One read transaction, so the records match the logged versions
+        connection.execute("BEGIN")
+        try:
+            version = self._get_change_version(connection)
+            (oldest,) = connection.execute("SELECT MIN(version) FROM changes").fetchone()
+            floor = oldest - 1 if oldest is not None else version
+            if since < floor or since > version:
+                return None
+
+            rows = connection.execute(SELECT_CHANGES, (since,)).fetchall()
+            ids = {"user": [], "study": []}
+            for kind, record_id, op, _ in rows:
+                if op == "upsert":
+                    ids[kind].append(record_id)
+            records = {
+                "user": {
+                    user.email_address: user
+                    for user in self._query_users(
+                        "WHERE email_address IN (SELECT value FROM json_each(?))",
+                        (json.dumps(ids["user"]),),
+                    )
+                },
+                "study": {
+                    study.id: study
+                    for study in self._query_studies(
+                        "WHERE id IN (SELECT value FROM json_each(?))",
+                        (json.dumps(ids["study"]),),
+                    )
+                },
+            }
+        finally:
+            connection.rollback()
+
+        return version, [
+            {
+                "version": change_version,
+                "type": kind,
+                "id": record_id,
+                "op": op,
+                "record": records[kind].get(record_id) if op == "upsert" else None,
+            }
+            for kind, record_id, op, change_version in rows
+        ]
+
+    def wait_for_changes(self, since: int, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a version other than `since`.
+
+        Writes may come from other processes, so this polls the version.
+        """
+        deadline = time.monotonic() + timeout
+        while self.get_version() == since:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(CHANGE_POLL_INTERVAL, remaining))
+        return True
+
+    # Database management
+    def clear_all_data(self):
+        """Clear all data from the database."""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM users")
+            connection.execute("DELETE FROM studies")
+
+    def reset_to_mock_data(self):
+        """Reset database to initial mock data."""
+        self.clear_all_data()
+        self._initialize_data()
+
+    def ensure_data_loaded(self):
+        """Seed mock data into an empty database (safe to call multiple times).
+
+        A database with any users or studies is left as it is, so mock
+        records deleted by users do not come back on the next start.
+        """
+        if not self.get_user_count() and not self.get_study_count():
+            self._initialize_data()
+
+    def export_data(self) -> Dict[str, Any]:
+        """Export all data as dictionaries."""
+        return {
+            "users": [user.to_dict() for user in self.get_all_users()],
+            "studies": [study.to_dict() for study in self.get_all_studies()],
+            "statistics": self.get_statistics(),
+        }
+
+    def export_records(self) -> Iterator[Tuple[str, bytes]]:
+        """Yield ("user" | "study", encoded JSON) for every record.
+
+        Rows are read from one read transaction on a separate connection, so
+        the export is consistent while writes continue, and only one row is
+        held in memory at a time. Stored study JSON is passed through as is.
+        """
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("BEGIN")
+            for row in connection.execute(f"{SELECT_USERS} ORDER BY email_address"):
+                first_name, last_name, email_address, company_association, role = row
+                user = User(
+                    first_name=first_name,
+                    last_name=last_name,
+                    email_address=email_address,
+                    company_association=company_association,
+                    role=role,
+                )
+                yield "user", user.to_json()
+            for (text,) in connection.execute(f"{SELECT_STUDIES} ORDER BY id"):
+                yield "study", text.encode("utf-8")
+        finally:
+            connection.close()
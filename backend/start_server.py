@@ -2,21 +2,103 @@
 """
 Startup script for the SDV Platform backend server.
 This script starts the Flask server with proper configuration.
+
+    python start_server.py                            # development server
+    python start_server.py --production --workers 4   # gunicorn workers
 """
 
+import argparse
+import multiprocessing
 import os
 import sys
-from app import app
+from app import app, resume_ingestion_jobs
+from config import DATABASE_BACKEND
+
+
+def run_production(workers: int, port: int, threads: int):
+    """Serve the preloaded app from several gunicorn worker processes.
+
+    Each worker answers at most `threads` requests at once, and an open
+    change feed (an event stream, or a long-poll waiting up to 60 seconds)
+    holds one of those threads the whole time. Event streams are closed
+    every few minutes and reconnect, but while open they count against the
+    budget: size workers * threads for the expected number of open feeds
+    plus ordinary requests.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionApplication(BaseApplication):
+        """Gunicorn application serving the already imported Flask app."""
+
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    if DATABASE_BACKEND != "sqlite" and workers > 1:
+        print(
+            "⚠️  DATABASE_BACKEND is not 'sqlite'; each worker will keep its own "
+            "copy of users and studies"
+        )
+
+    ProductionApplication(
+        {
+            "bind": f"0.0.0.0:{port}",
+            "workers": workers,
+            "threads": threads,
+            # Import the app once in the master so workers fork with it loaded
+            "preload_app": True,
+            # Protocol analysis waits on the TrialMonitor agent
+            "timeout": 660,
+            # Workers race to claim unfinished uploads; each job goes to one
+            "post_worker_init": lambda worker: resume_ingestion_jobs(),
+        }
+    ).run()
 
 
 def main():
     """Start the Flask server."""
+    parser = argparse.ArgumentParser(description="Start the SDV Platform backend")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="serve with gunicorn worker processes instead of the debug server",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count())),
+        help="number of worker processes in production mode",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=int(os.getenv("GUNICORN_THREADS", 4)),
+        help="request threads per worker in production mode (open change "
+        "feeds each hold one)",
+    )
+    parser.add_argument("--port", type=int, default=5001)
+    args = parser.parse_args()
+
     print("=" * 60)
     print("SDV PLATFORM BACKEND SERVER")
     print("=" * 60)
     print()
-    print("Starting Flask server...")
-    print("Server will be available at: http://localhost:5001")
+    if args.production:
+        print(
+            f"Starting production server with {args.workers} workers "
+            f"x {args.threads} threads..."
+        )
+        print(f"Database backend: {DATABASE_BACKEND}")
+    else:
+        print("Starting Flask server...")
+    print(f"Server will be available at: http://localhost:{args.port}")
     print("API Documentation: See API_DOCUMENTATION.md")
     print()
     print("Database will be automatically initialized on startup")
@@ -36,7 +118,11 @@ def main():
     print()
 
     try:
-        app.run(debug=True, host="0.0.0.0", port=5001)
+        if args.production:
+            run_production(args.workers, args.port, args.threads)
+        else:
+            resume_ingestion_jobs()
+            app.run(debug=True, host="0.0.0.0", port=args.port)
     except KeyboardInterrupt:
         print("\nServer stopped by user")
     except Exception as e:
@@ -0,0 +1,53 @@
+"""
+Tests for the /api/changes feed (long-poll and Server-Sent Events).
+"""
+
+NEW_STUDY = {
+    "title": "Change Feed Study",
+    "protocol": "A study created to produce a change.",
+    "sponsor": "Test Pharmaceuticals",
+    "phase": "Phase II",
+    "indication": "Test Indication",
+}
+
+
+def test_long_poll_returns_changes_since_version(client):
+    version = client.get("/api/changes").get_json()["version"]
+    study_id = client.post("/api/studies", json=NEW_STUDY).get_json()["study"]["id"]
+
+    response = client.get(f"/api/changes?since={version}&timeout=0")
+    assert response.status_code == 200
+    changes = response.get_json()["changes"]
+    assert [(c["type"], c["id"], c["op"]) for c in changes] == [
+        ("study", study_id, "upsert")
+    ]
+
+
+def test_event_stream_closes_after_its_lifetime(client, flask_app):
+    version = client.get("/api/changes").get_json()["version"]
+    stream = flask_app.stream_changes(version, lifetime=0.5)
+    assert next(stream).startswith(b"retry: ")
+
+    client.post("/api/studies", json=NEW_STUDY)
+    events = list(stream)  # ends on its own
+
+    assert b"event: changes" in events[0]
+    latest = client.get("/api/changes").get_json()["version"]
+    # The last message moves Last-Event-ID to where the reconnect resumes
+    assert events[-1] == f"id: {latest}\n\n".encode()
+
+
+def test_event_stream_resumes_from_last_event_id(client):
+    version = client.get("/api/changes").get_json()["version"]
+    client.post("/api/studies", json=NEW_STUDY)
+
+    response = client.get(
+        "/api/changes?since=0",
+        headers={"Accept": "text/event-stream", "Last-Event-ID": str(version)},
+        buffered=False,
+    )
+    chunks = response.response
+    next(chunks)  # connected
+    event = next(chunks)
+    response.close()
+    assert b"event: changes" in event and b"Change Feed Study" in event
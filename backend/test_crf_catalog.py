@@ -0,0 +1,38 @@
+"""
+Tests for the in-memory CRF listing.
+"""
+
+import os
+
+from crf_catalog import CRFCatalog, hash_file
+
+
+def test_listing_describes_pdfs(tmp_path):
+    (tmp_path / "Demographics.pdf").write_bytes(b"%PDF demographics")
+    (tmp_path / "notes.txt").write_text("not a CRF")
+
+    body, etag = CRFCatalog(str(tmp_path)).get_listing()
+    assert b"Demographics.pdf" in body and b"notes.txt" not in body
+    assert etag
+
+
+def test_refresh_picks_up_files_overwritten_in_place(tmp_path):
+    path = tmp_path / "Medications.pdf"
+    path.write_bytes(b"%PDF first version")
+    catalog = CRFCatalog(str(tmp_path), refresh_interval=0)
+    catalog.refresh()
+    first_etag = catalog.etag
+    directory_mtime = os.stat(tmp_path).st_mtime_ns
+
+    # Rewriting a file's content does not touch the directory mtime
+    with open(path, "r+b") as f:
+        f.write(b"%PDF second version, longer")
+    assert os.stat(tmp_path).st_mtime_ns == directory_mtime
+
+    assert catalog.refresh()
+    (listed,) = catalog.files
+    assert listed["size"] == os.path.getsize(path)
+    assert listed["contentHash"] == hash_file(str(path))
+    assert catalog.etag != first_etag
+
+    assert not catalog.refresh()
@@ -0,0 +1,73 @@
+"""
+Tests for serving CRF files with ETags, ranges and versioned URLs.
+"""
+
+import pytest
+
+from crf_catalog import CRFCatalog
+
+PDF_BYTES = b"%PDF-1.4\n" + bytes(range(256)) * 8
+
+
+@pytest.fixture
+def crf_dir(flask_app, monkeypatch, tmp_path):
+    """Serve CRF files from an empty scratch directory."""
+    monkeypatch.setattr(flask_app, "CRF_DIR", str(tmp_path))
+    monkeypatch.setattr(flask_app, "crf_catalog", CRFCatalog(str(tmp_path)))
+    return tmp_path
+
+
+def test_listing_is_revalidated_with_its_etag(client, crf_dir):
+    (crf_dir / "Demographics.pdf").write_bytes(PDF_BYTES)
+
+    response = client.get("/api/files/crf")
+    assert response.status_code == 200
+    (listed,) = response.get_json()["files"]
+    assert listed["type"] == "Demographics"
+
+    response = client.get(
+        "/api/files/crf", headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_file_conditional_and_range_requests(client, crf_dir):
+    (crf_dir / "Medications.pdf").write_bytes(PDF_BYTES)
+
+    response = client.get("/api/files/crf/Medications.pdf")
+    assert response.status_code == 200
+    assert response.data == PDF_BYTES
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert "no-cache" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/api/files/crf/Medications.pdf", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    response = client.get(
+        "/api/files/crf/Medications.pdf", headers={"Range": "bytes=9-24"}
+    )
+    assert response.status_code == 206
+    assert response.data == PDF_BYTES[9:25]
+
+
+def test_versioned_urls_are_immutable(client, crf_dir):
+    (crf_dir / "Medications.pdf").write_bytes(PDF_BYTES)
+    (listed,) = client.get("/api/files/crf").get_json()["files"]
+
+    url = f"/api/files/crf/Medications.pdf?v={listed['contentHash']}"
+    response = client.get(url)
+    assert "immutable" in response.headers["Cache-Control"]
+    # A stale version is served fresh content but not cached for good
+    response = client.get("/api/files/crf/Medications.pdf?v=old")
+    assert "immutable" not in response.headers["Cache-Control"]
+
+
+def test_docx_names_serve_the_pdf_rendition(client, crf_dir):
+    (crf_dir / "Week0.pdf").write_bytes(PDF_BYTES)
+
+    assert client.get("/api/files/crf/Week0.docx").data == PDF_BYTES
+    assert client.get("/api/files/crf/Missing.pdf").status_code == 404
+    assert client.get("/api/files/crf/..%5Csecret.pdf").status_code == 400
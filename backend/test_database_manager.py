@@ -0,0 +1,294 @@
+"""
+Tests for the in-memory and SQLite database managers.
+"""
+
+import multiprocessing
+import threading
+from datetime import datetime
+
+from models import Study, User
+from sqlite_database_manager import SQLiteDatabaseManager
+
+
+def make_user(index: int, company: str = "Google") -> User:
+    return User("Test", f"User{index}", f"test.user{index}@example.com", company, "Sponsor")
+
+
+def make_study(study_id: str, status: str = "draft") -> Study:
+    return Study(
+        study_id=study_id,
+        title=f"Study {study_id}",
+        protocol="Protocol",
+        sponsor="Test Pharmaceuticals",
+        status=status,
+        created_at=datetime(2024, 1, 1),
+        sites=[],
+    )
+
+
+def test_add_user_and_study_report_one_row(manager):
+    users_before = manager.get_user_count()
+    studies_before = manager.get_study_count()
+
+    assert manager.add_user(make_user(1)) is True
+    assert manager.add_study(make_study("STD-900")) is True
+    # Existing keys are skipped
+    assert manager.add_user(make_user(1)) is False
+    assert manager.add_study(make_study("STD-900")) is False
+
+    assert manager.get_user_count() == users_before + 1
+    assert manager.get_study_count() == studies_before + 1
+
+
+def test_bulk_writes_count_records_not_trigger_rows(manager):
+    users = [make_user(i) for i in range(2500)]
+    assert manager.add_users(users) == 2500
+    assert manager.add_users(users) == 0
+    assert manager.upsert_users([make_user(1, company="Medidata")]) == 1
+    assert manager.upsert_studies([make_study("STD-901"), make_study("STD-902")]) == 2
+    assert manager.check_statistics()["consistent"]
+
+
+def test_sqlite_mock_data_only_seeds_an_empty_database(tmp_path):
+    path = str(tmp_path / "sdv_platform.db")
+    manager = SQLiteDatabaseManager(path)
+    assert manager.delete_user("sarah.johnson@regeneron.com")
+    assert manager.delete_study("STD-001")
+
+    # A restart (new manager, app startup hook) keeps the deletions
+    restarted = SQLiteDatabaseManager(path)
+    restarted.ensure_data_loaded()
+    assert restarted.get_user_by_email("sarah.johnson@regeneron.com") is None
+    assert restarted.get_study_by_id("STD-001") is None
+
+    restarted.clear_all_data()
+    restarted.ensure_data_loaded()
+    assert restarted.get_study_by_id("STD-001") is not None
+
+
+def collect_pages(list_page, limit: int, between_pages=None):
+    """Walk every page of a listing; returns (keys, totals) in page order."""
+    keys, totals, after = [], [], None
+    while True:
+        page, after, total = list_page(limit=limit, after=after)
+        keys += [record["emailAddress"] for record in page]
+        totals.append(total)
+        if after is None:
+            return keys, totals
+        if between_pages:
+            between_pages()
+
+
+def test_user_pages_follow_email_order(manager):
+    manager.add_users(make_user(i) for i in range(100))
+    list_users = lambda **page: manager.list_users(fields=["emailAddress"], **page)
+
+    keys, totals = collect_pages(list_users, limit=7)
+
+    assert keys == sorted(user.email_address for user in manager.get_all_users())
+    assert set(totals) == {manager.get_user_count()}
+
+
+def test_user_pages_do_not_skip_or_repeat_across_writes(manager):
+    manager.add_users(make_user(i) for i in range(50))
+    existing = {user.email_address for user in manager.get_all_users()}
+    inserted = iter(range(1000, 1100))
+
+    # Insert a user sorting before every cursor between each page
+    def write():
+        index = next(inserted)
+        manager.add_user(User("Aa", "Aa", f"aaa{index}@example.com", "Google", "Sponsor"))
+
+    keys, _ = collect_pages(
+        lambda **page: manager.list_users(fields=["emailAddress"], **page),
+        limit=5,
+        between_pages=write,
+    )
+
+    assert len(keys) == len(set(keys))
+    assert existing <= set(keys)
+
+
+def test_filtered_page_totals(manager):
+    manager.add_users(make_user(i, company="Medidata") for i in range(10))
+    manager.add_studies(make_study(f"STD-{i:04d}", status="on-hold") for i in range(10))
+
+    _, _, total = manager.list_users(company="medidata", limit=2)
+    assert total == len(manager.get_users_by_company("medidata"))
+    _, after, total = manager.list_studies(status="on-hold", limit=3)
+    assert total == 10
+    page, _, _ = manager.list_studies(status="on-hold", limit=3, after=after)
+    assert [study.id for study in page] == ["STD-0003", "STD-0004", "STD-0005"]
+
+
+def _add_study_in_new_process(path: str, study_id: str):
+    SQLiteDatabaseManager(path).add_study(make_study(study_id, "active"))
+
+
+def test_sqlite_workers_share_writes_and_changes(tmp_path):
+    path = str(tmp_path / "shared.db")
+    worker = SQLiteDatabaseManager(path)
+    version = worker.get_version()
+
+    # Another gunicorn worker process writes to the same database
+    context = multiprocessing.get_context("spawn")
+    process = context.Process(
+        target=_add_study_in_new_process, args=(path, "STD-WORKER")
+    )
+    process.start()
+    assert worker.wait_for_changes(version, 30)
+    process.join(30)
+    assert process.exitcode == 0
+
+    assert worker.get_study_by_id("STD-WORKER").status == "active"
+    new_version, changes = worker.get_changes(version)
+    assert new_version > version
+    assert [(c["type"], c["id"]) for c in changes] == [("study", "STD-WORKER")]
+    assert worker.check_statistics()["consistent"]
+
+
+def test_sqlite_lookups_use_indexes(sqlite_manager):
+    connection = sqlite_manager._connection()
+    for query, params in [
+        ("SELECT * FROM users WHERE company_key = ?", ("google",)),
+        ("SELECT * FROM users WHERE role = ?", ("Sponsor",)),
+        ("SELECT * FROM studies WHERE sponsor_key = ?", ("regeneron",)),
+        ("SELECT * FROM studies WHERE status = ?", ("active",)),
+    ]:
+        plan = " ".join(
+            row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        )
+        assert "USING INDEX" in plan, (query, plan)
+
+
+def test_sqlite_data_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "sdv_platform.db")
+    manager = SQLiteDatabaseManager(path)
+    manager.add_user(make_user(7, company="Acme Bio"))
+    manager.add_study(make_study("STD-PERSIST"))
+
+    restarted = SQLiteDatabaseManager(path)
+    # Company lookups ignore case
+    assert [u.email_address for u in restarted.get_users_by_company("acme bio")] == [
+        "test.user7@example.com"
+    ]
+    assert restarted.get_study_by_id("STD-PERSIST").title == "Study STD-PERSIST"
+
+
+def test_lookups_follow_updates_and_deletes(manager):
+    manager.add_user(make_user(1, company="Acme Bio"))
+    manager.add_study(make_study("STD-MOVE", status="draft"))
+
+    moved = make_user(1, company="Beta Labs")
+    moved.role = "Investigator"
+    assert manager.update_user("test.user1@example.com", moved)
+    assert manager.get_users_by_company("Acme Bio") == []
+    assert [u.email_address for u in manager.get_users_by_company("beta labs")] == [
+        "test.user1@example.com"
+    ]
+    assert "test.user1@example.com" in {
+        u.email_address for u in manager.get_users_by_role("Investigator")
+    }
+
+    assert manager.update_study("STD-MOVE", make_study("STD-MOVE", status="on-hold"))
+    assert "STD-MOVE" not in {s.id for s in manager.get_studies_by_status("draft")}
+    assert "STD-MOVE" in {s.id for s in manager.get_studies_by_status("on-hold")}
+
+    assert manager.delete_user("test.user1@example.com")
+    assert manager.delete_study("STD-MOVE")
+    assert manager.get_users_by_company("Beta Labs") == []
+    assert "STD-MOVE" not in {s.id for s in manager.get_studies_by_status("on-hold")}
+    assert "STD-MOVE" not in {
+        s.id for s in manager.get_studies_by_sponsor("test pharmaceuticals")
+    }
+
+
+def test_statistics_stay_consistent_across_writes(manager):
+    before = manager.get_statistics()
+    manager.add_users([make_user(i, company="Acme Bio") for i in range(3)])
+    manager.upsert_users([make_user(0, company="Beta Labs")])
+    manager.delete_user("test.user1@example.com")
+    manager.add_studies([make_study(f"STD-S{i}") for i in range(3)])
+    manager.update_study("STD-S0", make_study("STD-S0", status="active"))
+    manager.add_investigator_to_study("STD-S1", {"name": "Dr. Test"})
+    manager.delete_study("STD-S2")
+
+    statistics = manager.get_statistics()
+    assert statistics["total_users"] == before["total_users"] + 2
+    assert statistics["users_by_company"]["Acme Bio"] == 1
+    assert statistics["users_by_company"]["Beta Labs"] == 1
+    assert statistics["total_studies"] == before["total_studies"] + 2
+    assert statistics["studies_without_investigator"] == (
+        before["studies_without_investigator"] + 1
+    )
+    assert manager.get_user_count() == statistics["total_users"]
+    assert manager.check_statistics() == {"consistent": True, "mismatches": []}
+
+
+def test_snapshots_are_unchanged_by_later_writes(memory_manager):
+    snapshot = memory_manager.get_snapshot()
+    statistics = memory_manager.get_statistics_of(snapshot)
+    users = dict(snapshot.users)
+
+    memory_manager.add_users([make_user(i) for i in range(3)])
+    memory_manager.add_study(make_study("STD-SNAP"))
+    memory_manager.add_investigator_to_study("STD-SNAP", {"name": "Dr. Test"})
+    memory_manager.delete_user(next(iter(users)))
+
+    assert memory_manager.get_snapshot() is not snapshot
+    assert snapshot.users == users
+    assert "STD-SNAP" not in snapshot.studies
+    assert memory_manager.get_statistics_of(snapshot) == statistics
+    assert memory_manager.get_study_by_id("STD-SNAP").has_principal_investigator()
+
+
+def test_concurrent_reads_see_consistent_snapshots(memory_manager):
+    errors = []
+    stop = threading.Event()
+
+    def write(worker: int):
+        try:
+            for i in range(100):
+                user = make_user(worker * 1000 + i)
+                study_id = f"STD-W{worker}-{i}"
+                memory_manager.add_user(user)
+                memory_manager.add_study(make_study(study_id))
+                memory_manager.add_investigator_to_study(study_id, {"name": "Dr. Test"})
+                if i % 2:
+                    memory_manager.delete_user(user.email_address)
+                    memory_manager.delete_study(study_id)
+        except Exception as error:
+            errors.append(error)
+
+    def read():
+        try:
+            while not stop.is_set():
+                snapshot = memory_manager.get_snapshot()
+                statistics = memory_manager.get_statistics_of(snapshot)
+                assert statistics["total_users"] == len(snapshot.users)
+                assert sum(statistics["users_by_company"].values()) == len(
+                    snapshot.users
+                )
+                assert sum(statistics["studies_by_status"].values()) == len(
+                    snapshot.studies
+                )
+                page, _, total = memory_manager.list_studies(limit=10)
+                assert len(page) == min(10, total)
+                assert all(study is not None for study in page)
+        except Exception as error:
+            errors.append(error)
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(3)]
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    assert memory_manager.check_statistics() == {"consistent": True, "mismatches": []}
+    added = {f"STD-W{n}-{i}" for n in range(3) for i in range(0, 100, 2)}
+    assert added <= {study.id for study in memory_manager.get_all_studies()}
@@ -0,0 +1,53 @@
+"""
+Tests for the paginated /documents listing.
+"""
+
+
+def list_all(client, query):
+    """Follow next_cursor through every page of a listing."""
+    pages = []
+    url = f"/documents?{query}"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        pages.append(page["documents"])
+        cursor = page["next_cursor"]
+        url = f"/documents?{query}&after={cursor}" if cursor else None
+    return pages
+
+
+def test_pages_cover_every_document_once(client, add_documents):
+    ids = add_documents("DOC-PAGES", [f"chunk {i}" for i in range(5)])
+
+    pages = list_all(client, "study_id=DOC-PAGES&limit=2")
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(d["document_id"] for page in pages for d in page) == sorted(ids)
+
+
+def test_projections(client, add_documents):
+    add_documents("DOC-FIELDS", ["x" * 500])
+
+    def only_document(fields):
+        response = client.get(f"/documents?study_id=DOC-FIELDS&fields={fields}")
+        (document,) = response.get_json()["documents"]
+        return document
+
+    assert set(only_document("metadata")) == {"document_id", "metadata"}
+    assert only_document("preview")["content_preview"] == "x" * 200 + "..."
+    assert only_document("full")["content"] == "x" * 500
+
+
+def test_metadata_filters_combine(client, add_documents):
+    add_documents("DOC-FILTER", ["a report"], file_type="pdf")
+    add_documents("DOC-FILTER-2", ["a table"], file_type="csv")
+
+    (page,) = list_all(client, "study_id=DOC-FILTER-2&file_type=csv")
+    assert [d["document_id"] for d in page] == ["DOC-FILTER-2-0"]
+    assert list_all(client, "study_id=DOC-FILTER-2&file_type=pdf") == [[]]
+
+
+def test_invalid_requests(client):
+    assert client.get("/documents?limit=0").status_code == 400
+    assert client.get("/documents?after=not-a-cursor!").status_code == 400
+    assert client.get("/documents?fields=everything").status_code == 400
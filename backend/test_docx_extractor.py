@@ -0,0 +1,121 @@
+"""
+Tests for streaming DOCX text extraction.
+"""
+
+import io
+import time
+import zipfile
+
+import pytest
+
+from docx_extractor import extract_text_from_docx, iter_document_parts
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def paragraph(*runs):
+    return "<w:p>" + "".join(f"<w:r>{run}</w:r>" for run in runs) + "</w:p>"
+
+
+def text(value):
+    return f"<w:t>{value}</w:t>"
+
+
+def table(*rows):
+    return (
+        "<w:tbl>"
+        + "".join(
+            "<w:tr>" + "".join(f"<w:tc>{cell}</w:tc>" for cell in row) + "</w:tr>"
+            for row in rows
+        )
+        + "</w:tbl>"
+    )
+
+
+def document_xml(body):
+    return f"<w:document {W}><w:body>{body}</w:body></w:document>".encode()
+
+
+def docx_bytes(body):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document_xml(body))
+    return buffer.getvalue()
+
+
+def test_paragraphs_and_tables_in_document_order(tmp_path):
+    body = (
+        paragraph(text("Subject"), "<w:tab/>", text("1001"))
+        + paragraph(text("  "))
+        + table(
+            [paragraph(text("Test")), paragraph(text("Result"))],
+            [paragraph(text("ALT")), paragraph(text("32"), "<w:br/>", text("U/L"))],
+        )
+        + paragraph(text("Reviewed"))
+    )
+    path = tmp_path / "labs.docx"
+    path.write_bytes(docx_bytes(body))
+
+    expected = "Subject\t1001\nTest | Result\nALT | 32\nU/L\nReviewed"
+    assert extract_text_from_docx(str(path)) == expected
+    # File objects (such as upload streams) work too
+    assert extract_text_from_docx(io.BytesIO(docx_bytes(body))) == expected
+
+
+def test_nested_tables_become_cell_text():
+    inner = table([paragraph(text("a")), paragraph(text("b"))])
+    body = table([paragraph(text("outer")), paragraph(text("x")) + inner])
+
+    parts = list(iter_document_parts(io.BytesIO(document_xml(body))))
+    assert parts == [("row", ["outer", "x a | b"]), ("table", None)]
+
+
+def test_invalid_files_raise():
+    with pytest.raises(Exception, match="Invalid DOCX file"):
+        extract_text_from_docx(io.BytesIO(b"not a zip"))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/other.xml", "<x/>")
+    with pytest.raises(Exception, match="Invalid DOCX file"):
+        extract_text_from_docx(buffer)
+
+
+def test_large_documents_stream(tmp_path):
+    body = "".join(paragraph(text(f"Line {i}")) for i in range(20000))
+    path = tmp_path / "large.docx"
+    path.write_bytes(docx_bytes(body))
+
+    lines = extract_text_from_docx(str(path)).split("\n")
+    assert len(lines) == 20000 and lines[-1] == "Line 19999"
+
+
+def test_docx_uploads_are_ingested(client, add_documents):
+    # add_documents stubs the embedding model for the ingestion workers
+    body = paragraph(text("Visit note for subject DOCX-UPLOAD-42"))
+    response = client.post(
+        "/upload",
+        data={
+            "file": (io.BytesIO(docx_bytes(body)), "протокол.docx"),
+            "study_id": "DOCX-UPLOAD",
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 202, response.get_json()
+    status_url = response.get_json()["status_url"]
+
+    deadline = time.monotonic() + 30
+    job = client.get(status_url).get_json()["job"]
+    while job["status"] not in ("completed", "failed"):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+        job = client.get(status_url).get_json()["job"]
+    assert job["status"] == "completed", job["error"]
+    assert job["file_type"] == "docx"
+
+    response = client.post(
+        "/search",
+        json={"query": "DOCX-UPLOAD-42", "mode": "keyword", "study_id": "DOCX-UPLOAD"},
+    )
+    (result,) = response.get_json()["results"]
+    assert "DOCX-UPLOAD-42" in result["content"]
@@ -0,0 +1,120 @@
+"""
+Tests for the on-disk embedding cache.
+"""
+
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+
+
+def fake_embeddings(texts):
+    return [[float(len(text)), 1.0, 2.0] for text in texts]
+
+
+def test_cached_embedding_function_reuses_vectors(tmp_path):
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return fake_embeddings(texts)
+
+    function = CachedEmbeddingFunction(embed, EmbeddingCache(str(tmp_path)))
+    assert function(["a", "bb", "a"]) == [[1.0, 1.0, 2.0], [2.0, 1.0, 2.0], [1.0, 1.0, 2.0]]
+    assert function(["bb", "ccc"]) == [[2.0, 1.0, 2.0], [3.0, 1.0, 2.0]]
+
+    assert calls == [["a", "bb"], ["ccc"]]
+    stats = function.get_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 3, 3)
+
+    # Another process (here: another cache object) sees the stored vectors
+    reopened = EmbeddingCache(str(tmp_path))
+    assert list(reopened.get_many([function.content_hash("a")])) == [
+        function.content_hash("a")
+    ]
+
+
+def test_compact_drops_stale_entries(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["old", "new"], [[1.0, 2.0], [3.0, 4.0]])
+    cache._connection().execute("UPDATE embeddings SET last_used = 0 WHERE content_hash = 'old'")
+    cache._connection().commit()
+
+    result = cache.compact(max_age_seconds=60)
+
+    assert (result["removed"], result["entries"]) == (1, 1)
+    assert cache.get_entry_count() == 1
+    np.testing.assert_array_equal(cache.get_many(["new"])["new"], [3.0, 4.0])
+    assert os.listdir(tmp_path).count("vectors-1.f32") == 1
+
+
+def test_failed_compact_releases_the_write_lock(tmp_path, monkeypatch):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put_many(["a"], [[1.0, 2.0]])
+
+    memmap = np.memmap
+
+    # Create the new generation's file, then fail while copying into it
+    def fail(path, *args, mode="r+", **kwargs):
+        if mode == "w+":
+            open(path, "wb").close()
+            raise OSError("disk full")
+        return memmap(path, *args, mode=mode, **kwargs)
+
+    monkeypatch.setattr(np, "memmap", fail)
+    with pytest.raises(OSError):
+        cache.compact()
+    monkeypatch.undo()
+
+    assert not os.path.exists(os.path.join(tmp_path, "vectors-1.f32"))
+    assert cache.generation == 0
+    # Another writer can still take the write lock
+    other = EmbeddingCache(str(tmp_path))
+    other.put_many(["b"], [[5.0, 6.0]])
+    assert cache.get_entry_count() == 2
+
+
+def test_entry_count_is_safe_during_writes(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    errors = []
+
+    def write(worker):
+        try:
+            for i in range(20):
+                cache.put_many([f"{worker}-{i}"], [[float(i), 0.0]])
+                cache.get_entry_count()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert cache.get_entry_count() == 80
+
+
+def test_a_stale_process_never_shrinks_the_vectors_file(tmp_path):
+    first = EmbeddingCache(str(tmp_path))
+    first.put_many(["first-0"], [[0.0, 0.0]])
+    second = EmbeddingCache(str(tmp_path))
+    # Two batches, so the second one doubles the file past what `first` needs
+    for batch in (range(3000), range(3000, 4000)):
+        second.put_many([f"second-{i}" for i in batch], [[i, 1.0] for i in batch])
+    size = second.get_file_size()
+
+    # `first` still maps the file at its original size
+    first.put_many(["first-1"], [[1.0, 0.0]])
+    assert first.get_file_size() >= size
+    second.put_many(["second-late"], [[9.0, 9.0]])
+
+    reader = EmbeddingCache(str(tmp_path))
+    vectors = reader.get_many(["first-1", "second-3999", "second-late"])
+    np.testing.assert_array_equal(vectors["first-1"], [1.0, 0.0])
+    np.testing.assert_array_equal(vectors["second-3999"], [3999.0, 1.0])
+    np.testing.assert_array_equal(vectors["second-late"], [9.0, 9.0])
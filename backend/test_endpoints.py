@@ -152,6 +152,7 @@ def test_create_study():
         headers={"Content-Type": "application/json"},
     )
     print(f"Status: {response.status_code}")
+    assert response.status_code == 201, response.json()
     if response.status_code == 201:
         data = response.json()
         print(f"Message: {data.get('message')}")
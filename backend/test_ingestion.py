@@ -0,0 +1,122 @@
+"""
+Tests for the upload ingestion queue and its job store.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+from werkzeug.utils import secure_filename
+
+from ingestion import IngestionJob, IngestionJobStore, IngestionQueue
+
+
+def dead_pid() -> int:
+    """Get the ID of a process that has exited."""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def recording_queue(store=None):
+    """A queue whose jobs record the file type they were run with."""
+    processed = {}
+    done = threading.Event()
+
+    def process(job):
+        processed[job.id] = job.file_type
+        done.set()
+
+    return IngestionQueue(process, max_workers=1, store=store), processed, done
+
+
+def stored_job(store, tmp_path, job_id, status, owner):
+    """Save a job as a previous server run left it."""
+    file_path = tmp_path / f"{job_id}_pdf"
+    file_path.write_bytes(b"%PDF-1.4")
+    job = IngestionJob(
+        job_id, f"doc-{job_id}", "pdf", str(file_path), 8, {"file_type": "pdf"}
+    )
+    job.status = status
+    store.save(job)
+    connection = store._connection()
+    with connection:
+        connection.execute("UPDATE jobs SET owner = ? WHERE id = ?", (owner, job_id))
+    return job
+
+
+def test_jobs_keep_the_original_file_type(tmp_path):
+    # Non-ASCII names lose their extension when sanitized
+    filename = secure_filename("протокол.pdf")
+    assert "." not in filename
+
+    queue, processed, done = recording_queue(
+        IngestionJobStore(str(tmp_path / "jobs.sqlite3"))
+    )
+    job = queue.submit(
+        filename, str(tmp_path / filename), 8, {"file_type": "pdf"}, job_id="job-1"
+    )
+    assert done.wait(5)
+    assert processed == {"job-1": "pdf"}
+    assert queue.get_job_status(job.id)["file_type"] == "pdf"
+
+
+def test_process_file_path_dispatches_on_file_type(flask_app, tmp_path):
+    path = tmp_path / "upload-without-extension"
+    path.write_text("site,subjects\n101,12\n")
+
+    text = flask_app.process_file_path(str(path), "csv")
+    assert "Columns: site, subjects" in text
+
+
+def test_resume_requeues_jobs_left_by_a_stopped_process(tmp_path):
+    store = IngestionJobStore(str(tmp_path / "jobs.sqlite3"))
+    stopped = dead_pid()
+    stored_job(store, tmp_path, "embedding", "embedding", stopped)
+    stored_job(store, tmp_path, "queued", "queued", stopped)
+    stored_job(store, tmp_path, "done", "completed", stopped)
+    # Still owned by a running process, which will finish it itself
+    stored_job(store, tmp_path, "running", "extracting", os.getppid())
+    missing = stored_job(store, tmp_path, "missing", "queued", stopped)
+    os.remove(missing.file_path)
+
+    queue, processed, _ = recording_queue(store)
+    assert queue.resume_unfinished() == 2
+    queue._executor.shutdown(wait=True)
+
+    assert processed == {"embedding": "pdf", "queued": "pdf"}
+    assert store.load("embedding")["status"] == "completed"
+    assert store.load("queued")["status"] == "completed"
+    assert store.load("running")["status"] == "extracting"
+    assert store.load("missing")["status"] == "failed"
+
+    # A second resume finds nothing left to claim
+    assert IngestionQueue(lambda job: None, store=store).resume_unfinished() == 0
+
+
+def test_a_job_is_claimed_once(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = IngestionJobStore(path)
+    stored_job(store, tmp_path, "job", "queued", dead_pid())
+    other_process = IngestionJobStore(path)
+
+    def claimed_by_other_process_meanwhile(job_id, owner):
+        claimed = other_process.claim_unfinished(lambda job_id, owner: True)
+        assert [job.id for job in claimed] == ["job"]
+        return True
+
+    assert store.claim_unfinished(claimed_by_other_process_meanwhile) == []
+
+
+def test_store_keeps_the_same_history_as_the_queue(tmp_path):
+    store = IngestionJobStore(str(tmp_path / "jobs.sqlite3"), max_history=3)
+    running = stored_job(store, tmp_path, "running", "embedding", os.getpid())
+    for number in range(5):
+        stored_job(store, tmp_path, f"done-{number}", "completed", os.getpid())
+
+    (count,) = store._connection().execute("SELECT COUNT(*) FROM jobs").fetchone()
+    assert count == 3
+    assert store.load(running.id)["status"] == "embedding"
+    assert store.load("done-0") is None
+    assert store.load("done-4")["status"] == "completed"
@@ -0,0 +1,107 @@
+"""
+Tests for the BM25 keyword index and hybrid search.
+"""
+
+import keyword_index
+from keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+
+
+def test_tokenize_keeps_identifiers_whole():
+    assert tokenize("Subject SUB_1 on PROT-001, 5.2mg") == [
+        "subject",
+        "sub_1",
+        "sub",
+        "1",
+        "on",
+        "prot-001",
+        "prot",
+        "001",
+        "5.2mg",
+        "5",
+        "2mg",
+    ]
+
+
+def test_reciprocal_rank_fusion_prefers_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]])
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "c"]
+
+
+def test_search_ranks_exact_identifier_matches(tmp_path):
+    index = KeywordIndex(str(tmp_path / "index.jsonl"))
+    index.add_document("labs", "PROT-001 hemoglobin results for SUB_1")
+    index.add_document("vitals", "blood pressure for SUB_2 under PROT-002")
+    index.add_document("notes", "protocol deviation notes")
+
+    # The whole identifier outranks documents sharing only its parts
+    assert [doc_id for doc_id, _ in index.search("PROT-001")][0] == "labs"
+    assert [doc_id for doc_id, _ in index.search("hemoglobin")] == ["labs"]
+    assert index.search("nothing matches") == []
+
+
+def test_log_is_replayed_and_shared(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    index = KeywordIndex(path)
+    index.add_document("a", "first version")
+    index.add_document("a", "second version")
+    index.add_document("b", "other document")
+    assert index.remove_document("b")
+
+    # Another worker process sees the same documents through the log
+    other = KeywordIndex(path)
+    assert other.get_document_count() == 1
+    assert [doc_id for doc_id, _ in other.search("second")] == ["a"]
+    assert other.search("first") == []
+
+    index.add_document("c", "added later")
+    assert other.has_document("c")
+
+
+def test_log_is_compacted_and_other_processes_follow(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_index, "COMPACT_MIN_ENTRIES", 10)
+    path = tmp_path / "index.jsonl"
+    index = KeywordIndex(str(path))
+    other = KeywordIndex(str(path))
+    index.add_document("kept", "hemoglobin results")
+    for version in range(30):
+        index.add_document("updated", f"visit {version} notes")
+
+    # Re-adding one document does not grow the log without bound
+    assert len(path.read_text().splitlines()) < 10
+    assert other.get_document_count() == 2
+    assert [doc_id for doc_id, _ in other.search("visit 29")][0] == "updated"
+    assert other.search("28") == []
+
+    other.add_document("added", "added by the other process")
+    assert index.has_document("added")
+    assert index.compact()["entries_after"] == 3
+    assert len(path.read_text().splitlines()) == 3
+    assert KeywordIndex(str(path)).get_document_count() == 3
+
+
+def test_hybrid_search_finds_identifiers(client, add_documents):
+    add_documents(
+        "HYBRID",
+        [
+            "lab results for subject SUB-7781 at week 4",
+            "lab results for another subject at week 4",
+        ],
+    )
+
+    for mode in ("keyword", "hybrid"):
+        response = client.post(
+            "/search",
+            json={
+                "query": "SUB-7781",
+                "mode": mode,
+                "n_results": 1,
+                "study_id": "HYBRID",
+            },
+        )
+        assert response.status_code == 200, response.get_json()
+        (result,) = response.get_json()["results"]
+        assert result["document_id"] == "HYBRID-0"
+        assert result["score"] > 0
+
+    response = client.post("/search", json={"query": "x", "mode": "fuzzy"})
+    assert response.status_code == 400
@@ -0,0 +1,142 @@
+"""
+Tests for the backend models: memoized serialization and slotted instances.
+"""
+
+import copy
+import json
+from datetime import datetime
+
+import pytest
+
+from models import Site, Study, StudyFile, User, encode_json
+
+
+def make_user() -> User:
+    return User("Ada", "Lovelace", "ada@example.com", "Acme Pharma", "Monitor")
+
+
+def make_study() -> Study:
+    study = Study(
+        "STUDY-1",
+        "Cardio Outcomes",
+        "PROT-001",
+        "Acme Pharma",
+        "active",
+        datetime(2024, 1, 15, 9, 30),
+    )
+    study.add_site(Site("SITE-1", "General Hospital", "Dr. Grace", "Boston", "active"))
+    return study
+
+
+def make_file(file_id: str) -> StudyFile:
+    return StudyFile(
+        file_id, f"{file_id}.pdf", "crf", "Ada Lovelace", datetime(2024, 2, 1), size=10
+    )
+
+
+def test_serialized_forms_are_reused_while_unchanged():
+    user = make_user()
+    assert user.to_dict() is user.to_dict()
+    assert user.to_json() is user.to_json()
+    assert json.loads(user.to_json()) == user.to_dict()
+    assert user.to_dict()["fullName"] == "Ada Lovelace"
+
+
+def test_assigning_an_attribute_invalidates_the_cache():
+    user = make_user()
+    before = user.to_dict()
+    encoded = user.to_json()
+
+    user.role = "Investigator"
+    assert user.to_dict() is not before
+    assert user.to_dict()["displayName"] == "Investigator - Acme Pharma"
+    assert json.loads(user.to_json())["role"] == "Investigator"
+    assert user.to_json() != encoded
+
+
+def test_mutating_methods_invalidate_the_cache():
+    study = make_study()
+    study.to_json()
+
+    study.set_principal_investigator({"name": "Dr. Grace"})
+    assert study.to_dict()["hasPrincipalInvestigator"] is True
+
+    study.add_site(Site("SITE-2", "City Clinic", "Dr. Hopper", "Denver"))
+    assert study.to_dict()["totalSites"] == 2
+    assert study.to_dict()["activeSites"] == 1
+
+
+def test_changes_to_nested_models_invalidate_the_parent():
+    study = make_study()
+    assert study.to_dict()["sites"][0]["crfFiles"] == []
+    version = study.get_version()
+
+    study.sites[0].add_crf_file(make_file("crf-1"))
+    assert study.get_version() != version
+    assert [f["id"] for f in study.to_dict()["sites"][0]["crfFiles"]] == ["crf-1"]
+
+    study.sites[0].crf_files[0].status = "approved"
+    crf = json.loads(study.to_json())["sites"][0]["crfFiles"][0]
+    assert crf["status"] == "approved"
+
+
+def test_project_returns_only_the_requested_fields():
+    study = make_study()
+    # Built on demand before anything is cached
+    assert study.project(["id", "totalSites"]) == {"id": "STUDY-1", "totalSites": 1}
+
+    full = study.to_dict()
+    assert study.project(["id", "title"]) == {
+        "id": "STUDY-1",
+        "title": "Cardio Outcomes",
+    }
+    study.title = "Renamed"
+    assert study.project(["title"]) == {"title": "Renamed"}
+    assert full["title"] == "Cardio Outcomes"
+
+
+def test_encode_json_matches_json_dumps():
+    study = make_study()
+    user = make_user()
+    value = {"studies": [study], "users": (user,), "total": 2, "next": None}
+
+    expected = {
+        "studies": [study.to_dict()],
+        "users": [user.to_dict()],
+        "total": 2,
+        "next": None,
+    }
+    assert json.loads(encode_json(value)) == expected
+
+    study.status = "completed"
+    assert json.loads(encode_json(value))["studies"][0]["status"] == "completed"
+
+
+@pytest.mark.parametrize("model", [make_user(), make_file("crf-1"), make_study()])
+def test_models_have_no_instance_dict(model):
+    assert not hasattr(model, "__dict__")
+    with pytest.raises(AttributeError):
+        model.unknown_attribute = "value"
+
+
+def test_from_dict_round_trips():
+    study = make_study()
+    study.sites[0].add_e_source_file(make_file("esource-1"))
+    study.add_crf_file(make_file("crf-1"))
+    study.set_principal_investigator({"name": "Dr. Grace"})
+
+    assert Study.from_dict(study.to_dict()).to_dict() == study.to_dict()
+    assert User.from_dict(make_user().to_dict()).to_dict() == make_user().to_dict()
+
+
+def test_copy_shares_values_and_keeps_its_own_version():
+    study = make_study()
+    study.to_dict()
+    clone = copy.copy(study)
+
+    assert clone.sites is study.sites
+    assert clone.to_dict() is study.to_dict()
+
+    clone.title = "Copy"
+    assert clone.to_dict()["title"] == "Copy"
+    assert study.to_dict()["title"] == "Cardio Outcomes"
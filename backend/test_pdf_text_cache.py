@@ -0,0 +1,106 @@
+"""
+Tests for the per-page CRF text cache and endpoint.
+"""
+
+import pytest
+
+from crf_catalog import CRFCatalog
+from pdf_text_cache import PDFTextCache, parse_page_ranges
+
+
+def make_pdf(pages):
+    """Build a PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None]
+    font = 3 + 2 * len(pages)
+    kids = []
+    for i, text in enumerate(pages):
+        page, content = 3 + 2 * i, 4 + 2 * i
+        kids.append(f"{page} 0 R")
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    pdf += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return pdf
+
+
+@pytest.fixture
+def crf_dir(flask_app, monkeypatch, tmp_path):
+    """Serve CRF files and their text from an empty scratch directory."""
+    monkeypatch.setattr(flask_app, "CRF_DIR", str(tmp_path))
+    monkeypatch.setattr(flask_app, "crf_catalog", CRFCatalog(str(tmp_path)))
+    monkeypatch.setattr(flask_app, "crf_text_cache", PDFTextCache())
+    return tmp_path
+
+
+def test_parse_page_ranges():
+    assert parse_page_ranges(None, 3) == [1, 2, 3]
+    assert parse_page_ranges("2", 3) == [2]
+    assert parse_page_ranges("1,3-", 5) == [1, 3, 4, 5]
+    assert parse_page_ranges("-2,2-9", 4) == [1, 2, 3, 4]
+    for spec in ("0", "3-1", "x"):
+        with pytest.raises(ValueError):
+            parse_page_ranges(spec, 3)
+
+
+def test_pages_are_extracted_once_per_version(tmp_path):
+    path = tmp_path / "crf.pdf"
+    path.write_bytes(make_pdf(["Page one", "Page two"]))
+    cache = PDFTextCache(max_entries=1)
+
+    assert cache.get_pages(str(path), "v1") == ["Page one", "Page two"]
+    path.write_bytes(make_pdf(["Changed"]))
+    assert cache.get_pages(str(path), "v1") == ["Page one", "Page two"]
+    assert cache.get_pages(str(path), "v2") == ["Changed"]
+    assert not cache.contains("v1")  # evicted beyond max_entries
+    assert cache.get_stats() == {"entries": 1, "hits": 1, "misses": 2}
+
+
+def test_text_endpoint_selects_pages(client, crf_dir):
+    (crf_dir / "Vitals.pdf").write_bytes(make_pdf(["Alpha", "Beta", "Gamma"]))
+
+    response = client.get("/api/files/crf/Vitals.pdf/text?pages=1,3")
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body["pageCount"] == 3
+    assert body["pages"] == [{"page": 1, "text": "Alpha"}, {"page": 3, "text": "Gamma"}]
+    assert body["text"] == "Alpha\nGamma"
+
+    etag = response.headers["ETag"]
+    response = client.get(
+        "/api/files/crf/Vitals.pdf/text?pages=1,3", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert client.get("/api/files/crf/Vitals.pdf/text?pages=0").status_code == 400
+
+
+def test_text_etags_are_valid_for_any_page_spec(client, crf_dir):
+    (crf_dir / "Vitals.pdf").write_bytes(make_pdf(["Alpha", "Beta"]))
+
+    # int() accepts spaces and non-ASCII digits, neither of which may go in an ETag
+    for spec in ("1, 2", "\u0662"):
+        response = client.get(f"/api/files/crf/Vitals.pdf/text?pages={spec}")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.isascii() and " " not in etag
+        response = client.get(
+            f"/api/files/crf/Vitals.pdf/text?pages={spec}",
+            headers={"If-None-Match": etag},
+        )
+        assert response.status_code == 304
@@ -0,0 +1,123 @@
+"""
+Tests for protocol analysis parsing and caching.
+"""
+
+import io
+import threading
+import time
+import uuid
+
+import protocol_analysis
+from protocol_analysis import (
+    NOT_SPECIFIED,
+    ProtocolAnalysisCache,
+    get_protocol_hash,
+    parse_protocol_analysis,
+)
+
+ANALYSIS_MARKDOWN = """
+# Protocol Analysis
+
+## 1. Trial Overview
+- **Protocol Title:** A Phase III Study of Drug X
+- **Protocol Number:** PROT-001
+- **Study Phase:** Phase III
+
+## 4. Eligibility Criteria
+### Inclusion Criteria
+- Age 18 to 75
+- Confirmed diagnosis
+### Exclusion Criteria
+- Pregnancy
+- Prior treatment with Drug X
+
+## 8. Safety Monitoring
+- **DSMB Requirements:** Quarterly review
+"""
+
+
+def test_parse_protocol_analysis():
+    analysis = parse_protocol_analysis(ANALYSIS_MARKDOWN)
+
+    overview = analysis["trial_overview"]
+    assert overview["protocol_title"] == "A Phase III Study of Drug X"
+    assert overview["protocol_number"] == "PROT-001"
+    assert overview["study_phase"] == "Phase III"
+    assert overview["indication"] == NOT_SPECIFIED
+    assert analysis["eligibility_criteria"] == {
+        "inclusion_criteria": ["Age 18 to 75", "Confirmed diagnosis"],
+        "exclusion_criteria": ["Pregnancy", "Prior treatment with Drug X"],
+    }
+    assert analysis["safety_monitoring"]["dsmb_requirements"] == "Quarterly review"
+
+
+def test_protocol_hash_ignores_whitespace():
+    reference = get_protocol_hash("Study of Drug X")
+    assert get_protocol_hash("Study  of\nDrug X ") == reference
+    assert get_protocol_hash("Study of Drug Y") != reference
+
+
+def test_concurrent_requests_share_one_analysis():
+    cache = ProtocolAnalysisCache()
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        time.sleep(0.1)
+        return {"text": text}
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_compute("protocol", compute))
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["protocol"]
+    assert sorted(cached for _, cached in results) == [False, True, True, True]
+
+
+def test_failed_analysis_is_not_cached():
+    cache = ProtocolAnalysisCache()
+
+    def fail(text):
+        raise RuntimeError("agent unavailable")
+
+    try:
+        cache.get_or_compute("protocol", fail)
+    except RuntimeError:
+        pass
+    assert cache.get_or_compute("protocol", lambda text: {"ok": True}) == (
+        {"ok": True},
+        False,
+    )
+
+
+def test_analyze_protocol_endpoint_caches_by_content(client, monkeypatch):
+    calls = []
+
+    def fake_agent(text):
+        calls.append(text)
+        return ANALYSIS_MARKDOWN
+
+    monkeypatch.setattr(protocol_analysis, "request_protocol_analysis", fake_agent)
+    protocol = f"Protocol {uuid.uuid4()} for Drug X"
+
+    def analyze():
+        return client.post(
+            "/api/analyze-protocol",
+            data={"file": (io.BytesIO(protocol.encode()), "protocol.txt")},
+            content_type="multipart/form-data",
+        )
+
+    first, second = analyze(), analyze()
+    assert first.status_code == 200, first.get_json()
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert first.headers["X-Protocol-Hash"] == get_protocol_hash(protocol)
+    assert second.get_json()["trial_overview"]["protocol_number"] == "PROT-001"
+    assert calls == [protocol]
@@ -0,0 +1,128 @@
+"""
+Tests for the user and study endpoints, against the configured database.
+"""
+
+import gzip
+import json
+
+
+def test_create_study(client):
+    response = client.post(
+        "/api/studies",
+        json={
+            "title": "Test Phase II Study",
+            "protocol": "A test study protocol.",
+            "sponsor": "Test Pharmaceuticals",
+            "phase": "Phase II",
+            "indication": "Test Indication",
+        },
+    )
+
+    assert response.status_code == 201, response.get_json()
+    study_id = response.get_json()["study"]["id"]
+    assert client.get(f"/api/studies/{study_id}").status_code == 200
+
+
+def list_pages(client, path, query):
+    """Follow next_cursor through every page of a user or study listing."""
+    key = path.rsplit("/", 1)[-1]
+    pages = []
+    url = f"{path}?{query}"
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.get_json()
+        page = response.get_json()
+        pages.append(page[key])
+        cursor = page["next_cursor"]
+        url = f"{path}?{query}&after={cursor}" if cursor else None
+    return pages, page["total_count"]
+
+
+def test_user_and_study_pages(client):
+    for path, key in (("/api/users", "emailAddress"), ("/api/studies", "id")):
+        everything = client.get(path).get_json()
+        assert everything["next_cursor"] is None
+
+        pages, total = list_pages(client, path, f"limit=2&fields={key}")
+        assert total == everything["total_count"]
+        assert all(len(page) <= 2 for page in pages)
+        keys = [record[key] for page in pages for record in page]
+        assert keys == sorted(record[key] for record in everything[path[5:]])
+        assert all(list(record) == [key] for page in pages for record in page)
+
+
+def test_filtered_pages_and_invalid_parameters(client):
+    active = client.get("/api/studies?status=active").get_json()
+    pages, total = list_pages(client, "/api/studies", "status=active&limit=1")
+    assert total == active["total_count"] == len(pages)
+    assert all(page[0]["status"] == "active" for page in pages)
+
+    assert client.get("/api/users?limit=0").status_code == 400
+    assert client.get("/api/users?fields=password").status_code == 400
+    assert client.get("/api/studies?after=%%%").status_code == 400
+
+
+def import_body(client, body):
+    """POST an NDJSON import and parse its progress lines."""
+    response = client.post(
+        "/api/import", data=body, content_type="application/x-ndjson"
+    )
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.data.splitlines()]
+
+
+def test_export_import_round_trip(client):
+    exported = client.get("/api/export?gzip=true")
+    assert exported.status_code == 200
+    body = gzip.decompress(exported.data)
+    records = [json.loads(line) for line in body.splitlines()]
+
+    progress = import_body(client, body)
+    assert progress[-1]["status"] == "completed"
+    assert progress[-1]["processed"] == len(records)
+
+
+def test_import_reports_mistyped_fields(client):
+    study = client.get("/api/studies").get_json()["studies"][0]
+    lines = [
+        json.dumps({"type": "study", "record": study}),
+        json.dumps({"type": "study", "record": {**study, "sponsor": {"a": 1}}}),
+        json.dumps({"type": "study", "record": study}),
+    ]
+
+    progress = import_body(client, "\n".join(lines))
+    assert progress[-1]["status"] == "failed"
+    assert "line 2" in progress[-1]["error"]
+    assert progress[-1]["processed"] == 1
+
+
+def test_import_reads_null_lists_as_empty(client):
+    study = client.get("/api/studies").get_json()["studies"][0]
+    site = {**study["sites"][0], "eSourceFiles": None, "crfFiles": None}
+    records = [
+        {**study, "id": "STD-NULL-1", "sites": None},
+        {**study, "id": "STD-NULL-2", "sites": [site]},
+    ]
+    for record in records:
+        record.update(eSourceFiles=None, crfFiles=None)
+    lines = [json.dumps({"type": "study", "record": r}) for r in records]
+
+    progress = import_body(client, "\n".join(lines))
+    assert progress[-1]["status"] == "completed"
+    first = client.get("/api/studies/STD-NULL-1").get_json()["study"]
+    assert (first["sites"], first["eSourceFiles"], first["crfFiles"]) == ([], [], [])
+    second = client.get("/api/studies/STD-NULL-2").get_json()["study"]
+    assert second["sites"][0]["eSourceFiles"] == []
+
+
+def test_import_reports_storage_errors(client, flask_app, monkeypatch):
+    def fail(studies):
+        if studies:
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr(flask_app.db_manager, "upsert_studies", fail)
+    study = client.get("/api/studies").get_json()["studies"][0]
+
+    progress = import_body(client, json.dumps({"type": "study", "record": study}))
+    assert progress[-1]["status"] == "failed"
+    assert "disk full" in progress[-1]["error"]
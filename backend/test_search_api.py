@@ -0,0 +1,85 @@
+"""
+Tests for /search and /search/batch, with the embedding model replaced by
+hashed word vectors.
+"""
+
+import pytest
+
+from query_cache import QueryEmbeddingCache
+
+STUDY_CHUNKS = [
+    "hemoglobin 13.2 g/dL within normal range",
+    "blood pressure 120/80 at screening visit",
+    "adverse event headache reported after dosing",
+]
+
+
+def test_query_cache_embeds_each_miss_once():
+    calls = []
+
+    def embed(texts):
+        calls.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+    cache = QueryEmbeddingCache(embed, max_size=2)
+    assert cache.embed(["a", "bb", "a"]) == [[1.0], [2.0], [1.0]]
+    assert cache.embed(["bb", "ccc"]) == [[2.0], [3.0]]
+    # "a" was the least recently used entry and has been evicted
+    assert cache.embed(["a"]) == [[1.0]]
+
+    assert calls == [["a", "bb"], ["ccc"], ["a"]]
+    stats = cache.get_stats()
+    assert (stats["size"], stats["hits"], stats["misses"]) == (2, 1, 4)
+
+
+def test_batch_search_answers_each_query(client, add_documents):
+    add_documents("SEARCH-BATCH", STUDY_CHUNKS)
+
+    response = client.post(
+        "/search/batch",
+        json={
+            "queries": ["hemoglobin range", "headache dosing"],
+            "n_results": 1,
+            "study_id": "SEARCH-BATCH",
+        },
+    )
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body["total_queries"] == 2
+    assert [r["results"][0]["document_id"] for r in body["results"]] == [
+        "SEARCH-BATCH-0",
+        "SEARCH-BATCH-2",
+    ]
+
+
+def test_search_filters_by_metadata(client, add_documents):
+    add_documents("SEARCH-SITE-A", STUDY_CHUNKS, site_id="A")
+    add_documents("SEARCH-SITE-B", STUDY_CHUNKS, site_id="B")
+
+    response = client.post(
+        "/search",
+        json={"query": "blood pressure", "n_results": 10, "site_id": "B"},
+    )
+    results = response.get_json()["results"]
+    assert results
+    assert {r["metadata"]["site_id"] for r in results} == {"B"}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [{}, {"queries": "one query"}, {"queries": ["q"] * 101}, {"queries": [1]}],
+)
+def test_batch_search_rejects_bad_queries(client, body):
+    assert client.post("/search/batch", json=body).status_code == 400
+
+
+def test_queries_skip_the_document_embedding_cache(client, add_documents, flask_app):
+    add_documents("SEARCH-QUERY-CACHE", STUDY_CHUNKS)
+    entries = flask_app.embedding_function.cache.get_entry_count()
+
+    response = client.post(
+        "/search",
+        json={"query": "a query seen only once", "study_id": "SEARCH-QUERY-CACHE"},
+    )
+    assert response.status_code == 200, response.get_json()
+    assert flask_app.embedding_function.cache.get_entry_count() == entries
@@ -0,0 +1,233 @@
+"""
+Access request records for the Mock Trial Site backend.
+Each request for access to the site gets an ID, requester details and an
+expiry, and is answered on its own, so several monitoring agents can
+negotiate access at the same time. Records live in a thread-safe
+in-memory store, which can report requests as they expire.
+"""
+
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+ACCESS_REQUEST_STATUSES = ("pending", "granted", "denied", "expired")
+
+
+class AccessRequest:
+    """One request for access to the trial site."""
+
+    def __init__(
+        self,
+        request_id: str,
+        requester: str,
+        message: str,
+        ttl_seconds: float,
+        study_id: Optional[str] = None,
+        investigator: Optional[str] = None,
+    ):
+        self.id = request_id
+        self.requester = requester
+        self.message = message
+        self.study_id = study_id
+        self.investigator = investigator
+        self.status = "pending"
+        self.created_at = datetime.now()
+        self.expires_at = self.created_at + timedelta(seconds=ttl_seconds)
+        self.responded_at = None
+
+    def is_pending(self) -> bool:
+        """Check if the request is still waiting for an answer."""
+        return self.status == "pending"
+
+    def expire_if_due(self, now: datetime) -> bool:
+        """Mark a pending request past its expiry as expired; returns True if so."""
+        if self.is_pending() and now >= self.expires_at:
+            self.status = "expired"
+            return True
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert access request to dictionary."""
+        return {
+            "id": self.id,
+            "requester": self.requester,
+            "message": self.message,
+            "study_id": self.study_id,
+            "investigator": self.investigator,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "expires_at": self.expires_at.isoformat(),
+            "responded_at": (
+                self.responded_at.isoformat() if self.responded_at else None
+            ),
+        }
+
+
+class AccessRequestError(Exception):
+    """Raised when an access request cannot be answered."""
+
+
+class AccessRequestStore:
+    """Thread-safe store of access requests, oldest first.
+
+    Pending requests expire when they are next read after their expiry. If
+    `on_expire` is given, a timer also expires them on time, and it is called
+    with each request (outside the lock) as it expires.
+    Only the most recent `max_history` answered or expired requests are kept.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 120.0,
+        max_history: int = 1000,
+        on_expire: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        """Initialize the store; requests expire after `default_ttl` seconds."""
+        self.default_ttl = default_ttl
+        self.max_history = max_history
+        self.on_expire = on_expire
+        self.requests = OrderedDict()  # request ID -> AccessRequest
+        self._lock = threading.Lock()
+        self._timer = None  # fires at the earliest pending expiry
+        self._timer_deadline = None
+
+    def _expire(self) -> List[Dict[str, Any]]:
+        """Expire every pending request past its expiry (lock held).
+
+        Returns the requests that expired now.
+        """
+        now = datetime.now()
+        return [
+            access_request.to_dict()
+            for access_request in self.requests.values()
+            if access_request.expire_if_due(now)
+        ]
+
+    def _notify_expired(self, expired: List[Dict[str, Any]]):
+        """Report newly expired requests (lock not held)."""
+        if self.on_expire:
+            for access_request in expired:
+                self.on_expire(access_request)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the lock with due requests expired; reports them once released."""
+        expired = []
+        try:
+            with self._lock:
+                expired = self._expire()
+                yield
+        finally:
+            self._notify_expired(expired)
+
+    def _schedule_expiry(self):
+        """Set the timer for the earliest pending expiry (lock held)."""
+        if self.on_expire is None:
+            return
+        deadlines = [
+            access_request.expires_at
+            for access_request in self.requests.values()
+            if access_request.is_pending()
+        ]
+        if not deadlines:
+            return
+        deadline = min(deadlines)
+        if self._timer is not None:
+            if self._timer_deadline <= deadline:
+                return
+            self._timer.cancel()
+        delay = max((deadline - datetime.now()).total_seconds(), 0)
+        self._timer = threading.Timer(delay, self.expire)
+        self._timer.daemon = True
+        self._timer.start()
+        self._timer_deadline = deadline
+
+    def expire(self) -> List[Dict[str, Any]]:
+        """Expire every pending request past its expiry; returns those expired now.
+
+        Run by the expiry timer, which is then set for the next pending expiry.
+        """
+        with self._lock:
+            self._timer = None
+            expired = self._expire()
+            self._schedule_expiry()
+        self._notify_expired(expired)
+        return expired
+
+    def _evict_finished(self):
+        """Drop the oldest finished requests beyond the history limit (lock held)."""
+        excess = len(self.requests) - self.max_history
+        if excess <= 0:
+            return
+        for request_id in [
+            request_id
+            for request_id, access_request in self.requests.items()
+            if not access_request.is_pending()
+        ][:excess]:
+            del self.requests[request_id]
+
+    def create(
+        self,
+        requester: str,
+        message: str,
+        ttl_seconds: Optional[float] = None,
+        study_id: Optional[str] = None,
+        investigator: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Record a new pending request; returns it as a dictionary."""
+        access_request = AccessRequest(
+            request_id=str(uuid.uuid4()),
+            requester=requester,
+            message=message,
+            ttl_seconds=ttl_seconds or self.default_ttl,
+            study_id=study_id,
+            investigator=investigator,
+        )
+        with self._locked():
+            self.requests[access_request.id] = access_request
+            self._evict_finished()
+            self._schedule_expiry()
+            return access_request.to_dict()
+
+    def respond(self, request_id: str, granted: bool) -> Optional[Dict[str, Any]]:
+        """Answer a pending request; returns it, or None if there is no such request.
+
+        Raises AccessRequestError if it was already answered or has expired.
+        """
+        with self._locked():
+            access_request = self.requests.get(request_id)
+            if access_request is None:
+                return None
+            if not access_request.is_pending():
+                raise AccessRequestError(
+                    f"Access request {request_id} is already {access_request.status}"
+                )
+            access_request.status = "granted" if granted else "denied"
+            access_request.responded_at = datetime.now()
+            return access_request.to_dict()
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Get a request by ID."""
+        with self._locked():
+            access_request = self.requests.get(request_id)
+            return access_request.to_dict() if access_request else None
+
+    def get_latest(self, pending_only: bool = False) -> Optional[Dict[str, Any]]:
+        """Get the most recent request (or most recent pending one)."""
+        with self._locked():
+            for access_request in reversed(self.requests.values()):
+                if not pending_only or access_request.is_pending():
+                    return access_request.to_dict()
+            return None
+
+    def list(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get requests, oldest first, optionally only those with a status."""
+        with self._locked():
+            return [
+                access_request.to_dict()
+                for access_request in self.requests.values()
+                if status is None or access_request.status == status
+            ]
@@ -1,14 +1,23 @@
 """
 Mock Trial Site Backend - Hospital Web Interface
-Flask server with WebSocket support for real-time communication
+Flask server with Server-Sent Events for real-time communication
 """
 
-import os
-from flask import Flask, jsonify, send_file
+from flask import Flask, jsonify, request, send_file
 from flask_cors import CORS
 from pathlib import Path
 import json
 from datetime import datetime
+from fnmatch import fnmatch
+from patient_index import PatientIndex
+from patient_archive import PatientArchiver
+from document_text import DocumentTextCache
+from event_hub import EventHub
+from access_requests import (
+    ACCESS_REQUEST_STATUSES,
+    AccessRequestError,
+    AccessRequestStore,
+)
 
 app = Flask(__name__)
 CORS(app)
@@ -17,6 +26,8 @@ CORS(app)
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "patients"
 CONFIG_FILE = BASE_DIR / "config.json"
+MAX_PATIENT_PAGE_SIZE = 1000
+TEXT_EXTRACTION_WORKERS = 4
 
 
 # Load configuration
@@ -34,10 +45,27 @@ def load_config():
 config = load_config()
 BACKEND_PORT = config.get("backend_port", 5500)
 
-# WebSocket management
-connected_clients = []
-access_request_active = False
-access_response_status = "pending"  # 'pending', 'granted', 'denied'
+# Patient document listings, rescanned only when directories change
+patient_index = PatientIndex(DATA_DIR)
+# Streaming zip archives of a patient's documents, with content hashes
+patient_archiver = PatientArchiver(DATA_DIR)
+# Extracted document text, cached until a file's mtime or size changes
+document_texts = DocumentTextCache(DATA_DIR, max_workers=TEXT_EXTRACTION_WORKERS)
+
+# Server-Sent Events push channel for access requests and responses
+ACCESS_EVENT_TYPES = ("access_request", "access_response")
+event_hub = EventHub(heartbeat_interval=15.0)
+
+# Access requests, each answered on its own
+DEFAULT_ACCESS_MESSAGE = "Give access to the system?"
+MAX_ACCESS_REQUEST_TTL = 3600  # seconds
+# Expired requests are pushed like answers, so clients stop waiting on them
+access_requests = AccessRequestStore(
+    default_ttl=120.0,
+    on_expire=lambda access_request: broadcast_message(
+        access_response_event(access_request)
+    ),
+)
 
 
 @app.route("/")
@@ -46,58 +74,150 @@ def index():
     return jsonify({"status": "active", "service": "Mock Trial Site Backend"})
 
 
-@app.route("/api/patients")
-def get_patients():
-    """Get all patients with their documents"""
-    patient_data = {}
+def cached_json_response(body, etag):
+    """Serve a JSON body with its ETag, answering 304 if the client has it."""
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
 
-    if DATA_DIR.exists():
-        for patient_dir in sorted(DATA_DIR.iterdir()):
-            if patient_dir.is_dir():
-                patient_id = patient_dir.name
-
-                # Get all DOCX files for this patient
-                source_files = []
-                for file in sorted(patient_dir.glob("*.docx")):
-                    file_info = {
-                        "filename": file.name,
-                        "file_path": f"/patients/{patient_id}/{file.name}",
-                        "file_type": "document",
-                        "file_size": file.stat().st_size,
-                        "modified": os.path.getmtime(file),
-                    }
-                    source_files.append(file_info)
 
-                if source_files:
-                    patient_data[patient_id] = {
-                        "patient_id": patient_id,
-                        "file_count": len(source_files),
-                        "files": source_files,
-                    }
+@app.route("/api/patients")
+def get_patients():
+    """Get patients with their documents, optionally one page at a time"""
+    limit = request.args.get("limit")
+    if limit is not None:
+        if not limit.isdigit() or int(limit) < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(int(limit), MAX_PATIENT_PAGE_SIZE)
 
-    return jsonify({"patients": patient_data, "total_patients": len(patient_data)})
+    body, etag = patient_index.get_listing(limit, request.args.get("cursor"))
+    return cached_json_response(body, etag)
 
 
 @app.route("/api/patients/<patient_id>")
 def get_patient(patient_id):
     """Get specific patient's files"""
-    patient_dir = DATA_DIR / patient_id
+    patient = patient_index.get_patient(patient_id)
 
-    if not patient_dir.exists():
+    if patient is None:
         return jsonify({"error": "Patient not found"}), 404
 
-    files = []
-    for file in sorted(patient_dir.glob("*.docx")):
-        files.append(
+    return cached_json_response(patient["detail"], patient["etag"])
+
+
+def select_patient_files(patient):
+    """Pick a patient's documents named by ?files= (comma-separated) and/or
+    matching the ?pattern= glob; returns (files, missing filenames)"""
+    files = patient["files"]
+    missing = []
+
+    names = request.args.get("files")
+    if names:
+        wanted = [name.strip() for name in names.split(",") if name.strip()]
+        by_name = {f["filename"]: f for f in files}
+        missing = [name for name in wanted if name not in by_name]
+        files = [by_name[name] for name in dict.fromkeys(wanted) if name in by_name]
+
+    pattern = request.args.get("pattern")
+    if pattern:
+        files = [f for f in files if fnmatch(f["filename"], pattern)]
+
+    return files, missing
+
+
+def get_selected_patient_files(patient_id):
+    """Look up a patient and the requested documents; returns (files, None)
+    or (None, error response)"""
+    patient = patient_index.get_patient(patient_id)
+    if patient is None:
+        return None, (jsonify({"error": "Patient not found"}), 404)
+
+    files, missing = select_patient_files(patient)
+    if missing:
+        return None, (
+            jsonify({"error": f"Files not found: {', '.join(missing)}"}),
+            404,
+        )
+    if not files:
+        return None, (jsonify({"error": "No matching documents"}), 404)
+
+    return files, None
+
+
+@app.route("/api/patients/<patient_id>/archive")
+def download_patient_archive(patient_id):
+    """Stream a zip of a patient's documents (all, or those selected with
+    ?files= or ?pattern=) with a manifest of their SHA-256 hashes"""
+    files, error = get_selected_patient_files(patient_id)
+    if error:
+        return error
+
+    response = app.response_class(
+        patient_archiver.stream(patient_id, files), mimetype="application/zip"
+    )
+    response.headers["Content-Disposition"] = (
+        f'attachment; filename="{patient_id}.zip"'
+    )
+    response.headers["X-Archive-File-Count"] = str(len(files))
+    return response
+
+
+@app.route("/api/patients/<patient_id>/manifest")
+def get_patient_manifest(patient_id):
+    """Get the SHA-256 hashes of a patient's documents (same selection as
+    the archive)"""
+    files, error = get_selected_patient_files(patient_id)
+    if error:
+        return error
+
+    return jsonify(patient_archiver.get_manifest(patient_id, files))
+
+
+@app.route("/api/patients/<patient_id>/text")
+def get_patient_texts(patient_id):
+    """Get the text and tables of a patient's documents (all, or those
+    selected with ?files= or ?pattern=), extracted in parallel"""
+    files, error = get_selected_patient_files(patient_id)
+    if error:
+        return error
+
+    try:
+        documents = document_texts.get_texts(
+            patient_id, [f["filename"] for f in files]
+        )
+        return jsonify(
             {
-                "filename": file.name,
-                "file_url": f"/patients/{patient_id}/{file.name}",
-                "file_size": file.stat().st_size,
-                "modified": os.path.getmtime(file),
+                "patient_id": patient_id,
+                "documents": documents,
+                "file_count": len(documents),
             }
         )
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-    return jsonify({"patient_id": patient_id, "files": files, "file_count": len(files)})
+
+@app.route("/api/patients/<patient_id>/<filename>/text")
+def get_document_text(patient_id, filename):
+    """Get the text and tables of one patient document"""
+    if patient_index.get_patient(patient_id) is None:
+        return jsonify({"error": "Patient not found"}), 404
+    if not filename.endswith(".docx"):
+        return jsonify({"error": "File not found"}), 404
+
+    try:
+        document = document_texts.get_text(patient_id, filename)
+    except FileNotFoundError:
+        return jsonify({"error": "File not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    if "error" in document:
+        return jsonify(document), 422
+    return jsonify(document)
 
 
 @app.route("/patients/<patient_id>/<filename>")
@@ -114,94 +234,236 @@ def serve_file(patient_id, filename):
         return jsonify({"error": "File not found"}), 404
 
 
-@app.route("/api/request-access", methods=["POST"])
-def request_access():
-    """Trigger an access request popup to connected clients"""
-    global access_request_active, access_response_status
+def access_request_event(access_request):
+    """Build the access_request event for a request record"""
+    return {
+        "type": "access_request",
+        "request_id": access_request["id"],
+        "message": access_request["message"],
+        "timestamp": access_request["created_at"],
+        "request": access_request,
+    }
 
-    access_request_active = True
-    access_response_status = "pending"  # Reset response status
 
-    # Broadcast to all connected WebSocket clients
-    message = {
-        "type": "access_request",
-        "message": "Give access to the system?",
-        "timestamp": datetime.now().isoformat(),
+def access_response_event(access_request):
+    """Build the access_response event for an answered or expired request record"""
+    return {
+        "type": "access_response",
+        "request_id": access_request["id"],
+        "status": access_request["status"],
+        "granted": access_request["status"] == "granted",
+        "timestamp": access_request["responded_at"] or access_request["expires_at"],
+        "request": access_request,
     }
 
-    # In a real implementation, broadcast via WebSocket
-    # For now, we'll simulate this
-    broadcast_message(message)
+
+def respond_to_access_request(request_id, granted):
+    """Answer an access request and push the answer to subscribers"""
+    try:
+        access_request = access_requests.respond(request_id, granted)
+    except AccessRequestError as e:
+        return jsonify({"error": str(e)}), 409
+    if access_request is None:
+        return jsonify({"error": "Access request not found"}), 404
+
+    print(
+        f"Access response received for {request_id}: "
+        f"{'Granted' if granted else 'Denied'}"
+    )
+    broadcast_message(access_response_event(access_request))
+
+    return jsonify(
+        {
+            "success": True,
+            "granted": granted,
+            "message": f"Access {'granted' if granted else 'denied'}",
+            "request": access_request,
+        }
+    )
+
+
+@app.route("/api/request-access", methods=["POST"])
+def request_access():
+    """Create an access request and push it to connected clients"""
+    data = request.get_json(silent=True) or {}
+
+    ttl_seconds = data.get("ttl_seconds")
+    if ttl_seconds is not None:
+        # bool is an int subclass, but true is not a number of seconds
+        if (
+            isinstance(ttl_seconds, bool)
+            or not isinstance(ttl_seconds, (int, float))
+            or not 0 < ttl_seconds <= MAX_ACCESS_REQUEST_TTL
+        ):
+            return (
+                jsonify(
+                    {
+                        "error": "ttl_seconds must be a number between 0 and "
+                        f"{MAX_ACCESS_REQUEST_TTL}"
+                    }
+                ),
+                400,
+            )
+
+    access_request = access_requests.create(
+        requester=data.get("requester") or request.remote_addr or "unknown",
+        message=data.get("message") or DEFAULT_ACCESS_MESSAGE,
+        ttl_seconds=ttl_seconds,
+        study_id=data.get("study_id"),
+        investigator=data.get("investigator"),
+    )
+
+    # Push to all clients subscribed to /api/events
+    broadcast_message(access_request_event(access_request))
 
     return jsonify(
         {
             "success": True,
             "message": "Access request sent to connected clients",
-            "request": message,
+            "request_id": access_request["id"],
+            "status_url": f"/api/access-requests/{access_request['id']}",
+            "request": access_request,
         }
     )
 
 
+@app.route("/api/access-requests")
+def list_access_requests():
+    """List access requests, optionally filtered by status"""
+    status = request.args.get("status")
+    if status and status not in ACCESS_REQUEST_STATUSES:
+        return (
+            jsonify(
+                {
+                    "error": f"Invalid status: {status}. Allowed values: "
+                    f"{', '.join(ACCESS_REQUEST_STATUSES)}"
+                }
+            ),
+            400,
+        )
+
+    requests = access_requests.list(status)
+    return jsonify({"requests": requests, "total_requests": len(requests)})
+
+
+@app.route("/api/access-requests/<request_id>")
+def get_access_request(request_id):
+    """Get the status of one access request"""
+    access_request = access_requests.get(request_id)
+    if access_request is None:
+        return jsonify({"error": "Access request not found"}), 404
+
+    return jsonify({"request": access_request})
+
+
+@app.route("/api/access-requests/<request_id>/response", methods=["POST"])
+def respond_to_access_request_endpoint(request_id):
+    """Grant or deny one access request"""
+    data = request.get_json(silent=True) or {}
+    return respond_to_access_request(request_id, bool(data.get("granted", False)))
+
+
 @app.route("/api/check-access-request")
 def check_access_request():
-    """Check if there's an active access request"""
-    global access_request_active
+    """Check if there are pending access requests; message and request_id
+    describe the most recent one"""
+    pending = access_requests.list("pending")
+    latest = pending[-1] if pending else None
 
     return jsonify(
         {
-            "active": access_request_active,
-            "message": "Give access to the system?" if access_request_active else "",
+            "active": latest is not None,
+            "message": latest["message"] if latest else "",
+            "request_id": latest["id"] if latest else None,
+            "requests": pending,
         }
     )
 
 
 @app.route("/api/check-access-response")
 def check_access_response():
-    """Check the status of an access response"""
-    global access_response_status
+    """Check the status of an access request (by default the most recent one)"""
+    request_id = request.args.get("request_id")
+    if request_id:
+        access_request = access_requests.get(request_id)
+        if access_request is None:
+            return jsonify({"error": "Access request not found"}), 404
+    else:
+        access_request = access_requests.get_latest()
+    status = access_request["status"] if access_request else "pending"
 
     return jsonify(
         {
-            "status": access_response_status,
-            "granted": access_response_status == "granted",
-            "denied": access_response_status == "denied",
-            "pending": access_response_status == "pending",
+            "status": status,
+            "granted": status == "granted",
+            "denied": status == "denied",
+            "pending": status == "pending",
+            "request_id": access_request["id"] if access_request else None,
         }
     )
 
 
 @app.route("/api/access-response", methods=["POST"])
 def access_response():
-    """Handle access response from client"""
-    global access_request_active, access_response_status
-    from flask import request
+    """Handle access response from client (for the most recent pending
+    request unless request_id is given)"""
+    data = request.get_json(silent=True) or {}
+    request_id = data.get("request_id")
+    if not request_id:
+        pending = access_requests.get_latest(pending_only=True)
+        if pending is None:
+            return jsonify({"error": "No pending access request"}), 404
+        request_id = pending["id"]
 
-    data = request.get_json()
-    granted = data.get("granted", False)
+    return respond_to_access_request(request_id, bool(data.get("granted", False)))
 
-    # Clear the access request and set response status
-    access_request_active = False
-    access_response_status = "granted" if granted else "denied"
 
-    print(f"Access response received: {'Granted' if granted else 'Denied'}")
-
-    return jsonify(
-        {
-            "success": True,
-            "granted": granted,
-            "message": f"Access {'granted' if granted else 'denied'}",
-        }
+def broadcast_message(message):
+    """Broadcast message to all connected clients"""
+    delivered = event_hub.publish(message["type"], message)
+    print(f"Broadcasting {message['type']} to {delivered} client(s)")
+
+
+@app.route("/api/events")
+def stream_events():
+    """Stream access requests and responses as Server-Sent Events"""
+    event_types = request.args.get("types")
+    if event_types:
+        event_types = [t.strip() for t in event_types.split(",") if t.strip()]
+        unknown = [t for t in event_types if t not in ACCESS_EVENT_TYPES]
+        if unknown:
+            return (
+                jsonify(
+                    {
+                        "error": f"Unknown event types: {', '.join(unknown)}. "
+                        f"Allowed values: {', '.join(ACCESS_EVENT_TYPES)}"
+                    }
+                ),
+                400,
+            )
+
+    subscriber = event_hub.subscribe(event_types, client=request.remote_addr or "")
+    # Requests still waiting for an answer are sent on connect
+    initial = []
+    if subscriber.wants("access_request"):
+        initial = [
+            ("access_request", access_request_event(access_request))
+            for access_request in access_requests.list("pending")
+        ]
+
+    response = app.response_class(
+        event_hub.stream(subscriber, initial), mimetype="text/event-stream"
     )
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
-def broadcast_message(message):
-    """Broadcast message to all connected clients"""
-    # This would broadcast via WebSocket in production
-    # For now, we'll just log it
-    print(f"Broadcasting: {message}")
-    # In real implementation:
-    # for client in connected_clients:
-    #     client.send(json.dumps(message))
+@app.route("/api/events/clients")
+def get_event_clients():
+    """List the clients connected to the event stream"""
+    clients = event_hub.get_clients()
+    return jsonify({"clients": clients, "total_clients": len(clients)})
 
 
 @app.route("/health")
@@ -212,7 +474,8 @@ def health():
             "status": "healthy",
             "data_directory": str(DATA_DIR),
             "data_directory_exists": DATA_DIR.exists(),
-            "connected_clients": len(connected_clients),
+            "connected_clients": event_hub.get_client_count(),
+            "cached_documents": document_texts.get_cached_count(),
         }
     )
 
@@ -228,6 +491,6 @@ if __name__ == "__main__":
 
     print(f"\n🌐 Backend Server running on http://localhost:{BACKEND_PORT}")
     print(f"📋 API: http://localhost:{BACKEND_PORT}/api/patients")
-    print("🔌 Ready for WebSocket connections")
+    print(f"🔌 Event stream: http://localhost:{BACKEND_PORT}/api/events")
 
     app.run(port=BACKEND_PORT, debug=True)
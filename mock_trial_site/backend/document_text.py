@@ -0,0 +1,173 @@
+"""
+DOCX text extraction for the Mock Trial Site backend.
+Pulls the text and tables out of patient documents so consumers get
+them in one request instead of downloading and parsing each DOCX.
+Extraction runs in a pool of worker processes and results are cached
+per file until its modification time or size changes.
+"""
+
+import os
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+from xml.etree.ElementTree import ParseError
+
+from docx_parser import CELL_SEPARATOR, DOCUMENT_PART, iter_document_parts
+
+
+class DocumentTextError(Exception):
+    """Raised when a file is not a readable DOCX document."""
+
+
+def extract_docx(path: str) -> Dict[str, Any]:
+    """Extract a DOCX file's text and tables.
+
+    `text` has paragraphs and table rows (cells joined by ' | ') in document
+    order; `tables` has each top-level table as rows of cell text. A table
+    nested in a cell becomes part of that cell's text.
+    """
+    blocks = []
+    tables = []
+    rows = []  # rows of the table being read
+    try:
+        with zipfile.ZipFile(path) as archive:
+            with archive.open(DOCUMENT_PART) as document:
+                for kind, value in iter_document_parts(document):
+                    if kind == "paragraph":
+                        blocks.append(value)
+                    elif kind == "row":
+                        rows.append(value)
+                        blocks.append(CELL_SEPARATOR.join(value))
+                    elif rows:
+                        tables.append(rows)
+                        rows = []
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, KeyError, ParseError) as e:
+        raise DocumentTextError(f"Invalid DOCX file: {str(e)}")
+    except (OSError, EOFError) as e:
+        # Unreadable or truncated (EOFError comes from a cut-off zip member)
+        raise DocumentTextError(f"Could not read DOCX file: {str(e)}")
+    return {"text": "\n".join(blocks).strip(), "tables": tables}
+
+
+class DocumentTextCache:
+    """Extracted document text, computed by a worker pool and cached by file version.
+
+    A cached result is used while the file's mtime and size are unchanged.
+    Concurrent requests for the same uncached file share one extraction.
+    """
+
+    def __init__(self, data_dir: str, max_workers: int = 4, max_entries: int = 1024):
+        """Initialize the cache; the worker pool is started on first use."""
+        self.data_dir = str(data_dir)
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self._results = OrderedDict()  # (patient ID, filename) -> (version, result)
+        self._pending = {}  # (patient ID, filename, version) -> Future
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the worker pool, starting it if needed (lock held)."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def _submit(self, patient_id: str, filename: str):
+        """Start (or join) extraction of a document; returns a (future, stat) pair
+        for the caller to resolve, or (result, stat) if it is cached.
+
+        Raises FileNotFoundError if there is no such document.
+        """
+        path = os.path.join(self.data_dir, patient_id, filename)
+        file_stat = os.stat(path)
+        version = (file_stat.st_mtime_ns, file_stat.st_size)
+        key = (patient_id, filename)
+        with self._lock:
+            cached = self._results.get(key)
+            if cached and cached[0] == version:
+                self._results.move_to_end(key)
+                return cached[1], file_stat
+            future = self._pending.get(key + (version,))
+            started = future is None
+            if started:
+                future = self._get_executor().submit(extract_docx, path)
+                self._pending[key + (version,)] = future
+        # Outside the lock: a finished future runs the callback right away
+        if started:
+            future.add_done_callback(lambda f: self._store(key, version, f))
+        return future, file_stat
+
+    def _store(self, key: Tuple[str, str], version: Tuple[int, int], future):
+        """Cache a finished extraction (failed ones are not cached)."""
+        with self._lock:
+            self._pending.pop(key + (version,), None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._results[key] = (version, future.result())
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def _describe(
+        self, patient_id: str, filename: str, file_stat, outcome
+    ) -> Dict[str, Any]:
+        """Build the response entry for a document from its result or future.
+
+        A document that cannot be extracted, for whatever reason, gets an
+        `error` instead of failing the whole request.
+        """
+        entry = {
+            "patient_id": patient_id,
+            "filename": filename,
+            "file_size": file_stat.st_size,
+            "modified": file_stat.st_mtime,
+        }
+        try:
+            result = outcome.result() if isinstance(outcome, Future) else outcome
+        except DocumentTextError as e:
+            entry["error"] = str(e)
+            return entry
+        except Exception as e:
+            # E.g. a worker process that died (BrokenProcessPool)
+            entry["error"] = f"Text extraction failed: {str(e)}"
+            return entry
+        entry.update(result)
+        return entry
+
+    def get_text(self, patient_id: str, filename: str) -> Dict[str, Any]:
+        """Get a document's text and tables (or `error` if it cannot be read).
+
+        Raises FileNotFoundError if there is no such document.
+        """
+        outcome, file_stat = self._submit(patient_id, filename)
+        return self._describe(patient_id, filename, file_stat, outcome)
+
+    def get_texts(self, patient_id: str, filenames: List[str]) -> List[Dict[str, Any]]:
+        """Get several documents' text at once, extracting them in parallel.
+
+        Documents removed since they were listed are left out.
+        """
+        submitted = []
+        for filename in filenames:
+            try:
+                submitted.append((filename,) + self._submit(patient_id, filename))
+            except FileNotFoundError:
+                continue
+        return [
+            self._describe(patient_id, filename, file_stat, outcome)
+            for filename, outcome, file_stat in submitted
+        ]
+
+    def get_cached_count(self) -> int:
+        """Get the number of cached documents."""
+        with self._lock:
+            return len(self._results)
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,135 @@
+"""
+Server-Sent Events hub for the Mock Trial Site backend.
+Keeps a registry of connected clients, each with its own event queue,
+and streams published events (access requests and responses) to them
+with periodic heartbeats, so clients no longer poll for changes.
+"""
+
+import itertools
+import json
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class Subscriber:
+    """One connected event stream client."""
+
+    def __init__(
+        self,
+        subscriber_id: int,
+        event_types: Optional[Iterable[str]],
+        client: str,
+        max_queued: int,
+    ):
+        self.id = subscriber_id
+        self.event_types = set(event_types) if event_types else None  # None = all
+        self.client = client
+        self.connected_at = datetime.now()
+        self.events_sent = 0
+        self.dropped = False  # set when the hub gives up on a slow client
+        self.queue = queue.Queue(maxsize=max_queued)
+
+    def wants(self, event_type: str) -> bool:
+        """Check if the subscriber asked for this event type."""
+        return self.event_types is None or event_type in self.event_types
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert subscriber to dictionary."""
+        return {
+            "id": self.id,
+            "client": self.client,
+            "event_types": sorted(self.event_types) if self.event_types else None,
+            "connected_at": self.connected_at.isoformat(),
+            "events_sent": self.events_sent,
+        }
+
+
+class EventHub:
+    """Registry of event stream subscribers and publisher of events to them."""
+
+    def __init__(self, heartbeat_interval: float = 15.0, max_queued: int = 100):
+        """Initialize the hub; idle streams get a heartbeat every interval."""
+        self.heartbeat_interval = heartbeat_interval
+        self.max_queued = max_queued
+        self._subscribers = {}  # subscriber ID -> Subscriber
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def subscribe(
+        self, event_types: Optional[Iterable[str]] = None, client: str = ""
+    ) -> Subscriber:
+        """Register a new subscriber for some (or all) event types."""
+        subscriber = Subscriber(next(self._ids), event_types, client, self.max_queued)
+        with self._lock:
+            self._subscribers[subscriber.id] = subscriber
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber from the registry."""
+        with self._lock:
+            self._subscribers.pop(subscriber.id, None)
+
+    def publish(self, event_type: str, payload: Dict[str, Any]) -> int:
+        """Queue an event for every interested subscriber; returns how many.
+
+        A subscriber whose queue is full is not reading its stream; it is
+        dropped rather than allowed to hold events in memory.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        delivered = 0
+        for subscriber in subscribers:
+            if not subscriber.wants(event_type):
+                continue
+            try:
+                subscriber.queue.put_nowait((event_type, payload))
+                delivered += 1
+            except queue.Full:
+                subscriber.dropped = True
+                self.unsubscribe(subscriber)
+        return delivered
+
+    def stream(self, subscriber: Subscriber, initial: Iterable = ()):
+        """Yield a subscriber's events as SSE frames until it disconnects.
+
+        `initial` (event type, payload) pairs are sent first, so a client
+        that connects late still sees what is pending.
+        """
+        try:
+            # Sends the response headers right away, so the client sees it is open
+            yield f"retry: 3000\n: connected as subscriber {subscriber.id}\n\n"
+            for event_type, payload in initial:
+                yield self._format(subscriber, event_type, payload)
+            # A dropped subscriber's stream ends; EventSource then reconnects
+            while not subscriber.dropped:
+                try:
+                    event_type, payload = subscriber.queue.get(
+                        timeout=self.heartbeat_interval
+                    )
+                except queue.Empty:
+                    # Keeps proxies from closing the connection and lets the
+                    # server notice clients that went away
+                    yield ": heartbeat\n\n"
+                    continue
+                yield self._format(subscriber, event_type, payload)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def _format(
+        self, subscriber: Subscriber, event_type: str, payload: Dict[str, Any]
+    ) -> str:
+        """Encode one event as an SSE frame."""
+        subscriber.events_sent += 1
+        return f"event: {event_type}\ndata: {json.dumps(payload)}\n\n"
+
+    def get_clients(self) -> List[Dict[str, Any]]:
+        """Get the connected subscribers."""
+        with self._lock:
+            return [subscriber.to_dict() for subscriber in self._subscribers.values()]
+
+    def get_client_count(self) -> int:
+        """Get the number of connected subscribers."""
+        with self._lock:
+            return len(self._subscribers)
@@ -0,0 +1,194 @@
+"""
+Patient document archives for the Mock Trial Site backend.
+Streams a patient's DOCX files as a zip built on the fly, one chunk at a
+time, so a whole subject downloads in one request without the archive
+being held in memory or written to disk. Each archive ends with a
+manifest of the documents' SHA-256 hashes; hashes are cached by file
+modification time and size, read from the files themselves.
+"""
+
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional
+
+ARCHIVE_CHUNK_SIZE = 64 * 1024  # bytes read from a document at a time
+MANIFEST_NAME = "manifest.json"
+
+
+class _ArchiveBuffer(io.RawIOBase):
+    """Unseekable sink that collects what ZipFile writes until it is drained.
+
+    Being unseekable makes ZipFile write each entry's sizes and CRC after
+    its data, so entries can be streamed without knowing them up front.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _zip_date_time(modified: float):
+    """Convert a modification time to a zip entry timestamp (1980 at the earliest)."""
+    return time.localtime(max(modified, 315532800))[:6]
+
+
+class PatientArchiver:
+    """Builds patient archives and manifests from PatientIndex file entries.
+
+    Only the filenames are taken from the entries. Sizes, times and cached
+    hashes use each file's current stat, since the index does not notice a
+    document being rewritten in place.
+    """
+
+    def __init__(self, data_dir: str, chunk_size: int = ARCHIVE_CHUNK_SIZE):
+        """Initialize the archiver for the patients directory."""
+        self.data_dir = str(data_dir)
+        self.chunk_size = chunk_size
+        self._hashes = {}  # (patient ID, filename) -> (mtime_ns, size, sha256)
+        self._lock = threading.Lock()
+
+    def _get_cached_hash(
+        self, patient_id: str, filename: str, mtime_ns: int, size: int
+    ) -> Optional[str]:
+        """Get a document's hash if it was computed for this version of the file."""
+        with self._lock:
+            cached = self._hashes.get((patient_id, filename))
+        if cached and cached[0] == mtime_ns and cached[1] == size:
+            return cached[2]
+        return None
+
+    def _set_cached_hash(
+        self, patient_id: str, filename: str, mtime_ns: int, size: int, sha256: str
+    ):
+        """Remember a document's hash for this version of the file."""
+        with self._lock:
+            self._hashes[(patient_id, filename)] = (mtime_ns, size, sha256)
+
+    def _read_chunks(self, patient_id: str, filename: str, entry: Dict[str, Any]):
+        """Yield a document's contents, filling in entry's size, modified and sha256.
+
+        `modified` and `file_size` are set from the open file before the first
+        chunk; `file_size` and `sha256` are then set from the bytes read, so
+        they always match what was sent even if the file changes meanwhile.
+        """
+        path = os.path.join(self.data_dir, patient_id, filename)
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            file_stat = os.fstat(f.fileno())
+            entry["modified"] = file_stat.st_mtime
+            entry["file_size"] = file_stat.st_size
+            while True:
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                yield chunk
+        entry["file_size"] = size
+        entry["sha256"] = digest.hexdigest()
+        if size == file_stat.st_size:
+            self._set_cached_hash(
+                patient_id, filename, file_stat.st_mtime_ns, size, entry["sha256"]
+            )
+
+    def get_manifest(
+        self, patient_id: str, files: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Describe documents with their SHA-256 hashes, hashing only changed files."""
+        entries = []
+        for f in files:
+            path = os.path.join(self.data_dir, patient_id, f["filename"])
+            try:
+                file_stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # removed since it was indexed
+            entry = {
+                "filename": f["filename"],
+                "file_size": file_stat.st_size,
+                "modified": file_stat.st_mtime,
+                "sha256": self._get_cached_hash(
+                    patient_id, f["filename"], file_stat.st_mtime_ns, file_stat.st_size
+                ),
+            }
+            if entry["sha256"] is None:
+                try:
+                    for _ in self._read_chunks(patient_id, f["filename"], entry):
+                        pass
+                except FileNotFoundError:
+                    continue  # removed since it was indexed
+            entries.append(entry)
+        return self._manifest(patient_id, entries)
+
+    def _manifest(self, patient_id: str, entries: List[Dict[str, Any]]):
+        """Build the manifest dictionary."""
+        return {
+            "patient_id": patient_id,
+            "file_count": len(entries),
+            "total_size": sum(entry["file_size"] for entry in entries),
+            "algorithm": "sha256",
+            "files": entries,
+        }
+
+    def stream(self, patient_id: str, files: List[Dict[str, Any]]) -> Iterator[bytes]:
+        """Yield a zip of the documents, then their manifest, as it is built.
+
+        Entries are named `<patient_id>/<filename>`. DOCX files are already
+        deflated zips, so they are stored as they are (compressing them again
+        costs CPU and saves almost nothing); the manifest is deflated.
+        """
+        buffer = _ArchiveBuffer()
+        entries = []
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archive:
+            for f in files:
+                entry = {"filename": f["filename"]}
+                try:
+                    chunks = self._read_chunks(patient_id, f["filename"], entry)
+                    first = next(chunks, b"")
+                except FileNotFoundError:
+                    continue  # removed since it was indexed
+                info = zipfile.ZipInfo(
+                    f"{patient_id}/{f['filename']}", _zip_date_time(entry["modified"])
+                )
+                # Sizes over 2 GiB need zip64 headers, decided before writing
+                with archive.open(
+                    info, "w", force_zip64=entry["file_size"] > 0x7FFFFFFF
+                ) as member:
+                    member.write(first)
+                    for chunk in chunks:
+                        member.write(chunk)
+                        yield buffer.drain()
+                yield buffer.drain()
+                entries.append(
+                    {
+                        "filename": entry["filename"],
+                        "file_size": entry["file_size"],
+                        "modified": entry["modified"],
+                        "sha256": entry["sha256"],
+                    }
+                )
+
+            manifest = json.dumps(self._manifest(patient_id, entries), indent=2)
+            archive.writestr(
+                f"{patient_id}/{MANIFEST_NAME}",
+                manifest,
+                compress_type=zipfile.ZIP_DEFLATED,
+            )
+        yield buffer.drain()
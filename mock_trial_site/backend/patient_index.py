@@ -0,0 +1,177 @@
+"""
+Patient document index for the Mock Trial Site backend.
+Keeps every patient's DOCX listing in memory and refreshes it
+incrementally: a patient directory is rescanned only when its
+modification time changes, and the patients directory only when
+patients are added or removed.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PatientIndex:
+    """In-memory patient/document listing invalidated by directory mtimes.
+
+    Adding, removing or renaming a document changes its patient directory's
+    mtime. Editing a document in place does not, so its size and modified
+    time are refreshed on the next rescan of that patient.
+    """
+
+    def __init__(self, data_dir: str, refresh_interval: float = 2.0):
+        """Initialize the index; directories are checked at most once per interval."""
+        self.data_dir = str(data_dir)
+        self.refresh_interval = refresh_interval
+        self._patients = {}  # patient ID -> entry (see _scan_patient)
+        self._listed = []  # sorted IDs of patients that have documents
+        self._root_mtime = None
+        self._checked_at = None
+        self._lock = threading.RLock()
+
+    def _scan_patient(self, patient_id: str, mtime_ns: int) -> Dict[str, Any]:
+        """Describe a patient's DOCX files, pre-encoding both listing forms."""
+        files = []
+        directory = os.path.join(self.data_dir, patient_id)
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if not entry.is_file() or not entry.name.endswith(".docx"):
+                continue
+            file_stat = entry.stat()
+            files.append(
+                {
+                    "filename": entry.name,
+                    "file_size": file_stat.st_size,
+                    "modified": file_stat.st_mtime,
+                    "mtime_ns": file_stat.st_mtime_ns,
+                }
+            )
+
+        summary = {
+            "patient_id": patient_id,
+            "file_count": len(files),
+            "files": [
+                {
+                    "filename": f["filename"],
+                    "file_path": f"/patients/{patient_id}/{f['filename']}",
+                    "file_type": "document",
+                    "file_size": f["file_size"],
+                    "modified": f["modified"],
+                }
+                for f in files
+            ],
+        }
+        detail = json.dumps(
+            {
+                "patient_id": patient_id,
+                "files": [
+                    {
+                        "filename": f["filename"],
+                        "file_url": f"/patients/{patient_id}/{f['filename']}",
+                        "file_size": f["file_size"],
+                        "modified": f["modified"],
+                    }
+                    for f in files
+                ],
+                "file_count": len(files),
+            }
+        ).encode("utf-8")
+        return {
+            "mtime_ns": mtime_ns,
+            "files": files,
+            "summary": json.dumps(summary).encode("utf-8"),
+            "detail": detail,
+            "etag": hashlib.sha256(detail).hexdigest(),
+        }
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rescan changed directories; returns True if any listing changed."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None:
+                if now - self._checked_at < self.refresh_interval:
+                    return False
+            self._checked_at = now
+
+            try:
+                root_mtime = os.stat(self.data_dir).st_mtime_ns
+            except FileNotFoundError:
+                root_mtime = None
+            changed = False
+
+            if force or root_mtime != self._root_mtime:
+                names = set()
+                if root_mtime is not None:
+                    names = {e.name for e in os.scandir(self.data_dir) if e.is_dir()}
+                for patient_id in set(self._patients) - names:
+                    del self._patients[patient_id]
+                    changed = True
+                for patient_id in names - set(self._patients):
+                    self._patients[patient_id] = None
+                self._root_mtime = root_mtime
+
+            for patient_id, patient in list(self._patients.items()):
+                directory = os.path.join(self.data_dir, patient_id)
+                try:
+                    mtime_ns = os.stat(directory).st_mtime_ns
+                except FileNotFoundError:
+                    del self._patients[patient_id]
+                    changed = True
+                    continue
+                if force or patient is None or patient["mtime_ns"] != mtime_ns:
+                    self._patients[patient_id] = self._scan_patient(patient_id, mtime_ns)
+                    changed = True
+
+            if changed:
+                self._listed = sorted(
+                    patient_id
+                    for patient_id, patient in self._patients.items()
+                    if patient["files"]
+                )
+            return changed
+
+    def get_patient(self, patient_id: str) -> Optional[Dict[str, Any]]:
+        """Get a patient's index entry, or None if there is no such patient."""
+        self.refresh()
+        with self._lock:
+            return self._patients.get(patient_id)
+
+    def get_patient_ids(self) -> List[str]:
+        """Get the sorted IDs of patients that have documents."""
+        self.refresh()
+        with self._lock:
+            return list(self._listed)
+
+    def get_listing(
+        self, limit: Optional[int] = None, after: Optional[str] = None
+    ) -> Tuple[bytes, str]:
+        """Get (JSON body, ETag) for patients with documents, one page at a time.
+
+        Patients are ordered by ID; `after` is the last ID of the previous
+        page, and the body's `next_cursor` is the one to pass for the next.
+        """
+        self.refresh()
+        with self._lock:
+            start = bisect_right(self._listed, after) if after else 0
+            stop = len(self._listed) if limit is None else start + limit
+            page = self._listed[start:stop]
+            next_cursor = page[-1] if page and stop < len(self._listed) else None
+            patients = b",".join(
+                json.dumps(patient_id).encode("utf-8")
+                + b":"
+                + self._patients[patient_id]["summary"]
+                for patient_id in page
+            )
+            body = (
+                b'{"patients":{'
+                + patients
+                + b'},"total_patients":'
+                + str(len(self._listed)).encode()
+                + b',"next_cursor":'
+                + json.dumps(next_cursor).encode("utf-8")
+                + b"}"
+            )
+        return body, hashlib.sha256(body).hexdigest()
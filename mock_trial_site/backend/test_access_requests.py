@@ -0,0 +1,128 @@
+"""
+Tests for access request records and their endpoints.
+"""
+
+import time
+
+import pytest
+
+from access_requests import AccessRequestError, AccessRequestStore
+
+
+def test_requests_are_answered_one_by_one():
+    store = AccessRequestStore()
+    first = store.create("sponsor-a", "Give access?", study_id="STUDY-1")
+    second = store.create("sponsor-b", "Give access?")
+    assert first["id"] != second["id"]
+    assert first["status"] == "pending"
+
+    granted = store.respond(first["id"], True)
+    assert granted["status"] == "granted"
+    assert granted["responded_at"] is not None
+    assert store.get(second["id"])["status"] == "pending"
+    assert store.get_latest(pending_only=True)["id"] == second["id"]
+
+    with pytest.raises(AccessRequestError):
+        store.respond(first["id"], False)
+    assert store.respond("missing", True) is None
+
+
+def test_pending_requests_expire():
+    store = AccessRequestStore()
+    request = store.create("sponsor-a", "Give access?", ttl_seconds=0.01)
+    time.sleep(0.02)
+
+    assert store.get(request["id"])["status"] == "expired"
+    with pytest.raises(AccessRequestError):
+        store.respond(request["id"], True)
+
+
+def test_expired_requests_are_reported_on_time():
+    expired = []
+    store = AccessRequestStore(on_expire=expired.append)
+    short = store.create("sponsor-a", "Give access?", ttl_seconds=0.05)
+    answered = store.create("sponsor-b", "Give access?", ttl_seconds=0.05)
+    longer = store.create("sponsor-c", "Give access?", ttl_seconds=0.2)
+    store.respond(answered["id"], True)
+
+    # Nothing reads the store, so the timer has to do it
+    deadline = time.monotonic() + 5
+    while len(expired) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [r["id"] for r in expired] == [short["id"], longer["id"]]
+    assert all(r["status"] == "expired" for r in expired)
+    assert store.expire() == []
+
+
+def test_list_filters_by_status_and_keeps_pending_requests():
+    store = AccessRequestStore(max_history=2)
+    ids = [store.create(f"sponsor-{n}", "Give access?")["id"] for n in range(3)]
+    store.respond(ids[0], False)
+    store.respond(ids[1], True)
+
+    assert [r["id"] for r in store.list("pending")] == [ids[2]]
+    assert [r["id"] for r in store.list("granted")] == [ids[1]]
+
+    # Finished requests beyond the history make room; pending ones stay
+    latest = store.create("sponsor-3", "Give access?")
+    assert [r["id"] for r in store.list()] == [ids[2], latest["id"]]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import app as mock_site
+
+    monkeypatch.setattr(mock_site, "access_requests", AccessRequestStore())
+    mock_site.app.config["TESTING"] = True
+    return mock_site.app.test_client()
+
+
+def test_access_request_endpoints(client):
+    response = client.post("/api/request-access", json={"requester": "sponsor-a"})
+    request_id = response.get_json()["request_id"]
+    assert response.get_json()["status_url"] == f"/api/access-requests/{request_id}"
+
+    response = client.post(
+        f"/api/access-requests/{request_id}/response", json={"granted": True}
+    )
+    assert response.status_code == 200
+    assert response.get_json()["request"]["status"] == "granted"
+
+    response = client.post(
+        f"/api/access-requests/{request_id}/response", json={"granted": False}
+    )
+    assert response.status_code == 409
+    assert client.get(f"/api/access-requests/{request_id}").get_json()[
+        "request"
+    ]["status"] == "granted"
+
+    listed = client.get("/api/access-requests?status=granted").get_json()
+    assert [r["id"] for r in listed["requests"]] == [request_id]
+    assert client.get("/api/access-requests?status=bogus").status_code == 400
+    assert client.get("/api/access-requests/missing").status_code == 404
+
+
+def test_request_access_validates_ttl(client):
+    for ttl_seconds in (-1, True, "60"):
+        response = client.post(
+            "/api/request-access", json={"ttl_seconds": ttl_seconds}
+        )
+        assert response.status_code == 400
+
+
+def test_expiry_is_published_as_an_access_response(monkeypatch):
+    import app as mock_site
+
+    published = []
+    monkeypatch.setattr(mock_site, "broadcast_message", published.append)
+    request = mock_site.access_requests.create(
+        "sponsor-a", "Give access?", ttl_seconds=0.01
+    )
+    time.sleep(0.02)
+    mock_site.access_requests.expire()
+
+    event = [e for e in published if e["request_id"] == request["id"]][-1]
+    assert event["type"] == "access_response"
+    assert event["status"] == "expired"
+    assert event["granted"] is False
+    assert event["timestamp"] == request["expires_at"]
@@ -0,0 +1,107 @@
+"""
+Tests for DOCX text extraction and its per-file cache.
+"""
+
+import os
+import sys
+import zipfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from document_text import DocumentTextCache, DocumentTextError, extract_docx
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def paragraph(text):
+    return f"<w:p><w:r><w:t>{text}</w:t></w:r></w:p>"
+
+
+def table(*rows):
+    return (
+        "<w:tbl>"
+        + "".join(
+            "<w:tr>" + "".join(f"<w:tc>{cell}</w:tc>" for cell in row) + "</w:tr>"
+            for row in rows
+        )
+        + "</w:tbl>"
+    )
+
+
+def write_docx(path, body):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(
+            "word/document.xml", f"<w:document {W}><w:body>{body}</w:body></w:document>"
+        )
+
+
+def test_extract_docx_text_and_tables(tmp_path):
+    nested = table([paragraph("inner a"), paragraph("inner b")])
+    write_docx(
+        tmp_path / "visit.docx",
+        paragraph("Visit 1")
+        + table(
+            [paragraph("Test"), paragraph("Result")],
+            [paragraph("ALT"), paragraph("32") + nested],
+        )
+        + paragraph("Signed"),
+    )
+
+    document = extract_docx(str(tmp_path / "visit.docx"))
+    assert document["text"] == (
+        "Visit 1\nTest | Result\nALT | 32 inner a | inner b\nSigned"
+    )
+    assert document["tables"] == [[["Test", "Result"], ["ALT", "32 inner a | inner b"]]]
+
+
+def test_extract_docx_rejects_other_files(tmp_path):
+    (tmp_path / "notes.docx").write_text("not a zip")
+    with pytest.raises(DocumentTextError):
+        extract_docx(str(tmp_path / "notes.docx"))
+
+
+def test_cache_reextracts_changed_files(tmp_path):
+    patient_dir = tmp_path / "Patient001"
+    patient_dir.mkdir()
+    path = patient_dir / "visit.docx"
+    write_docx(path, paragraph("First"))
+
+    cache = DocumentTextCache(str(tmp_path), max_workers=1)
+    try:
+        assert cache.get_text("Patient001", "visit.docx")["text"] == "First"
+        assert cache.get_cached_count() == 1
+
+        write_docx(path, paragraph("Second version"))
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        entries = cache.get_texts("Patient001", ["visit.docx", "removed.docx"])
+        assert [entry["text"] for entry in entries] == ["Second version"]
+    finally:
+        cache.shutdown()
+
+
+def test_unreadable_documents_get_an_error_entry(tmp_path):
+    patient_dir = tmp_path / "Patient001"
+    patient_dir.mkdir()
+    write_docx(patient_dir / "visit.docx", paragraph("Visit 1"))
+    (patient_dir / "folder.docx").mkdir()  # read fails with an OSError
+
+    cache = DocumentTextCache(str(tmp_path), max_workers=1)
+    try:
+        entries = cache.get_texts("Patient001", ["folder.docx", "visit.docx"])
+        assert "Could not read DOCX file" in entries[0]["error"]
+        assert entries[1]["text"] == "Visit 1"
+
+        crashed = Future()
+        crashed.set_exception(BrokenProcessPool("worker died"))
+        entry = cache._describe("Patient001", "visit.docx", os.stat(tmp_path), crashed)
+        assert entry["error"] == "Text extraction failed: worker died"
+    finally:
+        cache.shutdown()
+
+
+def test_parser_is_not_imported_from_the_sdv_backend():
+    sdv_backend = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..")
+    sdv_backend = os.path.realpath(os.path.join(sdv_backend, "backend"))
+    assert sdv_backend not in {os.path.realpath(entry) for entry in sys.path}
@@ -0,0 +1,63 @@
+"""
+Tests for the Server-Sent Events hub.
+"""
+
+import json
+
+from event_hub import EventHub
+
+
+def parse_frame(frame):
+    lines = dict(line.split(": ", 1) for line in frame.strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_events_reach_subscribers_that_want_them():
+    hub = EventHub(heartbeat_interval=0.01)
+    everything = hub.subscribe(client="browser")
+    responses = hub.subscribe(["access_response"])
+
+    assert hub.publish("access_request", {"request_id": "r1"}) == 1
+    assert hub.publish("access_response", {"request_id": "r1"}) == 2
+
+    stream = hub.stream(everything)
+    assert next(stream).startswith("retry: 3000\n")
+    assert parse_frame(next(stream)) == ("access_request", {"request_id": "r1"})
+    assert parse_frame(next(stream)) == ("access_response", {"request_id": "r1"})
+    assert next(stream) == ": heartbeat\n\n"
+    assert everything.events_sent == 2
+
+    stream.close()
+    assert [client["id"] for client in hub.get_clients()] == [responses.id]
+    assert hub.get_clients()[0]["event_types"] == ["access_response"]
+
+
+def test_initial_events_are_sent_first():
+    hub = EventHub(heartbeat_interval=0.01)
+    subscriber = hub.subscribe()
+    hub.publish("access_response", {"request_id": "r2"})
+
+    stream = hub.stream(subscriber, initial=[("access_request", {"request_id": "r1"})])
+    next(stream)
+    assert parse_frame(next(stream))[1] == {"request_id": "r1"}
+    assert parse_frame(next(stream))[1] == {"request_id": "r2"}
+    stream.close()
+
+
+def test_slow_subscribers_are_dropped():
+    hub = EventHub(heartbeat_interval=0.01, max_queued=2)
+    slow = hub.subscribe()
+    fast = hub.subscribe()
+    fast_stream = hub.stream(fast)
+    next(fast_stream)
+
+    for number in range(3):
+        hub.publish("access_request", {"request_id": f"r{number}"})
+        parse_frame(next(fast_stream))
+
+    assert slow.dropped
+    assert hub.get_client_count() == 1
+    # A dropped stream ends right after connecting, so the client reconnects
+    assert len(list(hub.stream(slow))) == 1
+    fast_stream.close()
+    assert hub.get_client_count() == 0
@@ -0,0 +1,135 @@
+"""
+Tests for streamed patient archives and their manifests.
+"""
+
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+from patient_archive import MANIFEST_NAME, PatientArchiver
+from patient_index import PatientIndex
+
+
+def patient_files(data_dir, patient_id):
+    files = []
+    for name in sorted(os.listdir(data_dir / patient_id)):
+        file_stat = os.stat(data_dir / patient_id / name)
+        files.append(
+            {
+                "filename": name,
+                "file_size": file_stat.st_size,
+                "modified": file_stat.st_mtime,
+                "mtime_ns": file_stat.st_mtime_ns,
+            }
+        )
+    return files
+
+
+def test_stream_builds_a_zip_with_manifest(tmp_path):
+    (tmp_path / "P1").mkdir()
+    contents = {"a.docx": os.urandom(200_000), "b.docx": b"small"}
+    for name, data in contents.items():
+        (tmp_path / "P1" / name).write_bytes(data)
+    os.utime(tmp_path / "P1" / "a.docx", (1_700_000_000, 1_700_000_000))
+
+    archiver = PatientArchiver(str(tmp_path), chunk_size=4096)
+    files = patient_files(tmp_path, "P1")
+    chunks = list(archiver.stream("P1", files))
+    assert len(chunks) > len(contents)  # streamed, not built in one piece
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        for name, data in contents.items():
+            assert archive.read(f"P1/{name}") == data
+        info = archive.getinfo("P1/a.docx")
+        assert info.date_time[0] == 2023
+        manifest = json.loads(archive.read(f"P1/{MANIFEST_NAME}"))
+
+    assert manifest["file_count"] == 2
+    assert {entry["filename"]: entry["sha256"] for entry in manifest["files"]} == {
+        name: hashlib.sha256(data).hexdigest() for name, data in contents.items()
+    }
+    # The streamed hashes are reused for the manifest endpoint
+    assert archiver.get_manifest("P1", files) == manifest
+
+
+def test_manifest_skips_removed_files(tmp_path):
+    (tmp_path / "P1").mkdir()
+    (tmp_path / "P1" / "a.docx").write_bytes(b"a")
+    files = patient_files(tmp_path, "P1")
+    os.remove(tmp_path / "P1" / "a.docx")
+
+    manifest = PatientArchiver(str(tmp_path)).get_manifest("P1", files)
+    assert manifest["file_count"] == 0
+
+
+def test_manifest_follows_files_rewritten_after_indexing(tmp_path):
+    (tmp_path / "P1").mkdir()
+    (tmp_path / "P1" / "a.docx").write_bytes(b"before")
+    files = patient_files(tmp_path, "P1")
+    archiver = PatientArchiver(str(tmp_path))
+    archiver.get_manifest("P1", files)
+
+    # Same size, newer time: the stale index entries must not reuse the hash
+    (tmp_path / "P1" / "a.docx").write_bytes(b"after!")
+    os.utime(tmp_path / "P1" / "a.docx", (1_800_000_000, 1_800_000_000))
+    manifest = archiver.get_manifest("P1", files)
+    assert manifest["files"][0]["sha256"] == hashlib.sha256(b"after!").hexdigest()
+    assert manifest["files"][0]["modified"] == 1_800_000_000
+
+    with zipfile.ZipFile(io.BytesIO(b"".join(archiver.stream("P1", files)))) as zf:
+        assert zf.read("P1/a.docx") == b"after!"
+        assert zf.getinfo("P1/a.docx").date_time[0] == 2027
+        assert json.loads(zf.read(f"P1/{MANIFEST_NAME}")) == manifest
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    import app as mock_site
+
+    (tmp_path / "patient_1").mkdir()
+    for name in ("Sub_1_Vitals.docx", "Sub_1_Week0Labs.docx", "Sub_1_Week4Labs.docx"):
+        (tmp_path / "patient_1" / name).write_bytes(name.encode())
+    monkeypatch.setattr(mock_site, "patient_index", PatientIndex(tmp_path))
+    monkeypatch.setattr(mock_site, "patient_archiver", PatientArchiver(tmp_path))
+    mock_site.app.config["TESTING"] = True
+    return mock_site.app.test_client()
+
+
+def archive_names(response):
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        return archive.namelist()
+
+
+def test_archive_endpoint_selects_documents(client):
+    response = client.get("/api/patients/patient_1/archive")
+    assert response.status_code == 200
+    assert response.headers["X-Archive-File-Count"] == "3"
+    assert len(archive_names(response)) == 4
+
+    response = client.get("/api/patients/patient_1/archive?pattern=*Labs*")
+    assert archive_names(response) == [
+        "patient_1/Sub_1_Week0Labs.docx",
+        "patient_1/Sub_1_Week4Labs.docx",
+        f"patient_1/{MANIFEST_NAME}",
+    ]
+
+    manifest = client.get(
+        "/api/patients/patient_1/manifest?files=Sub_1_Vitals.docx"
+    ).get_json()
+    assert manifest["files"][0]["sha256"] == (
+        hashlib.sha256(b"Sub_1_Vitals.docx").hexdigest()
+    )
+
+
+def test_archive_endpoint_reports_missing_documents(client):
+    assert client.get("/api/patients/nobody/archive").status_code == 404
+    response = client.get("/api/patients/patient_1/archive?files=missing.docx")
+    assert response.status_code == 404
+    assert "missing.docx" in response.get_json()["error"]
+    response = client.get("/api/patients/patient_1/manifest?pattern=*.pdf")
+    assert response.status_code == 404
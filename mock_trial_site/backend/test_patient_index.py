@@ -0,0 +1,100 @@
+"""
+Tests for the cached patient document index.
+"""
+
+import json
+import os
+
+from patient_index import PatientIndex
+
+
+def add_document(data_dir, patient_id, filename, data=b"docx"):
+    (data_dir / patient_id).mkdir(exist_ok=True)
+    (data_dir / patient_id / filename).write_bytes(data)
+
+
+def listing(index, **page):
+    body, etag = index.get_listing(**page)
+    return json.loads(body), etag
+
+
+def test_listing_holds_patients_with_documents(tmp_path):
+    add_document(tmp_path, "patient_2", "b.docx")
+    add_document(tmp_path, "patient_1", "a.docx", b"abc")
+    add_document(tmp_path, "patient_1", "notes.txt")
+    (tmp_path / "patient_3").mkdir()
+
+    index = PatientIndex(str(tmp_path), refresh_interval=0)
+    data, _ = listing(index)
+    assert list(data["patients"]) == ["patient_1", "patient_2"]
+    assert data["total_patients"] == 2
+    assert data["next_cursor"] is None
+
+    summary = data["patients"]["patient_1"]
+    assert summary["file_count"] == 1
+    assert summary["files"][0]["file_path"] == "/patients/patient_1/a.docx"
+    assert summary["files"][0]["file_size"] == 3
+
+    detail = json.loads(index.get_patient("patient_1")["detail"])
+    assert [f["file_url"] for f in detail["files"]] == ["/patients/patient_1/a.docx"]
+    assert index.get_patient("missing") is None
+
+
+def test_unchanged_directories_are_not_rescanned(tmp_path):
+    add_document(tmp_path, "patient_1", "a.docx")
+    index = PatientIndex(str(tmp_path), refresh_interval=0)
+    _, etag = listing(index)
+    entry = index.get_patient("patient_1")
+
+    assert index.refresh() is False
+    assert index.get_patient("patient_1") is entry
+    assert listing(index)[1] == etag
+
+
+def test_added_and_removed_documents_are_picked_up(tmp_path):
+    add_document(tmp_path, "patient_1", "a.docx")
+    index = PatientIndex(str(tmp_path), refresh_interval=0)
+    _, etag = listing(index)
+
+    add_document(tmp_path, "patient_1", "b.docx")
+    add_document(tmp_path, "patient_2", "c.docx")
+    data, new_etag = listing(index)
+    assert new_etag != etag
+    assert data["patients"]["patient_1"]["file_count"] == 2
+    assert index.get_patient_ids() == ["patient_1", "patient_2"]
+
+    os.remove(tmp_path / "patient_2" / "c.docx")
+    os.remove(tmp_path / "patient_1" / "a.docx")
+    os.rmdir(tmp_path / "patient_2")
+    data, _ = listing(index)
+    assert list(data["patients"]) == ["patient_1"]
+    assert [f["filename"] for f in data["patients"]["patient_1"]["files"]] == [
+        "b.docx"
+    ]
+
+
+def test_refresh_waits_for_the_interval(tmp_path):
+    add_document(tmp_path, "patient_1", "a.docx")
+    index = PatientIndex(str(tmp_path), refresh_interval=3600)
+    assert index.get_patient_ids() == ["patient_1"]
+
+    add_document(tmp_path, "patient_2", "b.docx")
+    assert index.get_patient_ids() == ["patient_1"]
+    assert index.refresh(force=True) is True
+    assert index.get_patient_ids() == ["patient_1", "patient_2"]
+
+
+def test_listing_pages_by_patient_id(tmp_path):
+    for number in range(5):
+        add_document(tmp_path, f"patient_{number}", "a.docx")
+    index = PatientIndex(str(tmp_path), refresh_interval=0)
+
+    seen, cursor = [], None
+    while True:
+        data, _ = listing(index, limit=2, after=cursor)
+        assert data["total_patients"] == 5
+        seen.extend(data["patients"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"patient_{number}" for number in range(5)]
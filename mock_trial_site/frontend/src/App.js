@@ -1,4 +1,4 @@
-import React, { useEffect, useRef, useState } from "react";
+import React, { useEffect, useState } from "react";
 import "./App.css";
 
 // Load backend URL from config or use default
@@ -19,10 +19,9 @@ let API_URL = "http://localhost:5500"; // Will be updated on mount
 function App() {
     const [patients, setPatients] = useState({});
     const [selectedPatient, setSelectedPatient] = useState(null);
-    const [showAccessPopup, setShowAccessPopup] = useState(false);
-    const [accessMessage, setAccessMessage] = useState("");
+    // Pending access requests, oldest first; the popup answers the first
+    const [accessRequests, setAccessRequests] = useState([]);
     const [backendPort, setBackendPort] = useState(5500); // Default port
-    const wsRef = useRef(null);
 
     // Load backend port from config
     useEffect(() => {
@@ -44,53 +43,26 @@ function App() {
         loadConfig();
     }, []);
 
-    // WebSocket connection
+    // Access requests are pushed by the backend over Server-Sent Events;
+    // EventSource reconnects by itself if the connection drops
     useEffect(() => {
-        // Note: In production, you would use wss:// for secure WebSocket
-        // For now, we'll simulate WebSocket with polling
-        const connectWebSocket = () => {
-            // Simulated WebSocket - in production use: const ws = new WebSocket(`ws://localhost:${backendPort}`);
-            console.log(
-                `WebSocket connection established on port ${backendPort}`
-            );
-        };
-
-        connectWebSocket();
-
-        return () => {
-            if (wsRef.current) {
-                wsRef.current.close();
-            }
-        };
-    }, [backendPort]);
-
-    // Simulate WebSocket messages with polling
-    useEffect(() => {
-        const pollForAccessRequests = async () => {
-            try {
-                // In production, this would be real WebSocket message handling
-                // For demo, we'll check via HTTP endpoint
-                const response = await fetch(
-                    `http://localhost:${backendPort}/api/check-access-request`
-                );
-                if (response.ok) {
-                    const data = await response.json();
-                    if (data.active) {
-                        setAccessMessage(
-                            data.message || "Give access to the system?"
-                        );
-                        setShowAccessPopup(true);
-                    }
-                }
-            } catch (error) {
-                console.error("Error checking for access requests:", error);
-            }
+        const events = new EventSource(
+            `http://localhost:${backendPort}/api/events?types=access_request`
+        );
+        events.onopen = () => {
+            console.log(`Event stream connected on port ${backendPort}`);
         };
+        events.addEventListener("access_request", (event) => {
+            const data = JSON.parse(event.data);
+            // Pending requests are replayed on reconnect; keep each once
+            setAccessRequests((queued) =>
+                queued.some((r) => r.request_id === data.request_id)
+                    ? queued
+                    : [...queued, data]
+            );
+        });
 
-        // Poll every 5 seconds
-        const interval = setInterval(pollForAccessRequests, 5000);
-
-        return () => clearInterval(interval);
+        return () => events.close();
     }, [backendPort]);
 
     // Fetch patients on load
@@ -122,24 +94,30 @@ function App() {
         }
     };
 
-    const handleAccessResponse = async (granted) => {
-        // Send response to backend
+    const handleAccessResponse = async (accessRequest, granted) => {
+        // Send response to backend for this request only
         try {
-            await fetch(`http://localhost:${backendPort}/api/access-response`, {
-                method: "POST",
-                headers: {
-                    "Content-Type": "application/json",
-                },
-                body: JSON.stringify({ granted }),
-            });
+            await fetch(
+                `http://localhost:${backendPort}/api/access-requests/${accessRequest.request_id}/response`,
+                {
+                    method: "POST",
+                    headers: {
+                        "Content-Type": "application/json",
+                    },
+                    body: JSON.stringify({ granted }),
+                }
+            );
         } catch (error) {
             console.error("Error sending access response:", error);
         }
 
-        setShowAccessPopup(false);
-        setAccessMessage("");
+        setAccessRequests((queued) =>
+            queued.filter((r) => r.request_id !== accessRequest.request_id)
+        );
     };
 
+    const currentRequest = accessRequests[0];
+
     const downloadFile = (fileUrl, filename) => {
         window.open(`http://localhost:${backendPort}${fileUrl}`, "_blank");
     };
@@ -152,21 +130,34 @@ function App() {
             </header>
 
             {/* Access Request Popup */}
-            {showAccessPopup && (
+            {currentRequest && (
                 <div className="popup-overlay">
                     <div className="popup-content">
                         <h2>Access Request</h2>
-                        <p>{accessMessage}</p>
+                        <p>
+                            {currentRequest.message ||
+                                "Give access to the system?"}
+                        </p>
+                        {accessRequests.length > 1 && (
+                            <p>
+                                {accessRequests.length - 1} more request(s)
+                                waiting
+                            </p>
+                        )}
                         <div className="popup-buttons">
                             <button
                                 className="btn btn-yes"
-                                onClick={() => handleAccessResponse(true)}
+                                onClick={() =>
+                                    handleAccessResponse(currentRequest, true)
+                                }
                             >
                                 Yes
                             </button>
                             <button
                                 className="btn btn-no"
-                                onClick={() => handleAccessResponse(false)}
+                                onClick={() =>
+                                    handleAccessResponse(currentRequest, false)
+                                }
                             >
                                 No
                             </button>
@@ -1,37 +1,70 @@
 import { useEffect, useState } from "react";
+import apiService from "../services/api.js";
 import dataService from "../services/dataService.js";
 
+// Group users by company
+const groupUsers = (allUsers) => ({
+    google: allUsers.filter(
+        (user) => user.companyAssociation.toLowerCase() === "google"
+    ),
+    veera: allUsers.filter(
+        (user) => user.companyAssociation.toLowerCase() === "veera vault"
+    ),
+    medidata: allUsers.filter(
+        (user) => user.companyAssociation.toLowerCase() === "medidata"
+    ),
+});
+
 export const useUsers = () => {
     const [users, setUsers] = useState({ google: [], veera: [], medidata: [] });
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
     useEffect(() => {
+        // Users by email, kept current by the backend change feed
+        let usersByEmail = new Map();
+        let subscription = null;
+        let cancelled = false;
+
+        const applyChanges = ({ changes }) => {
+            let changed = false;
+            changes.forEach((change) => {
+                if (change.type !== "user") return;
+                if (change.op === "delete") {
+                    usersByEmail.delete(change.id);
+                } else {
+                    usersByEmail.set(
+                        change.id,
+                        dataService.convertToUser(change.record)
+                    );
+                }
+                changed = true;
+            });
+            if (changed) {
+                setUsers(groupUsers([...usersByEmail.values()]));
+            }
+        };
+
         const fetchUsers = async () => {
             try {
                 setLoading(true);
                 setError(null);
+                // Take the version first, so changes made while the list
+                // loads are replayed rather than missed
+                const { version } = await apiService.getChanges();
                 const response = await dataService.getUsers();
-                const allUsers = response.users;
-
-                // Group users by company
-                const groupedUsers = {
-                    google: allUsers.filter(
-                        (user) =>
-                            user.companyAssociation.toLowerCase() === "google"
-                    ),
-                    veera: allUsers.filter(
-                        (user) =>
-                            user.companyAssociation.toLowerCase() ===
-                            "veera vault"
-                    ),
-                    medidata: allUsers.filter(
-                        (user) =>
-                            user.companyAssociation.toLowerCase() === "medidata"
-                    ),
-                };
-
-                setUsers(groupedUsers);
+                if (cancelled) return;
+
+                usersByEmail = new Map(
+                    response.users.map((user) => [user.emailAddress, user])
+                );
+                setUsers(groupUsers(response.users));
+
+                // Stream later changes instead of refetching the list
+                subscription = apiService.subscribeToChanges(version, {
+                    onChanges: applyChanges,
+                    onReset: fetchUsers,
+                });
             } catch (err) {
                 console.error("Error fetching users:", err);
                 setError(err);
@@ -43,6 +76,11 @@ export const useUsers = () => {
         };
 
         fetchUsers();
+
+        return () => {
+            cancelled = true;
+            if (subscription) subscription.close();
+        };
     }, []);
 
     return { users, loading, error };
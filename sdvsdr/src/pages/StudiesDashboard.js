@@ -72,12 +72,50 @@ const StudiesDashboard = () => {
 
     // Fetch studies from backend on component mount
     useEffect(() => {
+        // Studies by ID, kept current by the backend change feed
+        let studiesById = new Map();
+        let subscription = null;
+        let cancelled = false;
+
+        const applyChanges = ({ changes }) => {
+            let changed = false;
+            changes.forEach((change) => {
+                if (change.type !== "study") return;
+                if (change.op === "delete") {
+                    studiesById.delete(change.id);
+                } else {
+                    studiesById.set(
+                        change.id,
+                        dataService.convertToStudy(change.record)
+                    );
+                }
+                changed = true;
+            });
+            if (changed) {
+                setStudies([...studiesById.values()]);
+            }
+        };
+
         const fetchStudies = async () => {
             try {
                 setLoading(true);
                 setError(null);
+                // Take the version first, so changes made while the list
+                // loads are replayed rather than missed
+                const { version } = await apiService.getChanges();
                 const response = await dataService.getStudies();
+                if (cancelled) return;
+
+                studiesById = new Map(
+                    response.studies.map((study) => [study.id, study])
+                );
                 setStudies(response.studies);
+
+                // Stream later changes instead of refetching the list
+                subscription = apiService.subscribeToChanges(version, {
+                    onChanges: applyChanges,
+                    onReset: fetchStudies,
+                });
             } catch (err) {
                 console.error("Error fetching studies:", err);
                 setError("Failed to load studies. Please try again.");
@@ -87,6 +125,11 @@ const StudiesDashboard = () => {
         };
 
         fetchStudies();
+
+        return () => {
+            cancelled = true;
+            if (subscription) subscription.close();
+        };
     }, []);
 
     const handleCreateStudy = () => {
@@ -189,7 +232,12 @@ const StudiesDashboard = () => {
             return;
         }
 
+        // Listen before sending, so a quick answer is not missed
+        const responseEvents = listenForAccessResponse(study);
+
         try {
+            await responseEvents.opened;
+
             // Trigger access request to investigator's site
             const response = await fetch(
                 "http://localhost:5500/api/request-access",
@@ -209,9 +257,10 @@ const StudiesDashboard = () => {
             const data = await response.json();
 
             if (data.success) {
-                // Start polling for response
-                pollForAccessResponse(study);
+                responseEvents.setRequestId(data.request_id);
+                showWaitingForResponse(study);
             } else {
+                responseEvents.close();
                 setAccessModalTitle("❌ Error");
                 setAccessModalMessage(
                     "Failed to send access request. Please try again."
@@ -220,6 +269,7 @@ const StudiesDashboard = () => {
                 setIsWaitingForResponse(false);
             }
         } catch (error) {
+            responseEvents.close();
             console.error("Error connecting to investigator:", error);
             setAccessModalTitle("❌ Connection Error");
             setAccessModalMessage(
@@ -230,59 +280,111 @@ const StudiesDashboard = () => {
         }
     };
 
-    const pollForAccessResponse = async (study) => {
-        const maxAttempts = 60; // Wait up to 60 seconds
-        let attempts = 0;
+    // Wait for the investigator's answer to our request, pushed by the
+    // trial site. The request is only sent once the stream is open, answers
+    // arriving before the request ID is known are kept and checked once it
+    // is, and the request's status is also polled in case the stream drops
+    // an answer, so a quick answer is not missed
+    const listenForAccessResponse = (study) => {
+        let requestId = null;
+        let finished = false;
+        let pollInterval = null;
+        const earlyResponses = [];
+        const events = new EventSource(
+            "http://localhost:5500/api/events?types=access_response"
+        );
 
-        const pollInterval = setInterval(async () => {
-            attempts++;
+        // Resolves once the stream is open, or has failed and polling has
+        // to do the work
+        const opened = new Promise((resolve) => {
+            events.onopen = () => resolve();
+            events.onerror = () => resolve();
+        });
 
+        const finish = () => {
+            finished = true;
+            clearTimeout(timeout);
+            clearInterval(pollInterval);
+            events.close();
+        };
+
+        // Give up after 60 seconds
+        const timeout = setTimeout(() => {
+            finish();
+            setAccessModalTitle("⏱️ Request Timeout");
+            setAccessModalMessage(
+                "No response received from investigator. The request may have timed out."
+            );
+            setIsWaitingForResponse(false);
+        }, 60000);
+
+        const handleResponse = (data) => {
+            // Other agents' requests are answered on the same stream
+            if (finished || data.request_id !== requestId) return;
+            finish();
+
+            if (data.status === "granted") {
+                // Mark study as connected
+                setConnectedStudies((prev) => new Set([...prev, study.id]));
+                setAccessModalTitle("✅ Access Granted");
+                setAccessModalMessage(
+                    `Access GRANTED by ${study.principalInvestigator.name}\n\nYou can now access their trial site data.`
+                );
+            } else if (data.status === "expired") {
+                setAccessModalTitle("⏱️ Request Timeout");
+                setAccessModalMessage(
+                    "No response received from investigator. The request may have timed out."
+                );
+            } else {
+                setAccessModalTitle("❌ Access Denied");
+                setAccessModalMessage(
+                    `Access DENIED by ${study.principalInvestigator.name}\n\nThey have declined your access request.`
+                );
+            }
+            setIsWaitingForResponse(false);
+        };
+
+        const pollStatus = async () => {
+            if (finished) return;
             try {
                 const response = await fetch(
-                    "http://localhost:5500/api/check-access-response"
+                    `http://localhost:5500/api/access-requests/${requestId}`
                 );
-
-                if (response.ok) {
-                    const data = await response.json();
-
-                    // If we have a response (granted/denied)
-                    if (data.status !== "pending") {
-                        clearInterval(pollInterval);
-
-                        if (data.status === "granted") {
-                            // Mark study as connected
-                            setConnectedStudies(
-                                (prev) => new Set([...prev, study.id])
-                            );
-                            setAccessModalTitle("✅ Access Granted");
-                            setAccessModalMessage(
-                                `Access GRANTED by ${study.principalInvestigator.name}\n\nYou can now access their trial site data.`
-                            );
-                            setIsWaitingForResponse(false);
-                        } else if (data.status === "denied") {
-                            setAccessModalTitle("❌ Access Denied");
-                            setAccessModalMessage(
-                                `Access DENIED by ${study.principalInvestigator.name}\n\nThey have declined your access request.`
-                            );
-                            setIsWaitingForResponse(false);
-                        }
-                    }
+                if (!response.ok) return;
+                const { request } = await response.json();
+                if (request.status !== "pending") {
+                    handleResponse({
+                        request_id: request.id,
+                        status: request.status,
+                    });
                 }
             } catch (error) {
-                console.error("Error polling for access response:", error);
+                console.error("Error checking access request:", error);
             }
+        };
 
-            // Stop polling after max attempts
-            if (attempts >= maxAttempts) {
-                clearInterval(pollInterval);
-                setAccessModalTitle("⏱️ Request Timeout");
-                setAccessModalMessage(
-                    "No response received from investigator. The request may have timed out."
-                );
-                setIsWaitingForResponse(false);
+        events.addEventListener("access_response", (event) => {
+            const data = JSON.parse(event.data);
+            if (requestId === null) {
+                earlyResponses.push(data);
+            } else {
+                handleResponse(data);
             }
-        }, 1000); // Poll every 1 second
+        });
+
+        return {
+            opened,
+            setRequestId: (id) => {
+                requestId = id;
+                earlyResponses.splice(0).forEach(handleResponse);
+                pollStatus();
+                pollInterval = setInterval(pollStatus, 5000);
+            },
+            close: finish,
+        };
+    };
 
+    const showWaitingForResponse = (study) => {
         // Show modal with initial message
         setAccessModalTitle("⏳ Access Request Sent");
         setAccessModalMessage(
@@ -2012,7 +2114,8 @@ const StudiesDashboard = () => {
                         >
                             <iframe
                                 src={apiService.getCRFFileUrl(
-                                    selectedFileForPreview.name
+                                    selectedFileForPreview.name,
+                                    selectedFileForPreview.contentHash
                                 )}
                                 style={{
                                     width: "100%",
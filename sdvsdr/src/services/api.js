@@ -85,6 +85,37 @@ class ApiService {
         return this.request("/api/database/stats");
     }
 
+    // Change feed: without `since`, returns the current version to start
+    // from; with it, waits up to `timeout` seconds for later changes
+    async getChanges(since, timeout) {
+        const params = {};
+        if (since !== undefined) params.since = since;
+        if (timeout !== undefined) params.timeout = timeout;
+        const queryString = new URLSearchParams(params).toString();
+        const endpoint = queryString
+            ? `/api/changes?${queryString}`
+            : "/api/changes";
+        return this.request(endpoint);
+    }
+
+    // Stream changes after `since` as Server-Sent Events. onChanges gets
+    // each { version, changes } delta; onReset means the changes can no
+    // longer be replayed and the lists must be refetched. Call close() on
+    // the returned EventSource to stop.
+    subscribeToChanges(since, { onChanges, onReset }) {
+        const source = new EventSource(
+            `${this.baseURL}/api/changes?since=${since}`
+        );
+        source.addEventListener("changes", (event) =>
+            onChanges(JSON.parse(event.data))
+        );
+        source.addEventListener("reset", () => {
+            source.close();
+            onReset();
+        });
+        return source;
+    }
+
     // Document endpoints (existing functionality)
     async uploadFile(file) {
         const formData = new FormData();
@@ -113,9 +144,11 @@ class ApiService {
         return this.request("/api/files/crf");
     }
 
-    // Get individual CRF file for preview
-    getCRFFileUrl(filename) {
-        return `${this.baseURL}/api/files/crf/${filename}`;
+    // Get individual CRF file for preview. Passing the file's contentHash
+    // from the listing gives a versioned URL the browser may cache for good.
+    getCRFFileUrl(filename, contentHash) {
+        const url = `${this.baseURL}/api/files/crf/${filename}`;
+        return contentHash ? `${url}?v=${contentHash}` : url;
     }
 }
 
@@ -3,6 +3,8 @@
  * Handles extraction of content from PDF and DOCX files for TrialMonitor agent
  */
 
+import apiService from "./api.js";
+
 // Mock file content extraction (in real implementation, this would use PDF.js or similar)
 export const extractFileContent = async (fileName, fileType) => {
     try {
@@ -189,17 +191,34 @@ Physical Examination: Normal except for joint swelling`,
         },
     };
 
-    return (
-        crfContentMap[fileName] || {
-            content: `CRF Content for ${fileName}`,
-            dataPoints: [
-                "patient_id",
-                "assessment_date",
-                "primary_endpoint",
-                "secondary_endpoint",
-            ],
+    const mockContent = crfContentMap[fileName] || {
+        content: `CRF Content for ${fileName}`,
+        dataPoints: [
+            "patient_id",
+            "assessment_date",
+            "primary_endpoint",
+            "secondary_endpoint",
+        ],
+    };
+
+    // Prefer the backend's cached text extraction of the actual CRF file
+    try {
+        const response = await fetch(
+            `${apiService.baseURL}/api/files/crf/${encodeURIComponent(
+                fileName
+            )}/text`
+        );
+        if (response.ok) {
+            const data = await response.json();
+            if (data.text) {
+                return { ...mockContent, content: data.text };
+            }
         }
-    );
+    } catch (error) {
+        console.warn(`Falling back to mock CRF content for ${fileName}:`, error);
+    }
+
+    return mockContent;
 };
 
 // Extract content from source files